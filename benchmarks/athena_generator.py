@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Generate Athena-shaped vocabulary TSVs of configurable size.
+
+Every table of the CDM 5.4 vocabulary load order is written with its real columns,
+realistic value widths, YYYYMMDD dates and the edge cases the loader must handle:
+strings exactly at and just over their varchar limit, empty optional values, literal
+quotes in names and the odd invalid date. Keys are unique, so the files load into
+tables that already have their primary keys.
+
+Usage:
+    python benchmarks/athena_generator.py /tmp/athena --concepts 100000
+"""
+
+import argparse
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# CDM 5.4 vocabulary columns: name, database type, character_maximum_length
+TABLE_COLUMNS: Dict[str, List[Tuple[str, str, int]]] = {
+    'vocabulary': [
+        ('vocabulary_id', 'character varying', 20), ('vocabulary_name', 'character varying', 255),
+        ('vocabulary_reference', 'character varying', 255), ('vocabulary_version', 'character varying', 255),
+        ('vocabulary_concept_id', 'integer', None),
+    ],
+    'domain': [
+        ('domain_id', 'character varying', 20), ('domain_name', 'character varying', 255),
+        ('domain_concept_id', 'integer', None),
+    ],
+    'concept_class': [
+        ('concept_class_id', 'character varying', 20), ('concept_class_name', 'character varying', 255),
+        ('concept_class_concept_id', 'integer', None),
+    ],
+    'relationship': [
+        ('relationship_id', 'character varying', 20), ('relationship_name', 'character varying', 255),
+        ('is_hierarchical', 'character varying', 1), ('defines_ancestry', 'character varying', 1),
+        ('reverse_relationship_id', 'character varying', 20), ('relationship_concept_id', 'integer', None),
+    ],
+    'drug_strength': [
+        ('drug_concept_id', 'integer', None), ('ingredient_concept_id', 'integer', None),
+        ('amount_value', 'numeric', None), ('amount_unit_concept_id', 'integer', None),
+        ('numerator_value', 'numeric', None), ('numerator_unit_concept_id', 'integer', None),
+        ('denominator_value', 'numeric', None), ('denominator_unit_concept_id', 'integer', None),
+        ('box_size', 'integer', None), ('valid_start_date', 'date', None), ('valid_end_date', 'date', None),
+        ('invalid_reason', 'character varying', 1),
+    ],
+    'concept_synonym': [
+        ('concept_id', 'integer', None), ('concept_synonym_name', 'character varying', 1000),
+        ('language_concept_id', 'integer', None),
+    ],
+    'concept': [
+        ('concept_id', 'integer', None), ('concept_name', 'character varying', 255),
+        ('domain_id', 'character varying', 20), ('vocabulary_id', 'character varying', 20),
+        ('concept_class_id', 'character varying', 20), ('standard_concept', 'character varying', 1),
+        ('concept_code', 'character varying', 50), ('valid_start_date', 'date', None),
+        ('valid_end_date', 'date', None), ('invalid_reason', 'character varying', 1),
+    ],
+    'concept_relationship': [
+        ('concept_id_1', 'integer', None), ('concept_id_2', 'integer', None),
+        ('relationship_id', 'character varying', 20), ('valid_start_date', 'date', None),
+        ('valid_end_date', 'date', None), ('invalid_reason', 'character varying', 1),
+    ],
+    'concept_ancestor': [
+        ('ancestor_concept_id', 'integer', None), ('descendant_concept_id', 'integer', None),
+        ('min_levels_of_separation', 'integer', None), ('max_levels_of_separation', 'integer', None),
+    ],
+}
+
+# rows per CONCEPT row, roughly as in a full Athena download
+TABLE_SCALE = {
+    'drug_strength': 0.5,
+    'concept_synonym': 0.4,
+    'concept': 1,
+    'concept_relationship': 6,
+    'concept_ancestor': 12,
+}
+
+# small tables keep a fixed size whatever the scale
+TABLE_ROWS = {'vocabulary': 100, 'domain': 50, 'concept_class': 400, 'relationship': 700}
+
+DOMAINS = ['Condition', 'Drug', 'Measurement', 'Procedure', 'Observation', 'Device', 'Unit', 'Spec Anatomic Site']
+VOCABULARIES = ['SNOMED', 'RxNorm', 'LOINC', 'ICD10CM', 'RxNorm Extension', 'NDC', 'CPT4', 'UCUM']
+CLASSES = ['Clinical Finding', 'Ingredient', 'Lab Test', 'Procedure', 'Clinical Drug', 'Branded Drug']
+RELATIONSHIPS = ['Is a', 'Subsumes', 'Maps to', 'Mapped from', 'Has ingredient', 'RxNorm has dose form',
+                 'Has finding site', 'Has method', 'Concept replaced by', 'Has status', 'Has asso morph',
+                 'Has component', 'Has scale type', 'Has property']
+
+
+def table_rows(table: str, concepts: int) -> int:
+    """Number of rows generated for ``table`` when CONCEPT has ``concepts`` rows."""
+    if table in TABLE_ROWS:
+        return TABLE_ROWS[table]
+    return max(1, int(concepts * TABLE_SCALE[table]))
+
+
+class _Values:
+    """Column value factories sharing one seeded random generator."""
+
+    def __init__(self, rows: int, rng: np.random.Generator):
+        self.rows = rows
+        self.rng = rng
+
+    def text(self, prefix: str, max_length: int, mean: int) -> List[str]:
+        """Strings around ``mean`` characters; 1% exactly at and 1% just over ``max_length``."""
+        lengths = np.clip(self.rng.poisson(mean, self.rows), 1, max_length)
+        edge = self.rng.random(self.rows)
+        lengths = np.where(edge < 0.01, max_length, lengths)
+        lengths = np.where(edge > 0.99, max_length + 5, lengths)
+        values = []
+        for i, length in enumerate(lengths):
+            # Athena files are unquoted, so quotes inside names are literal
+            base = f'{prefix} "{i}" ' if i % 50 == 0 else f'{prefix} {i} '
+            values.append((base + 'x' * int(length))[:int(length)])
+        return values
+
+    def choice(self, options: List[str]) -> List[str]:
+        return list(self.rng.choice(options, self.rows))
+
+    def ids(self, high: int) -> List[str]:
+        return [str(v) for v in self.rng.integers(1, high + 1, self.rows)]
+
+    def dates(self, invalid: float = 0.001) -> List[str]:
+        """YYYYMMDD dates; a fraction ``invalid`` of them are impossible days like 20230231."""
+        days = np.datetime64('1970-01-01') + self.rng.integers(0, 20000, self.rows).astype('timedelta64[D]')
+        values = [str(d).replace('-', '') for d in days]
+        for i in np.flatnonzero(self.rng.random(self.rows) < invalid):
+            values[i] = values[i][:4] + '0231'
+        return values
+
+    def flag(self, value: str, share: float) -> List[str]:
+        return [value if r < share else '' for r in self.rng.random(self.rows)]
+
+    def numbers(self) -> List[str]:
+        values = np.round(self.rng.gamma(2.0, 50.0, self.rows), 3)
+        missing = self.rng.random(self.rows) < 0.3
+        return ['' if m else repr(float(v)) for v, m in zip(values, missing)]
+
+
+def _columns(table: str, rows: int, concepts: int, rng: np.random.Generator) -> Dict[str, List[str]]:
+    v = _Values(rows, rng)
+    index = np.arange(rows)
+    concept_ids = concepts
+    if table == 'vocabulary':
+        names = VOCABULARIES + [f'Vocab{i}' for i in range(rows - len(VOCABULARIES))]
+        return {'vocabulary_id': names[:rows], 'vocabulary_name': v.text('Vocabulary', 255, 40),
+                'vocabulary_reference': v.text('https://example.org/vocab', 255, 40),
+                'vocabulary_version': v.text('v5.0 31-AUG-23', 255, 16), 'vocabulary_concept_id': v.ids(concept_ids)}
+    if table == 'domain':
+        names = DOMAINS + [f'Domain{i}' for i in range(rows - len(DOMAINS))]
+        return {'domain_id': names[:rows], 'domain_name': v.text('Domain', 255, 20),
+                'domain_concept_id': v.ids(concept_ids)}
+    if table == 'concept_class':
+        names = CLASSES + [f'Class{i}' for i in range(rows - len(CLASSES))]
+        return {'concept_class_id': names[:rows], 'concept_class_name': v.text('Class', 255, 20),
+                'concept_class_concept_id': v.ids(concept_ids)}
+    if table == 'relationship':
+        names = RELATIONSHIPS + [f'Rel{i}' for i in range(rows - len(RELATIONSHIPS))]
+        return {'relationship_id': names[:rows], 'relationship_name': v.text('Relationship', 255, 30),
+                'is_hierarchical': v.choice(['0', '1']), 'defines_ancestry': v.choice(['0', '1']),
+                'reverse_relationship_id': list(reversed(names[:rows])), 'relationship_concept_id': v.ids(concept_ids)}
+    if table == 'concept':
+        return {'concept_id': [str(i + 1) for i in index], 'concept_name': v.text('Concept', 255, 60),
+                'domain_id': v.choice(DOMAINS), 'vocabulary_id': v.choice(VOCABULARIES),
+                'concept_class_id': v.choice(CLASSES), 'standard_concept': v.flag('S', 0.6),
+                'concept_code': v.text('C', 50, 8), 'valid_start_date': v.dates(),
+                'valid_end_date': ['20991231'] * rows, 'invalid_reason': v.flag('D', 0.05)}
+    # the remaining tables combine concepts; (i % n, i // n) keeps their keys unique
+    first = index % concept_ids + 1
+    lap = index // concept_ids
+    second = (first + lap) % concept_ids + 1
+    if table == 'concept_relationship':
+        return {'concept_id_1': [str(i) for i in first], 'concept_id_2': [str(i) for i in second],
+                'relationship_id': [RELATIONSHIPS[i % len(RELATIONSHIPS)] for i in lap],
+                'valid_start_date': v.dates(), 'valid_end_date': ['20991231'] * rows,
+                'invalid_reason': v.flag('D', 0.02)}
+    if table == 'concept_ancestor':
+        levels = rng.integers(0, 8, rows)
+        return {'ancestor_concept_id': [str(i) for i in first], 'descendant_concept_id': [str(i) for i in second],
+                'min_levels_of_separation': [str(i) for i in levels],
+                'max_levels_of_separation': [str(i) for i in levels + rng.integers(0, 3, rows)]}
+    if table == 'concept_synonym':
+        return {'concept_id': [str(i) for i in first], 'concept_synonym_name': v.text('Synonym', 1000, 50),
+                'language_concept_id': ['4180186'] * rows}
+    if table == 'drug_strength':
+        return {'drug_concept_id': [str(i) for i in first], 'ingredient_concept_id': [str(i) for i in second],
+                'amount_value': v.numbers(), 'amount_unit_concept_id': v.ids(concept_ids),
+                'numerator_value': v.numbers(), 'numerator_unit_concept_id': v.ids(concept_ids),
+                'denominator_value': v.numbers(), 'denominator_unit_concept_id': v.ids(concept_ids),
+                'box_size': v.flag('10', 0.1), 'valid_start_date': v.dates(),
+                'valid_end_date': ['20991231'] * rows, 'invalid_reason': v.flag('D', 0.02)}
+    raise ValueError(f"No generator for table '{table}'.")
+
+
+def write_table(folder: str, table: str, concepts: int, seed: int = 42, upper: bool = False) -> Tuple[str, int]:
+    """Write one table's TSV into ``folder`` and return its path and row count."""
+    rows = table_rows(table, concepts)
+    rng = np.random.default_rng([seed, list(TABLE_COLUMNS).index(table)])
+    columns = _columns(table, rows, concepts, rng)
+    names = [name for name, _, _ in TABLE_COLUMNS[table]]
+    path = os.path.join(folder, f"{table.upper() if upper else table}.csv")
+    with open(path, 'w', encoding='utf-8', newline='') as handle:
+        handle.write('\t'.join(names) + '\n')
+        values = [columns[name] for name in names]
+        for start in range(0, rows, 100_000):
+            stop = min(start + 100_000, rows)
+            handle.write(''.join('\t'.join(row) + '\n' for row in zip(*(v[start:stop] for v in values))))
+    return path, rows
+
+
+def generate(folder: str, concepts: int, seed: int = 42, upper: bool = False,
+             tables: List[str] = None) -> Dict[str, int]:
+    """Write every vocabulary table into ``folder`` and return the row count of each."""
+    os.makedirs(folder, exist_ok=True)
+    return {table: write_table(folder, table, concepts, seed, upper)[1] for table in (tables or TABLE_COLUMNS)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder')
+    parser.add_argument('--concepts', type=int, default=100_000, help='rows of CONCEPT; other tables scale from it')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--upper', action='store_true', help='write upper-case file names')
+    args = parser.parse_args()
+    for table, rows in generate(args.folder, args.concepts, args.seed, args.upper).items():
+        print(f"{table:22s} {rows:>12,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Microbenchmark the TableConverter engine against the original check_data_types.
+
+Usage:
+    python benchmarks/bench_conversion.py --rows 100000 --repeat 5
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ohdsi_cdm_loader.conversion import TableConverter, parse_yyyymmdd  # noqa: E402
+from ohdsi_cdm_loader.readers import ATHENA_TSV  # noqa: E402
+from ohdsi_cdm_loader.schema_catalog import SchemaCatalog  # noqa: E402
+
+# CDM 5.4 CONCEPT columns: name, type, character_maximum_length
+CONCEPT_COLUMNS = [
+    ('concept_id', 'integer', None),
+    ('concept_name', 'character varying', 255),
+    ('domain_id', 'character varying', 20),
+    ('vocabulary_id', 'character varying', 20),
+    ('concept_class_id', 'character varying', 20),
+    ('standard_concept', 'character varying', 1),
+    ('concept_code', 'character varying', 50),
+    ('valid_start_date', 'date', None),
+    ('valid_end_date', 'date', None),
+    ('invalid_reason', 'character varying', 1),
+]
+
+
+def legacy_check_data_types(rdf, result_schema, character, similar_columns):
+    """check_data_types as it was before the TableConverter engine."""
+    similar_columns = list(similar_columns)
+    new_rdf = rdf[similar_columns].copy()
+    for column in similar_columns:
+        if result_schema[column] in ['integer', 'bigint', 'smallint']:
+            new_rdf[column] = pd.to_numeric(new_rdf[column], errors='coerce').astype('Int64')
+        if result_schema[column] in ['numeric']:
+            new_rdf[column] = pd.to_numeric(new_rdf[column], errors='coerce')
+        if result_schema[column] in ['character', 'character varying']:
+            new_rdf[column] = new_rdf[column].fillna('').astype(str)
+            new_rdf[column] = new_rdf[column].str[:int(character[column])]
+        elif result_schema[column] in ['date', 'Date']:
+            new_rdf[column] = pd.to_datetime(new_rdf[column], format='%Y%m%d', errors='coerce')
+    return new_rdf
+
+
+def raw_concept_chunk(rows: int) -> pd.DataFrame:
+    """A CONCEPT chunk exactly as pd.read_csv hands it to the converter."""
+    rng = np.random.default_rng(7)
+    start = pd.Timestamp('1970-01-01') + pd.to_timedelta(rng.integers(0, 20000, rows), unit='D')
+    lines = ['\t'.join(c[0] for c in CONCEPT_COLUMNS)]
+    names = rng.integers(5, 300, rows)
+    for i in range(rows):
+        lines.append('\t'.join([
+            str(i + 1), 'n' * int(names[i]), 'Condition', 'SNOMED', 'Clinical Finding',
+            'S' if i % 3 else '', str(100000 + i), start[i].strftime('%Y%m%d'), '20991231', '',
+        ]))
+    text = '\n'.join(lines) + '\n'
+    return pd.read_csv(io.StringIO(text), low_memory=False, **ATHENA_TSV)
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    catalog = SchemaCatalog('bench')
+    for name, data_type, length in CONCEPT_COLUMNS:
+        catalog.add_column('concept', name, data_type, length)
+    plan = catalog.plan('concept')
+    chunk = raw_concept_chunk(args.rows)
+    columns = plan.select(chunk.columns)
+
+    converter = TableConverter(plan)
+    legacy = best_of(lambda: legacy_check_data_types(chunk, plan.types, plan.max_lengths, columns), args.repeat)
+    engine = best_of(lambda: converter.convert(chunk, columns), args.repeat)
+
+    print(f"CONCEPT chunk: {args.rows:,} rows")
+    print(f"  check_data_types (legacy): {legacy * 1000:8.1f} ms ({args.rows / legacy:,.0f} rows/s)")
+    print(f"  TableConverter:            {engine * 1000:8.1f} ms ({args.rows / engine:,.0f} rows/s)")
+    print(f"  speed-up: {legacy / engine:.2f}x")
+
+    dates = chunk['valid_start_date']
+    legacy_dates = best_of(lambda: pd.to_datetime(dates, format='%Y%m%d', errors='coerce'), args.repeat)
+    engine_dates = best_of(lambda: parse_yyyymmdd(dates), args.repeat)
+    print(f"  dates: to_datetime {legacy_dates * 1000:.1f} ms, parse_yyyymmdd {engine_dates * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Compare the in-memory Arrow bridge with the feather-on-disk fallback.
+
+Usage:
+    python benchmarks/bench_r_bridge.py --rows 1000000 --repeat 3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from ohdsi_cdm_loader.r_bridge import ArrowBridge  # noqa: E402
+
+
+def concept_frame(rows: int) -> pd.DataFrame:
+    """Build a CONCEPT-shaped data frame with the widths seen in Athena exports."""
+    rng = np.random.default_rng(42)
+    ids = np.arange(1, rows + 1, dtype=np.int64)
+    return pd.DataFrame({
+        'concept_id': ids,
+        'concept_name': pd.Series(ids).map(lambda i: f"Concept name {i} " + "x" * (i % 120)),
+        'domain_id': rng.choice(['Condition', 'Drug', 'Measurement', 'Procedure'], rows),
+        'vocabulary_id': rng.choice(['SNOMED', 'RxNorm', 'LOINC', 'ICD10CM'], rows),
+        'concept_class_id': rng.choice(['Clinical Finding', 'Ingredient', 'Lab Test'], rows),
+        'standard_concept': rng.choice(['S', 'C', ''], rows),
+        'concept_code': pd.Series(ids).astype(str),
+        'valid_start_date': pd.Timestamp('1970-01-01') + pd.to_timedelta(rng.integers(0, 20000, rows), unit='D'),
+        'valid_end_date': pd.Timestamp('2099-12-31'),
+        'invalid_reason': rng.choice(['', 'D', 'U'], rows),
+    })
+
+
+def time_round_trip(bridge: ArrowBridge, frame: pd.DataFrame, repeat: int) -> dict:
+    to_r, to_python = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rdf = bridge.to_r(frame)
+        to_r.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        bridge.to_python(rdf)
+        to_python.append(time.perf_counter() - start)
+    return {'to_r': min(to_r), 'to_python': min(to_python)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    frame = concept_frame(args.rows)
+    size_mb = frame.memory_usage(deep=True).sum() / 1e6
+    print(f"CONCEPT-shaped frame: {args.rows:,} rows, {size_mb:,.1f} MB in pandas")
+
+    for method in ('memory', 'disk'):
+        bridge = ArrowBridge(method=method)
+        timings = time_round_trip(bridge, frame, args.repeat)
+        print(
+            f"{method:>6}: to_r {timings['to_r']:.3f}s ({args.rows / timings['to_r']:,.0f} rows/s), "
+            f"to_python {timings['to_python']:.3f}s ({args.rows / timings['to_python']:,.0f} rows/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
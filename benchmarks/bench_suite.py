@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Throughput benchmark suite for CSVLoader on a synthetic Athena vocabulary.
+
+Generates Athena-shaped TSVs for every table of the vocabulary load order, then
+measures rows/s and peak RSS of each stage and writes them as JSON so runs can be
+compared:
+
+* read        - pandas and Arrow readers over the generated CONCEPT file
+* convert     - TableConverter on CONCEPT chunks
+* compare_and_convert, r2p_convert - the CSVLoader methods (need rpy2)
+* bulk_load_data, load_all_csvs    - against a throwaway Postgres (need --db)
+
+The database stages create a scratch schema, execute the CDM DDL into it, load, and
+drop the schema again. Connection settings come from the same variables as main.py
+(DB_SERVER, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD, DRIVER_PATH).
+
+Usage:
+    python benchmarks/bench_suite.py --concepts 100000
+    python benchmarks/bench_suite.py --concepts 1000000 --db --output run.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from athena_generator import TABLE_COLUMNS, generate  # noqa: E402
+from ohdsi_cdm_loader.conversion import TableConverter  # noqa: E402
+from ohdsi_cdm_loader.metrics import MetricsRecorder  # noqa: E402
+from ohdsi_cdm_loader.readers import ArrowCSVReader, pandas_chunks  # noqa: E402
+from ohdsi_cdm_loader.schema_catalog import SchemaCatalog  # noqa: E402
+
+CHUNK_SIZE = 100_000
+
+
+def reset_peak_rss() -> None:
+    """Reset the kernel's high-water mark of this process (Linux only)."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as handle:
+            handle.write('5')
+    except OSError:
+        pass
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size since the last reset, in MB."""
+    try:
+        with open('/proc/self/status') as handle:
+            for line in handle:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # no resettable counter: the peak of the whole process
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == 'darwin' else 1)
+
+
+def measure(name: str, func: Callable[[], Optional[int]], rows: int = None, **extra) -> dict:
+    """
+    Run ``func`` once and record its duration, rows/s and peak RSS. A stage that raises
+    is recorded with its error, so the other stages still make it into the report.
+    """
+    reset_peak_rss()
+    start = time.perf_counter()
+    try:
+        result = func()
+    except Exception as e:
+        print(f"{name:28s} failed: {type(e).__name__}: {e}")
+        return {'stage': name, 'error': f"{type(e).__name__}: {e}", **extra}
+    seconds = max(time.perf_counter() - start, 1e-9)
+    rows = result if rows is None else rows
+    record = {'stage': name, 'rows': rows, 'seconds': round(seconds, 4),
+              'rows_per_sec': round(rows / seconds, 1) if rows else None,
+              'peak_rss_mb': round(peak_rss_mb(), 1)}
+    record.update(extra)
+    print(f"{name:28s} {rows or 0:>12,} rows {seconds:8.2f}s "
+          f"{record['rows_per_sec'] or 0:>14,.0f} rows/s {record['peak_rss_mb']:8.1f} MB peak")
+    return record
+
+
+def skipped(name: str, reason: str) -> dict:
+    print(f"{name:28s} skipped: {reason}")
+    return {'stage': name, 'skipped': reason}
+
+
+def catalog_for(schema: str) -> SchemaCatalog:
+    """A schema catalog of the generated tables, as the database would report it."""
+    catalog = SchemaCatalog(schema)
+    for table, columns in TABLE_COLUMNS.items():
+        for name, data_type, length in columns:
+            catalog.add_column(table, name, data_type, length)
+    return catalog
+
+
+def offline_stages(folder: str, catalog: SchemaCatalog) -> list:
+    concept_file = os.path.join(folder, 'concept.csv')
+    plan = catalog.plan('concept')
+    chunks = list(pandas_chunks(concept_file, CHUNK_SIZE))
+    rows = sum(len(chunk) for chunk in chunks)
+    stages = [
+        measure('read_pandas', lambda: sum(len(c) for c in pandas_chunks(concept_file, CHUNK_SIZE)),
+                table='concept', bytes=os.path.getsize(concept_file)),
+        measure('read_arrow', lambda: sum(b.num_rows for b in ArrowCSVReader(plan).batches(concept_file)),
+                table='concept', bytes=os.path.getsize(concept_file)),
+    ]
+
+    def convert():
+        converter = TableConverter(plan)
+        for chunk in chunks:
+            converter.convert(chunk, plan.select(chunk.columns))
+        return rows
+    stages.append(measure('convert', convert, table='concept'))
+
+    def arrow_to_frame():
+        reader = ArrowCSVReader(plan)
+        return sum(len(reader.to_frame(batch)) for batch in reader.batches(concept_file))
+    stages.append(measure('read_and_convert_arrow', arrow_to_frame, table='concept'))
+
+    try:
+        from ohdsi_cdm_loader.load_csv import CSVLoader
+    except ImportError as e:
+        stages.append(skipped('compare_and_convert', f"CSVLoader unavailable ({e})"))
+        return stages
+
+    # compare_and_convert only needs the cached catalog and a metrics recorder, not a connection
+    loader = CSVLoader.__new__(CSVLoader)
+    loader._catalog, loader._converters, loader.metrics = catalog, {}, MetricsRecorder()
+    stages.append(measure('compare_and_convert',
+                          lambda: sum(len(loader.compare_and_convert(c, 'concept')) for c in chunks),
+                          table='concept'))
+    return stages
+
+
+def database_stages(folder: str, tables: Dict[str, int], args) -> list:
+    from ohdsi_cdm_loader.db_connector import DatabaseHandler
+    from ohdsi_cdm_loader.load_csv import CSVLoader
+
+    schema = f"bench_{os.getpid()}"
+    handler = DatabaseHandler(
+        db_type='postgresql', host=os.getenv('DB_SERVER', 'localhost'),
+        user=os.getenv('DB_USER', 'postgres'), password=os.getenv('DB_PASSWORD', ''),
+        database=os.getenv('DB_NAME', 'postgres'), driver_path=os.getenv('DRIVER_PATH', '/jdbc'),
+        schema=schema, port=int(os.getenv('DB_PORT', '5432')))
+    conn = handler.connect_to_db()
+    stages = []
+    try:
+        handler.create_cdm_schema(schema)
+        handler.execute_ddl(args.cdm_version)
+        loader = CSVLoader(db_connection=conn, database_handler=handler, reader=args.reader)
+        catalog = loader.load_schema_catalog(refresh=True)
+        chunk = next(iter(pandas_chunks(os.path.join(folder, 'concept.csv'), CHUNK_SIZE)))
+        chunk.columns = chunk.columns.str.lower()
+        converted = loader.compare_and_convert(chunk, 'concept')
+
+        def round_trip():
+            loader.r2p_convert(loader.r2p_convert(converted, 'to_r'), 'to_python')
+            return len(converted)
+        stages.append(measure('r2p_convert', round_trip, table='concept', bridge=loader._bridge.get_method()))
+
+        stages.append(measure(
+            'bulk_load_data',
+            lambda: handler.run_async(loader.bulk_load_data(args.batch_size, converted, 'concept')) or len(converted),
+            table='concept'))
+        handler.empty_table(schema, 'concept')
+
+        order = [table for table in TABLE_COLUMNS if catalog.has_table(table)]
+        stages.append(measure(
+            'load_all_csvs',
+            lambda: loader.load_all_csvs(folder, order, batch_size=args.batch_size, upper=False,
+                                         max_workers=args.table_workers, engine=args.engine),
+            rows=sum(tables[t] for t in order), engine=args.engine, reader=args.reader,
+            table_workers=args.table_workers, bytes=sum(os.path.getsize(os.path.join(folder, f"{t}.csv"))
+                                                        for t in order)))
+    finally:
+        try:
+            handler.run_async(_drop_schema(handler, schema))
+        finally:
+            handler.close()
+    return stages
+
+
+async def _drop_schema(handler, schema: str) -> None:
+    pool = await handler.get_pool()
+    async with pool.connection() as conn:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concepts', type=int, default=100_000, help='rows of CONCEPT; other tables scale from it')
+    parser.add_argument('--folder', help='reuse or keep the generated files here instead of a temporary folder')
+    parser.add_argument('--db', action='store_true', help='also run the database stages against a local Postgres')
+    parser.add_argument('--cdm-version', default='5.4')
+    parser.add_argument('--engine', default='pandas', choices=['pandas', 'copy', 'parallel'])
+    parser.add_argument('--reader', default='pandas', choices=['pandas', 'arrow'])
+    parser.add_argument('--batch-size', type=int, default=50_000)
+    parser.add_argument('--table-workers', type=int, default=4)
+    parser.add_argument('--output', help='JSON result file (default: benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+
+    folder = args.folder or tempfile.mkdtemp(prefix='athena-bench-')
+    try:
+        tables = {}
+
+        def generate_all():
+            tables.update(generate(folder, args.concepts))
+            return sum(tables.values())
+        generation = measure('generate', generate_all)
+        stages = [generation] + offline_stages(folder, catalog_for('bench'))
+        if args.db:
+            stages += database_stages(folder, tables, args)
+        else:
+            stages.append(skipped('load_all_csvs', 'run with --db against a throwaway Postgres'))
+    finally:
+        if not args.folder:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    report = {
+        'timestamp': now.isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'concepts': args.concepts,
+        'tables': tables,
+        'stages': stages,
+    }
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results',
+                                         f"{now.strftime('%Y%m%dT%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results written to {output}")
+    failed = [stage['stage'] for stage in stages if 'error' in stage]
+    if failed:
+        sys.exit(f"Failed stages: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 from ohdsi_cdm_loader.db_connector import DatabaseHandler
 from ohdsi_cdm_loader.load_csv import CSVLoader
+from ohdsi_cdm_loader.sources import discover_sources
+from ohdsi_cdm_loader.synthea_etl import CDM_TABLES, ConceptLookup, SyntheaETL
 from dotenv import load_dotenv
 import os
 import sys
+import shutil
+import argparse
+import tempfile
 # Load environment variables
 load_dotenv()
 
@@ -20,7 +25,34 @@ csv_path = os.getenv("CSV_PATH", "/csv").strip()
 cdm_version = os.getenv("CDM_VERSION", "5.4")
 synthea_version = os.getenv("SYNTHEA_VERSION", "3.0")
 synthea_schema = os.getenv("SYNTHEA_SCHEMA", "synthea")
-synthea_csv = os.getenv("SYNTHEA_CSV")
+synthea_csv = os.getenv("SYNTHEA_CSV") or None  # Synthea CSV output converted into the CDM when set
+synthea_workers = int(os.getenv("SYNTHEA_WORKERS", "0")) or None  # ETL processes (default: one per CPU)
+synthea_output = os.getenv("SYNTHEA_OUTPUT") or None  # keep the converted CDM tables here (default: temporary)
+# further targets loaded from the same files, as comma-separated [database.]schema entries
+fanout_targets = [entry.strip() for entry in os.getenv("FANOUT_TARGETS", "").split(",") if entry.strip()]
+verify = os.getenv("VERIFY", "off").strip().lower()  # off | counts | checksums, opt-in check after each load
+concept_cache_dir = os.getenv("CONCEPT_CACHE_DIR") or None  # source-to-concept lookup cache (default ~/.cache/ohdsi_cdm_loader/concepts)
+table_workers = int(os.getenv("TABLE_WORKERS", "4"))  # tables loaded concurrently
+shard_workers = int(os.getenv("SHARD_WORKERS", "4"))  # shards of one table loaded concurrently
+load_mode = os.getenv("LOAD_MODE", "standard").strip().lower()  # standard | deferred
+index_workers = int(os.getenv("INDEX_WORKERS", "4"))  # tables indexed concurrently after the load
+maintenance_work_mem = os.getenv("MAINTENANCE_WORK_MEM", "1GB")
+pool_min_size = int(os.getenv("DB_POOL_MIN_SIZE", "4"))
+pool_max_size = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+write_mode = os.getenv("WRITE_MODE", "truncate").strip().lower()  # truncate | delta | staging | append | upsert
+# WRITE_MODE=staging: 'false' leaves the swapped-in tables UNLOGGED, for throwaway databases only
+staging_logged = os.getenv("STAGING_LOGGED", "true").strip().lower() not in ("0", "false", "no")
+max_memory = os.getenv("MAX_MEMORY")  # e.g. 2GB; sizes chunks and batches adaptively when set
+metrics_json = os.getenv("METRICS_JSON")  # optional path of the JSON run report
+metrics_prometheus = os.getenv("METRICS_PROMETHEUS")  # optional path of a Prometheus textfile
+resume = os.getenv("RESUME", "false").strip().lower() in ("1", "true", "yes")  # record and continue from the checkpoint manifest
+checkpoint_schema = os.getenv("CHECKPOINT_SCHEMA") or None  # schema of the checkpoint manifest (default: DB_SCHEMA)
+ddl_cache_dir = os.getenv("DDL_CACHE_DIR") or None  # rendered CDM DDL is cached here (default ~/.cache/ohdsi_cdm_loader/ddl)
+parsed_cache_dir = os.getenv("PARSED_CACHE_DIR") or None  # converted CSV files are cached here as Arrow IPC when set
+parsed_cache_size = os.getenv("PARSED_CACHE_SIZE", "20GB")  # least recently used files are evicted beyond it
+# tables whose single large file is split over worker processes, e.g. concept_relationship,concept_ancestor
+parallel_tables = [table.strip().lower() for table in os.getenv("PARALLEL_TABLES", "").split(",") if table.strip()]
+parallel_workers = int(os.getenv("PARALLEL_WORKERS", "0")) or None  # processes per parallel table (default: one per CPU)
 
 # Validate required environment variables
 required_vars = {
@@ -42,6 +74,18 @@ if not os.path.exists(csv_path):
 if not os.path.exists(driver_path):
     print(f"Warning: Driver path does not exist: {driver_path}")
 
+if load_mode not in ("standard", "deferred"):
+    print(f"Error: LOAD_MODE must be 'standard' or 'deferred', got '{load_mode}'")
+    sys.exit(1)
+
+if verify not in ("off", "counts", "checksums"):
+    print(f"Error: VERIFY must be 'off', 'counts' or 'checksums', got '{verify}'")
+    sys.exit(1)
+
+if write_mode not in ("truncate", "delta", "staging", "append", "upsert"):
+    print(f"Error: WRITE_MODE must be 'truncate', 'delta', 'staging', 'append' or 'upsert', got '{write_mode}'")
+    sys.exit(1)
+
 synthea_order = [
     'allergies', 'careplans', 'conditions',
     'devices', 'encounters', 'imaging_studies',
@@ -50,6 +94,23 @@ synthea_order = [
     'payers', 'procedures', 'providers', 'supplies'
 ]
 
+if fanout_targets and (write_mode in ("delta", "staging") or resume):
+    print("Error: FANOUT_TARGETS works with WRITE_MODE truncate, append or upsert and without RESUME")
+    sys.exit(1)
+
+def verify_load(csv_loader, folder, tables):
+    """Compare the loaded tables with their source files and fail the run on a mismatch."""
+    if verify == "off":
+        return
+    if write_mode in ("append", "upsert"):
+        # the tables hold more than these files, so counts and checksums cannot match
+        print(f"Skipping verification: WRITE_MODE={write_mode} adds to rows loaded before.")
+        return
+    report = csv_loader.verify_load(folder, tables, upper=False, checksums=verify == "checksums")
+    print(report)
+    if not report.passed:
+        raise RuntimeError(f"Verification failed for: {', '.join(check.table for check in report.failed)}")
+
 cdm_order = ['vocabulary', 'domain', 
              'concept_class', 'relationship', 
              'drug_strength',  'concept_synonym', 
@@ -58,12 +119,17 @@ cdm_order = ['vocabulary', 'domain',
 
 def main():
     """Entry point for running the CDM loader."""
+    parser = argparse.ArgumentParser(description="Load the OHDSI vocabularies into a CDM schema.")
+    parser.add_argument("--max-memory", default=max_memory,
+                        help="memory budget for the chunks in flight, e.g. 2GB (default: MAX_MEMORY)")
+    args, _ = parser.parse_known_args()
     print("=== OHDSI CDM Loader Starting ===")
     print(f"Database: {db_type}://{db_server}:{db_port}/{db_name}")
     print(f"Schema: {db_schema}")
     print(f"CSV Path: {csv_path}")
     print(f"Driver Path: {driver_path}")
     print(f"CDM Version: {cdm_version}")
+    print(f"Load mode: {load_mode}")
     print("=" * 40)
     
     try:
@@ -76,7 +142,19 @@ def main():
             driver_path=driver_path,
             schema=db_schema,
             port=int(db_port),
+            pool_min_size=pool_min_size,
+            pool_max_size=pool_max_size,
+            ddl_cache_dir=ddl_cache_dir,
         )
+        targets = []
+        for entry in fanout_targets:
+            database, _, schema = entry.rpartition(".")
+            targets.append(DatabaseHandler(
+                db_type=db_type, host=db_server, user=db_user, password=db_password,
+                database=database or db_name, driver_path=driver_path, schema=schema, port=int(db_port),
+                pool_min_size=pool_min_size, pool_max_size=pool_max_size, ddl_cache_dir=ddl_cache_dir,
+                metrics=database_connector.metrics,
+            ))
 
         print("Connecting to database...")
         db_conn = database_connector.connect_to_db()
@@ -88,13 +166,66 @@ def main():
         print(f"\n1. Creating CDM tables (version {cdm_version})...")
         # create schema if it doesn't exist
         database_connector.create_cdm_schema(db_schema)
-        database_connector.execute_ddl(cdm_version)
-        print("✓ CDM tables created")
+        deferred = load_mode == "deferred"
+        if deferred and not database_connector.supports_ddl_split(cdm_version):
+            print("Warning: CommonDataModel cannot split the DDL; falling back to the standard load mode.")
+            deferred = False
+        # only what the schema lacks is created; in deferred mode the tables are created
+        # bare and keys/indexes follow the load
+        diff = database_connector.apply_ddl(cdm_version, execute_primary_keys=not deferred,
+                                            execute_foreign_keys=not deferred)
+        print("✓ CDM tables up to date" if diff.empty else f"✓ CDM tables created ({diff})")
+        for target in targets:
+            target.create_cdm_schema(target.get_schema())
+            diff = target.apply_ddl(cdm_version, execute_primary_keys=not deferred,
+                                    execute_foreign_keys=not deferred)
+            print(f"✓ {target.get_database()}.{target.get_schema()}: "
+                  + ("CDM tables up to date" if diff.empty else f"CDM tables created ({diff})"))
+        if deferred:
+            # an existing schema keeps the keys and indexes of an earlier run; drop them so
+            # the load goes into bare tables and step 4 builds them again
+            for handler in [database_connector] + targets:
+                dropped = handler.drop_constraints(cdm_version)
+                if dropped:
+                    print(f"✓ {handler.get_database()}.{handler.get_schema()}: "
+                          f"dropped {dropped} keys and indexes until the load completes")
 
         print(f"\n2. Loading vocabulary CSV files from {csv_path}...")
-        csv_loader = CSVLoader(db_connection=db_conn, database_handler=database_connector)
-        csv_loader.load_all_csvs(csv_path, cdm_order, upper=False, batch_size=50000)
+        csv_loader = CSVLoader(db_connection=db_conn, database_handler=database_connector,
+                               max_memory=args.max_memory, targets=targets,
+                               cache_dir=parsed_cache_dir, cache_size=parsed_cache_size,
+                               parallel_workers=parallel_workers, checkpoint_schema=checkpoint_schema)
+        csv_loader.load_all_csvs(csv_path, cdm_order, upper=False, batch_size=50000,
+                                 max_workers=table_workers, resume=resume,
+                                 mode=write_mode, shard_workers=shard_workers, staging_logged=staging_logged,
+                                 engine={table: 'parallel' for table in parallel_tables})
         print("✓ Vocabulary CSV files loaded")
+        verify_load(csv_loader, csv_path, cdm_order)
+
+        if synthea_csv and not discover_sources(synthea_csv, ['patients.csv']):
+            print(f"\nNo Synthea patients.csv in {synthea_csv}; skipping the Synthea conversion.")
+        elif synthea_csv:
+            print(f"\n3. Converting Synthea CSV files from {synthea_csv} into the CDM...")
+            lookup = ConceptLookup.from_database(database_connector, cache_dir=concept_cache_dir)
+            output = synthea_output or tempfile.mkdtemp(prefix='synthea-cdm-')
+            try:
+                rows = SyntheaETL(output, lookup, workers=synthea_workers).run(synthea_csv)
+                csv_loader.load_all_csvs(output, list(CDM_TABLES), upper=False, batch_size=50000,
+                                         max_workers=table_workers, resume=resume,
+                                         mode=write_mode, shard_workers=shard_workers)
+                verify_load(csv_loader, output, list(CDM_TABLES))
+            finally:
+                if not synthea_output:
+                    shutil.rmtree(output, ignore_errors=True)
+            print(f"✓ Synthea converted and loaded ({sum(rows.values()):,} CDM rows)")
+
+        if deferred:
+            print("\n4. Building primary keys, indexes and foreign keys...")
+            for handler in [database_connector] + targets:
+                handler.build_constraints(cdm_version, workers=index_workers,
+                                          maintenance_work_mem=maintenance_work_mem)
+            print("✓ Primary keys, indexes and foreign keys built")
+        print(f"Connection pool: {database_connector.pool_stats()}")
         print("\n=== CDM Loader completed successfully! ===")
 
     except Exception as e:
@@ -102,10 +233,23 @@ def main():
         sys.exit(1)
     
     finally:
-        # Close database connection if it exists
+        if 'database_connector' in locals():
+            print("\n=== Run summary ===")
+            print(database_connector.metrics.summary())
+            try:
+                if metrics_json:
+                    database_connector.metrics.write_json(metrics_json)
+                if metrics_prometheus:
+                    database_connector.metrics.write_prometheus(metrics_prometheus)
+            except OSError as e:
+                print(f"Warning: Could not write metrics: {e}")
+        # Close the connection pool and the database connection if they exist
         try:
-            if 'db_conn' in locals():
-                db_conn.close()
+            if 'database_connector' in locals():
+                # further targets run on the handler's event loop, so they close first
+                for target in locals().get('targets', []):
+                    target.close()
+                database_connector.close()
                 print("Database connection closed.")
         except Exception as e:
             print(f"Warning: Could not close database connection: {e}")
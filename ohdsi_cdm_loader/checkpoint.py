@@ -0,0 +1,159 @@
+import os
+import json
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+import numpy as np
+from .sources import Source, SourceFile
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# bytes hashed from each end of a source file for its fingerprint
+_FINGERPRINT_BYTES = 1 << 20
+
+
+def file_fingerprint(file_path: Source) -> str:
+    """
+    Fingerprint a source file from its size and the first and last MiB of content.
+    Cheap enough for multi-GB vocabulary files, and changes whenever Athena ships a
+    new release of the file. A compressed source is fingerprinted from its archive
+    and member name, without decompressing it.
+    """
+    digest = hashlib.sha256()
+    if isinstance(file_path, SourceFile):
+        digest.update(f"{file_path.member}:{file_path.size}".encode())
+        file_path = file_path.path
+    size = os.path.getsize(file_path)
+    digest.update(str(size).encode())
+    with open(file_path, 'rb') as handle:
+        digest.update(handle.read(_FINGERPRINT_BYTES))
+        if size > _FINGERPRINT_BYTES:
+            handle.seek(max(size - _FINGERPRINT_BYTES, _FINGERPRINT_BYTES))
+            digest.update(handle.read(_FINGERPRINT_BYTES))
+    return digest.hexdigest()
+
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping or touching [start, end) row ranges."""
+    merged: List[List[int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def uncommitted_mask(start: int, count: int, ranges: List[Tuple[int, int]]) -> np.ndarray:
+    """Mask of the rows [start, start + count) that no committed range covers."""
+    rows = np.arange(start, start + count)
+    mask = np.ones(count, dtype=bool)
+    for range_start, range_end in ranges:
+        if range_start < start + count and range_end > start:
+            mask &= (rows < range_start) | (rows >= range_end)
+    return mask
+
+
+@dataclass
+class Checkpoint:
+    """Progress of one source file into one table."""
+    table_name: str
+    source_file: str
+    fingerprint: str
+    completed: bool = False
+    ranges: List[Tuple[int, int]] = field(default_factory=list)
+
+    @property
+    def resume_row(self) -> int:
+        """Rows from the start of the file that are already committed."""
+        return self.ranges[0][1] if self.ranges and self.ranges[0][0] == 0 else 0
+
+    @property
+    def rows_loaded(self) -> int:
+        return sum(end - start for start, end in self.ranges)
+
+
+class CheckpointManifest:
+    def __init__(self, schema: str, table: str = 'cdm_loader_checkpoint'):
+        """
+        Manifest of committed chunks, stored in the database.
+
+        Every chunk records the row range it committed in the same transaction as its
+        COPY, so the manifest never claims rows that were rolled back, and a rerun can
+        skip finished tables and continue partial ones where they stopped.
+
+        :param schema: The schema holding the manifest table, e.g. one outside the CDM
+            schema so the manifest stays out of DQD, Achilles and schema fingerprints.
+        :param table: Name of the manifest table.
+        """
+        self._schema = schema
+        self._table = f"{schema}.{table}"
+
+    async def ensure(self, pool) -> None:
+        """Create the manifest table, and its schema, if they do not exist."""
+        async with pool.connection() as conn:
+            await conn.execute(f"CREATE SCHEMA IF NOT EXISTS {self._schema}")
+            await conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self._table} ("
+                "table_name varchar(255) NOT NULL, "
+                "source_file varchar(1024) NOT NULL, "
+                "fingerprint varchar(64) NOT NULL, "
+                "completed boolean NOT NULL DEFAULT false, "
+                "ranges jsonb NOT NULL DEFAULT '[]', "
+                "updated_at timestamptz NOT NULL DEFAULT now(), "
+                "PRIMARY KEY (table_name, source_file))"
+            )
+
+    async def load(self, pool) -> Dict[Tuple[str, str], Checkpoint]:
+        """Return every checkpoint keyed by (table_name, source_file)."""
+        async with pool.connection() as conn:
+            cur = await conn.execute(
+                f"SELECT table_name, source_file, fingerprint, completed, ranges FROM {self._table}")
+            rows = await cur.fetchall()
+        checkpoints = {}
+        for table_name, source_file, fingerprint, completed, ranges in rows:
+            if isinstance(ranges, str):
+                ranges = json.loads(ranges)
+            checkpoints[(table_name, source_file)] = Checkpoint(
+                table_name, source_file, fingerprint, completed,
+                merge_ranges([tuple(r) for r in ranges]))
+        return checkpoints
+
+    async def start(self, pool, table_name: str, source_file: str, fingerprint: str) -> Checkpoint:
+        """Start a fresh checkpoint for a table, discarding any previous progress."""
+        return (await self.start_many(pool, table_name, [(source_file, fingerprint)]))[source_file]
+
+    async def start_many(self, pool, table_name: str, sources: List[Tuple[str, str]]) -> Dict[str, Checkpoint]:
+        """
+        Start fresh checkpoints for every shard of a table, discarding any previous progress.
+
+        :param sources: (source_file, fingerprint) of every shard.
+        :returns: source_file -> Checkpoint.
+        """
+        async with pool.connection() as conn:
+            await conn.execute(f"DELETE FROM {self._table} WHERE table_name = %s", (table_name,))
+            for source_file, fingerprint in sources:
+                await conn.execute(
+                    f"INSERT INTO {self._table} (table_name, source_file, fingerprint) VALUES (%s, %s, %s)",
+                    (table_name, source_file, fingerprint))
+        return {source_file: Checkpoint(table_name, source_file, fingerprint) for source_file, fingerprint in sources}
+
+    async def commit_range(self, conn, checkpoint: Checkpoint, start: int, end: int) -> None:
+        """
+        Record rows [start, end) as loaded. Runs on the caller's connection so it
+        commits or rolls back together with the chunk's COPY.
+        """
+        await conn.execute(
+            f"UPDATE {self._table} SET ranges = ranges || %s::jsonb, updated_at = now() "
+            "WHERE table_name = %s AND source_file = %s",
+            (json.dumps([[start, end]]), checkpoint.table_name, checkpoint.source_file))
+
+    async def complete(self, conn, checkpoint: Checkpoint) -> None:
+        """Mark a table as fully loaded, on the caller's connection."""
+        await conn.execute(
+            f"UPDATE {self._table} SET completed = true, updated_at = now() "
+            "WHERE table_name = %s AND source_file = %s",
+            (checkpoint.table_name, checkpoint.source_file))
+        checkpoint.completed = True
@@ -0,0 +1,141 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .schema_catalog import (TablePlan, INTEGER_TYPES, NUMERIC_TYPES,
+                             CHARACTER_TYPES, DATE_TYPES)
+
+_NAT = np.datetime64('NaT')
+
+
+def _present(series: pd.Series) -> np.ndarray:
+    """Mask of values that carry data, i.e. are neither null nor empty strings."""
+    present = series.notna().to_numpy(dtype=bool)
+    if not pd.api.types.is_numeric_dtype(series.dtype):
+        present = present & (series != '').to_numpy(dtype=bool)
+    return present
+
+
+def parse_yyyymmdd(series: pd.Series) -> Tuple[pd.Series, int]:
+    """
+    Parse YYYYMMDD dates with integer arithmetic on NumPy arrays.
+
+    Returns the parsed dates and the number of non-empty values that were not valid
+    dates and became null.
+    """
+    present = _present(series)
+    if pd.api.types.is_integer_dtype(series.dtype) and not series.hasnans:
+        values = series.to_numpy(dtype=np.int64)
+    else:
+        numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        values = np.nan_to_num(numbers, nan=0.0).astype(np.int64)
+
+    year, month, day = values // 10000, values // 100 % 100, values % 100
+    valid = (year >= 1) & (year <= 9999) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    # out-of-range parts are reset so the datetime arithmetic below cannot overflow
+    year, month, day = np.where(valid, year, 1970), np.where(valid, month, 1), np.where(valid, day, 1)
+    months = ((year - 1970) * 12 + (month - 1)).astype('datetime64[M]')
+    dates = months.astype('datetime64[D]') + (day - 1).astype('timedelta64[D]')
+    # a day past the end of its month (e.g. 20230231) rolls into the next month
+    valid &= dates.astype('datetime64[M]') == months
+    dates = np.where(valid, dates, _NAT).astype('datetime64[s]')
+    return pd.Series(dates, index=series.index), int(np.count_nonzero(present & ~valid))
+
+
+def _to_number(series: pd.Series, integer: bool) -> Tuple[pd.Series, int]:
+    if integer and pd.api.types.is_integer_dtype(series.dtype):
+        return series.astype('Int64'), 0
+    if not integer and pd.api.types.is_float_dtype(series.dtype):
+        return series, 0
+    present = _present(series)
+    converted = pd.to_numeric(series, errors='coerce')
+    coerced = int(np.count_nonzero(present & converted.isna().to_numpy()))
+    if integer:
+        converted = converted.astype('Int64')
+    return converted, coerced
+
+
+def _to_string(series: pd.Series, max_length: Optional[int]) -> Tuple[pd.Series, int]:
+    if series.hasnans:
+        series = series.fillna('')
+    # passing the series (not its dtype) checks the values of object columns
+    if not pd.api.types.is_string_dtype(series):
+        series = series.astype(str)
+    # only slice when a value actually exceeds the varchar limit
+    if max_length and len(series) and series.str.len().max() > max_length:
+        series = series.str.slice(0, max_length)
+    return series, 0
+
+
+class ConversionReport:
+    """Thread-safe tally of the values each column coerced to null."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._coerced: Dict[str, int] = {}
+        self.rows = 0
+
+    def add(self, rows: int, coerced: Dict[str, int]) -> None:
+        with self._lock:
+            self.rows += rows
+            for column, count in coerced.items():
+                if count:
+                    self._coerced[column] = self._coerced.get(column, 0) + count
+
+    def coerced(self) -> Dict[str, int]:
+        """Return column -> number of non-empty values coerced to null."""
+        with self._lock:
+            return dict(self._coerced)
+
+
+class TableConverter:
+    def __init__(self, plan: TablePlan):
+        """
+        Conversion engine compiled once per table from its plan.
+
+        Each column gets one vectorised operation chosen from its database type.
+        Already-typed columns pass through, strings are only sliced when they exceed
+        ``character_maximum_length``, and every value coerced to null is counted in
+        ``report`` instead of being dropped silently.
+
+        :param plan: The conversion plan of the target table.
+        """
+        self._plan = plan
+        self._ops: Dict[str, Callable[[pd.Series], Tuple[pd.Series, int]]] = {}
+        for column in plan.columns:
+            data_type = column.data_type
+            if data_type in INTEGER_TYPES:
+                self._ops[column.name] = lambda s: _to_number(s, True)
+            elif data_type in NUMERIC_TYPES:
+                self._ops[column.name] = lambda s: _to_number(s, False)
+            elif data_type in CHARACTER_TYPES:
+                self._ops[column.name] = lambda s, n=column.max_length: _to_string(s, n)
+            elif data_type in DATE_TYPES:
+                self._ops[column.name] = parse_yyyymmdd
+            elif data_type == 'logical':
+                self._ops[column.name] = lambda s: (s.astype(bool), 0)
+            elif data_type == 'complex':
+                self._ops[column.name] = lambda s: (s.astype(complex), 0)
+        self.report = ConversionReport()
+
+    def convert(self, frame: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Convert ``frame`` to the table's types, keeping only the table's columns.
+
+        :param frame: Raw chunk with lower-case column names.
+        :param columns: Columns to keep; defaults to every table column in the frame.
+        """
+        columns: List[str] = list(columns) if columns is not None else self._plan.select(frame.columns)
+        converted = {}
+        coerced = {}
+        for column in columns:
+            op = self._ops.get(column)
+            if op is None:
+                converted[column] = frame[column]
+            else:
+                converted[column], coerced[column] = op(frame[column])
+        self.report.add(len(frame), coerced)
+        # build the result once from the converted columns instead of copying the chunk
+        result = pd.DataFrame(converted, index=frame.index, columns=columns)
+        result.attrs['coerced_to_null'] = sum(coerced.values())
+        return result
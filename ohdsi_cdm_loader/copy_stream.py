@@ -0,0 +1,232 @@
+import io
+import csv
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Awaitable, Callable, Iterator, List, Optional, Tuple
+import pandas as pd
+from .sources import open_text, source_size
+from .schema_catalog import (TablePlan, INTEGER_TYPES, NUMERIC_TYPES,
+                             CHARACTER_TYPES, DATE_TYPES)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# COPY text format marker for NULL
+NULL = '\\N'
+# blocks normalised ahead of the COPY by the producer thread
+_BLOCKS_AHEAD = 2
+_DONE = object()
+
+
+@lru_cache(maxsize=None)
+def _athena_date(value: str) -> str:
+    """Turn an Athena YYYYMMDD date into ISO form; invalid dates become NULL."""
+    try:
+        return datetime.strptime(value, '%Y%m%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return NULL
+
+
+def _escape(value: str) -> str:
+    # only the backslash can survive the tab/newline split of a source line
+    return value.replace('\\', '\\\\') if '\\' in value else value
+
+
+def _integer(value: str) -> str:
+    return value if value.lstrip('-').isdigit() else NULL
+
+
+def _numeric(value: str) -> str:
+    try:
+        float(value)
+        return value
+    except ValueError:
+        return NULL
+
+
+def _date(value: str) -> str:
+    return _athena_date(value) if value else NULL
+
+
+def _other(value: str) -> str:
+    # timestamps, booleans and other typed columns reject '' but accept NULL
+    return _escape(value) if value else NULL
+
+
+def _character(max_length: Optional[int]) -> Callable[[str], str]:
+    # empty strings load as NULL, as they do through the pandas/CSV COPY path
+    if max_length:
+        return lambda value: _escape(value[:max_length]) if value else NULL
+    return lambda value: _escape(value) if value else NULL
+
+
+async def copy_dataframe(conn, table: str, data: pd.DataFrame) -> int:
+    """
+    COPY a converted data frame into ``table`` on an open async connection.
+
+    :param conn: An open psycopg AsyncConnection; the caller owns the transaction.
+    :param table: Schema-qualified target table.
+    :param data: Data frame whose columns match the target columns.
+    :returns: The number of rows written.
+    """
+    if data.empty:
+        return 0
+    with io.StringIO() as buffer:
+        data.to_csv(buffer, header=False, index=False)
+        payload = buffer.getvalue()
+    copy_query = f"COPY {table} ({','.join(data.columns)}) FROM STDIN WITH (FORMAT CSV)"
+    async with conn.cursor() as cur:
+        async with cur.copy(copy_query) as copy:
+            await copy.write(payload)
+    return len(data)
+
+
+class CopyStreamer:
+    def __init__(self, pool, schema: str, plan: TablePlan, block_rows: int = 50000):
+        """
+        Stream a raw vocabulary file into Postgres with COPY ... FROM STDIN, without pandas.
+
+        Each line is normalised only where the database would reject it: YYYYMMDD dates
+        become ISO dates, strings are cut to their varchar limit, non-numeric values in
+        numeric columns become NULL and columns unknown to the table are dropped.
+
+        :param pool: The shared async connection pool of the DatabaseHandler.
+        :param schema: The schema containing the target table.
+        :param plan: The conversion plan of the target table.
+        :param block_rows: Number of rows written to COPY per block.
+        """
+        self._pool = pool
+        self._schema = schema
+        self._plan = plan
+        self._block_rows = block_rows
+
+    def _normalisers(self, header: List[str]) -> Tuple[List[str], List[int], List[Callable[[str], str]]]:
+        """Resolve the source header into target columns, their positions and normalisers."""
+        positions = {name: i for i, name in enumerate(header)}
+        columns = self._plan.select(header)
+        funcs = []
+        for column in columns:
+            data_type = self._plan.types[column]
+            if data_type in INTEGER_TYPES:
+                funcs.append(_integer)
+            elif data_type in NUMERIC_TYPES:
+                funcs.append(_numeric)
+            elif data_type in DATE_TYPES:
+                funcs.append(_date)
+            elif data_type in CHARACTER_TYPES:
+                funcs.append(_character(self._plan.max_lengths[column]))
+            else:
+                funcs.append(_other)
+        return columns, [positions[c] for c in columns], funcs
+
+    def _records(self, handle, synthea: bool) -> Iterator[List[str]]:
+        if synthea:
+            yield from csv.reader(handle)
+        else:
+            # Athena files are unquoted TSV, so a plain split keeps quotes literal
+            for line in handle:
+                yield line.rstrip('\r\n').split('\t')
+
+    def _blocks(self, records: Iterator[List[str]], indices: List[int],
+                funcs: List[Callable[[str], str]]) -> Iterator[Tuple[str, int]]:
+        pairs = list(zip(indices, funcs))
+        width = max(indices) + 1 if indices else 0
+        lines = []
+        for record in records:
+            if len(record) < width:
+                record = record + [''] * (width - len(record))
+            lines.append('\t'.join([func(record[i]) for i, func in pairs]))
+            if len(lines) >= self._block_rows:
+                yield '\n'.join(lines) + '\n', len(lines)
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n', len(lines)
+
+    async def load(self, file_path: str, table_name: str, synthea: bool = False,
+                   progress: Optional[Callable[[int], None]] = None,
+                   before_copy: Optional[Callable[[object], Awaitable[None]]] = None,
+                   before_commit: Optional[Callable[[object], Awaitable[None]]] = None) -> dict:
+        """
+        Stream ``file_path`` into ``table_name`` in a single transaction.
+
+        Reading and normalising run on a worker thread, a few blocks ahead of the COPY, so
+        the event loop only awaits the writes and stays free for the other tables.
+
+        :param progress: Optional callback receiving the row count of every block written.
+        :param before_copy: Optional coroutine function run on the COPY connection, in
+            its transaction, before the COPY starts, e.g. to create a temporary table.
+        :param before_commit: Optional coroutine function run on the COPY connection
+            before the transaction commits, e.g. to record a checkpoint.
+        :returns: A dictionary with rows, bytes, seconds, rows_per_sec and mb_per_sec.
+        """
+        start = time.perf_counter()
+        size = source_size(file_path)
+        rows = 0
+        loop = asyncio.get_running_loop()
+        # one thread, so the generators are only ever advanced by it
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cdm-copy")
+        try:
+            handle = await loop.run_in_executor(executor, open_text, file_path)
+            with handle:
+                records = self._records(handle, synthea)
+                header = [name.strip().lower() for name in await loop.run_in_executor(executor, next, records, [])]
+                columns, indices, funcs = self._normalisers(header)
+                if not columns:
+                    raise ValueError(f"No columns of '{file_path}' match table '{table_name}'.")
+                blocks = self._blocks(records, indices, funcs)
+                queue: asyncio.Queue = asyncio.Queue(_BLOCKS_AHEAD)
+
+                async def produce():
+                    try:
+                        while True:
+                            block = await loop.run_in_executor(executor, next, blocks, _DONE)
+                            await queue.put(block)
+                            if block is _DONE:
+                                return
+                    except Exception as e:
+                        await queue.put(e)
+
+                copy_query = f"COPY {self._schema}.{table_name} ({','.join(columns)}) FROM STDIN"
+                producer = asyncio.create_task(produce())
+                try:
+                    async with self._pool.connection() as conn:
+                        if before_copy is not None:
+                            await before_copy(conn)
+                        async with conn.cursor() as cur:
+                            async with cur.copy(copy_query) as copy:
+                                while True:
+                                    item = await queue.get()
+                                    if item is _DONE:
+                                        break
+                                    if isinstance(item, Exception):
+                                        raise item
+                                    block, count = item
+                                    await copy.write(block)
+                                    rows += count
+                                    if progress is not None:
+                                        progress(count)
+                        if before_commit is not None:
+                            await before_commit(conn)
+                finally:
+                    producer.cancel()
+                    await asyncio.gather(producer, return_exceptions=True)
+        finally:
+            executor.shutdown(wait=True)
+
+        seconds = max(time.perf_counter() - start, 1e-9)
+        stats = {
+            'rows': rows,
+            'bytes': size,
+            'seconds': seconds,
+            'rows_per_sec': rows / seconds,
+            'mb_per_sec': size / 1e6 / seconds,
+        }
+        logging.info(
+            f"COPY engine loaded {rows} rows into '{self._schema}.{table_name}' in {seconds:.1f}s "
+            f"({stats['rows_per_sec']:,.0f} rows/s, {stats['mb_per_sec']:.1f} MB/s)."
+        )
+        return stats
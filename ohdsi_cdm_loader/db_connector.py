@@ -1,16 +1,41 @@
-from rpy2.robjects.packages import importr
-from rpy2.rinterface_lib.embedded import RRuntimeError
+import os
+import glob
 import logging
-from typing import Optional
+import tempfile
+from typing import Optional, Set
 import asyncio
 from pg_bulk_loader import PgConnectionDetail, batch_insert_to_postgres
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
+from .post_load import EXISTING_KEYS_QUERY, PostLoadBuilder, drop_statements, split_sql, statement_table
+from .ddl_cache import (DDLCache, SCHEMA_PLACEHOLDER, SchemaDiff, diff_schema, diff_statements,
+                        existing_columns, expected_columns, schema_fingerprint, substitute_schema)
+from .schema_catalog import SchemaCatalog
+from .metrics import MetricsRecorder
+
+# CommonDataModel writers for each part of the DDL
+DDL_WRITERS = {
+    'ddl': 'writeDdl',
+    'primary_keys': 'writePrimaryKeys',
+    'indices': 'writeIndex',
+    'foreign_keys': 'writeForeignKeys',
+}
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+
+def _r_error():
+    """Return rpy2's RRuntimeError, importing rpy2 only once an R call has been made."""
+    from rpy2.rinterface_lib.embedded import RRuntimeError
+    return RRuntimeError
+
+
 class DatabaseHandler:
     def __init__(self, dbms: Optional[str] = None , server: Optional[str] = None, user: Optional[str] = None, 
                  password: Optional[str] = None, database: Optional[str] = None, 
                  driver_path: Optional[str] = None, schema: Optional[str] = None, port: int=5432,
+                 pool_min_size: int=4, pool_max_size: int=20, pool_timeout: float=600.0,
+                 metrics: Optional[MetricsRecorder] = None, ddl_cache_dir: Optional[str] = None,
                  # Alias parameters
                  db_type: Optional[str] = None,
                  host: Optional[str] = None
@@ -25,7 +50,16 @@ class DatabaseHandler:
         :param database: The name of the database.
         :param driver_path: Path to the database driver.
         :param port: This defines the port of the database.
+        :param pool_min_size: Connections kept open in the shared bulk-load pool.
+        :param pool_max_size: Maximum connections in the shared bulk-load pool.
+        :param pool_timeout: Seconds a caller waits for a free pool connection.
+        :param metrics: Recorder of SQL call timings, shared with the CSVLoader; a new one when not given.
+        :param ddl_cache_dir: Folder of the rendered CDM DDL cache; ddl_cache.DEFAULT_CACHE_DIR when not given.
         :param db_connector: Database connector object.
+
+        SQL runs natively on a psycopg connection pool. The R packages DatabaseConnector
+        and CommonDataModel, and with them R and the JVM, are only loaded when the CDM DDL
+        is executed or rendered, or an R connection is asked for.
         """
      
 
@@ -51,14 +85,41 @@ class DatabaseHandler:
         self._password = password
         self._database = database
         self._driver_path = driver_path
-        self._db_connector = importr('DatabaseConnector')
+        self._r_packages = {}
         self._conn: Optional[object] = None
         self._conn_details: Optional[object] = None
-        self._common_data_model = importr('CommonDataModel')
         self._port = port
         self._schema = schema
+        self._pool_min_size = pool_min_size
+        self._pool_max_size = pool_max_size
+        self._pool_timeout = pool_timeout
+        self._pool: Optional[AsyncConnectionPool] = None
+        self._pool_loop: Optional[asyncio.AbstractEventLoop] = None
+        # schema-qualified tables whose triggers disable_foreign_key_checks turned off
+        self._disabled_triggers: Set[str] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._owns_loop = True
+        self.metrics = metrics if metrics is not None else MetricsRecorder()
+        self._ddl_cache = DDLCache(ddl_cache_dir)
         self.create_bulk_connection()
 
+    def _r_package(self, name: str) -> object:
+        """Import an R package through rpy2 on first use, starting R if it is not running yet."""
+        if name not in self._r_packages:
+            from rpy2.robjects.packages import importr
+            with self.metrics.timer('r.import'):
+                self._r_packages[name] = importr(name)
+            logging.info(f"R package '{name}' loaded.")
+        return self._r_packages[name]
+
+    @property
+    def _db_connector(self) -> object:
+        return self._r_package('DatabaseConnector')
+
+    @property
+    def _common_data_model(self) -> object:
+        return self._r_package('CommonDataModel')
+
     def create_bulk_connection(self):
         # Create Postgres Connection Details object. This will help in creating and managing the database connections 
         self.pg_conn_details = PgConnectionDetail(
@@ -73,6 +134,126 @@ class DatabaseHandler:
     def get_bulk_connection(self):
         return self.pg_conn_details
 
+    def get_conninfo(self) -> str:
+        """Return a libpq connection string for native psycopg connections."""
+        return make_conninfo(
+            host=self._server,
+            port=self._port,
+            dbname=self._database,
+            user=self._user,
+            password=self._password,
+            sslmode="prefer"
+        )
+
+    def run_async(self, coro):
+        """
+        Run a coroutine on the handler's long-lived event loop.
+
+        The shared connection pool is bound to this loop, so every bulk load that
+        should reuse it must be driven through this method rather than asyncio.run.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop, self._owns_loop = asyncio.new_event_loop(), True
+        return self._loop.run_until_complete(coro)
+
+    def share_loop(self, other: "DatabaseHandler") -> None:
+        """
+        Run this handler's coroutines on the event loop of ``other``, so the pools of both
+        can be used from one coroutine, e.g. a load fanned out to several databases. A pool
+        already opened on this handler's own loop is closed first. ``other`` owns the
+        loop; this handler's close() leaves it open.
+        """
+        if self._loop is not None and not self._loop.is_closed() and self._owns_loop:
+            if self._pool is not None and self._pool_loop is self._loop:
+                self._loop.run_until_complete(self.close_pool())
+            self._loop.close()
+        if other._loop is None or other._loop.is_closed():
+            other._loop, other._owns_loop = asyncio.new_event_loop(), True
+        self._loop, self._owns_loop = other._loop, False
+
+    async def get_pool(self) -> AsyncConnectionPool:
+        """
+        Return the shared async connection pool, opening it on first use.
+
+        :raises Exception: If the pool cannot be opened.
+        """
+        loop = asyncio.get_running_loop()
+        if self._pool is not None and self._pool_loop is not loop:
+            logging.warning("Connection pool was opened on another event loop; opening a new pool for this loop.")
+            old_pool, old_loop = self._pool, self._pool_loop
+            self._pool, self._pool_loop = None, None
+            await self._close_foreign_pool(old_pool, old_loop)
+        if self._pool is None:
+            try:
+                pool = AsyncConnectionPool(
+                    conninfo=self.get_conninfo(),
+                    min_size=self._pool_min_size,
+                    max_size=self._pool_max_size,
+                    timeout=self._pool_timeout,
+                    name=f"cdm-loader-{self._database}",
+                    open=False
+                )
+                await pool.open(wait=True)
+            except Exception as e:
+                raise Exception(f"Error opening the bulk-load connection pool: {e}")
+            self._pool, self._pool_loop = pool, loop
+            logging.info(f"Connection pool opened (min={self._pool_min_size}, max={self._pool_max_size}).")
+        return self._pool
+
+    @staticmethod
+    async def _close_foreign_pool(pool: AsyncConnectionPool, loop: asyncio.AbstractEventLoop) -> None:
+        """Close a pool on the event loop it was opened on, so its connections are not leaked."""
+        try:
+            if loop.is_closed():
+                raise RuntimeError("its event loop is already closed")
+            if loop.is_running():
+                await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(pool.close(), loop))
+            else:
+                # a loop cannot run inside this one; drive it from a worker thread
+                await asyncio.get_running_loop().run_in_executor(None, loop.run_until_complete, pool.close())
+            logging.info("Connection pool of the previous event loop closed.")
+        except Exception as e:
+            logging.warning(f"Could not close the connection pool of the previous event loop: {e}")
+
+    def pool_stats(self) -> dict:
+        """Return sizing and usage counters of the shared pool (empty if it is not open)."""
+        if self._pool is None:
+            return {}
+        stats = {'pool_min': self._pool_min_size, 'pool_max': self._pool_max_size}
+        stats.update(self._pool.get_stats())
+        return stats
+
+    def check_pool_health(self) -> dict:
+        """Validate the idle connections of the shared pool and return its statistics."""
+        async def check():
+            pool = await self.get_pool()
+            await pool.check()
+            return self.pool_stats()
+        return self.run_async(check())
+
+    async def close_pool(self) -> None:
+        """Close the shared pool, waiting for connections in use to be returned."""
+        if self._pool is not None:
+            await self._pool.close()
+            logging.info("Connection pool closed.")
+            self._pool, self._pool_loop = None, None
+
+    def close(self) -> None:
+        """Close the shared pool, the handler's event loop and the R connection, if one was opened."""
+        if self._loop is not None and not self._loop.is_closed():
+            if self._pool is not None and self._pool_loop is self._loop:
+                self._loop.run_until_complete(self.close_pool())
+            if self._owns_loop:
+                self._loop.close()
+        self._loop = None
+        if self._conn is not None:
+            try:
+                self._db_connector.disconnect(self._conn)
+                logging.info("Database connection closed.")
+            except _r_error() as e:
+                logging.warning(f"Could not close the database connection: {e}")
+            self._conn = None
+
     # Getters and Setters
     def get_dbms(self) -> str:
         """Get the database management system type."""
@@ -122,6 +303,10 @@ class DatabaseHandler:
         """Set the name of the database."""
         self._database = database
 
+    def get_schema(self) -> str:
+        """Get the CDM schema."""
+        return self._schema
+
     def get_driver_path(self) -> str:
         """Get the path to the database driver."""
         return self._driver_path
@@ -150,32 +335,88 @@ class DatabaseHandler:
         """Set the database schema."""
         self._schema = schema
 
-    def connect_to_db(self) -> object:
+    def connect_to_db(self) -> AsyncConnectionPool:
         """
-        Establish a connection to the database.
+        Open the native connection pool that every SQL call and bulk load uses.
+        R and the JVM are not started; see connect_r for a DatabaseConnector connection.
 
         :raises Exception: If there is an error creating the database connection.
         """
         try:
-            connection_details = self._db_connector.createConnectionDetails(
-                dbms=self._dbms,
-                server=f"{self._server}/{self._database}",
-                user=self._user,
-                password=self._password,
-                pathToDriver=self._driver_path,
-                port=self._port
-            )
-            self._conn = self._db_connector.connect(connection_details)
+            with self.metrics.timer('sql.connect'):
+                pool = self.run_async(self.get_pool())
             logging.info("Database connection established successfully.")
-            self.set_connect_details(connection_details)
+            return pool
+        except Exception as e:
+            raise Exception(f"Error creating database connection: {e}")
+
+    def connection_details(self) -> object:
+        """
+        Return the DatabaseConnector connection details, creating them on first use.
+        This imports DatabaseConnector and so starts R.
+
+        :raises Exception: If the connection details cannot be created.
+        """
+        if self._conn_details is None:
+            try:
+                self.set_connect_details(self._db_connector.createConnectionDetails(
+                    dbms=self._dbms,
+                    server=f"{self._server}/{self._database}",
+                    user=self._user,
+                    password=self._password,
+                    pathToDriver=self._driver_path,
+                    port=self._port
+                ))
+            except _r_error() as e:
+                raise Exception(f"Error creating database connection details: {e}")
+        return self._conn_details
+
+    def connect_r(self) -> object:
+        """
+        Open a DatabaseConnector (JDBC) connection, for callers that run R code against
+        the database themselves. The loader does not need one.
+
+        :raises Exception: If there is an error creating the database connection.
+        """
+        connection_details = self.connection_details()
+        try:
+            with self.metrics.timer('sql.connect_r'):
+                self._conn = self._db_connector.connect(connection_details)
+            logging.info("R database connection established successfully.")
             self.set_connection(self._conn)
             return self._conn
-            
-        except RRuntimeError as e:
+        except _r_error() as e:
             raise Exception(f"Error creating database connection: {e}")
         except Exception as e:
             raise Exception(f"An unexpected error occurred while creating the database connection: {e}")
 
+    def execute_sql(self, query: str, params: tuple = None) -> None:
+        """
+        Run one statement on a pooled connection and commit it.
+
+        :param query: The SQL statement.
+        :param params: Optional query parameters.
+        """
+        async def execute():
+            pool = await self.get_pool()
+            async with pool.connection() as conn:
+                await conn.execute(query, params)
+        self.run_async(execute())
+
+    def query_sql(self, query: str, params: tuple = None) -> list:
+        """
+        Run one query on a pooled connection and return its rows as tuples.
+
+        :param query: The SQL query.
+        :param params: Optional query parameters.
+        """
+        async def fetch():
+            pool = await self.get_pool()
+            async with pool.connection() as conn:
+                cur = await conn.execute(query, params)
+                return await cur.fetchall()
+        return self.run_async(fetch())
+
     def disable_foreign_key_checks(self, table) -> None:
         """
         Disable foreign key checks in the database.
@@ -183,22 +424,29 @@ class DatabaseHandler:
         :raises Exception: If there is an error disabling foreign key checks.
         """
         try:
-            # query = "SET session_replication_role = 'replica';"
+            # a table-level switch: session settings would only reach one pooled connection
             query = f"ALTER TABLE {self._schema}.{table} DISABLE TRIGGER ALL;"
-            self._db_connector.executeSql(self._conn, query)
+            with self.metrics.timer('sql.disable_triggers', table=table):
+                self.execute_sql(query)
+            self._disabled_triggers.add(f"{self._schema}.{table}")
             logging.info("Foreign key checks disabled.")
         except Exception as e:
             raise Exception(f"Failed to disable foreign key checks: {e}")
 
-    def enable_foreign_key_checks(self) -> None:
+    def enable_foreign_key_checks(self, table: Optional[str] = None) -> None:
         """
-        Enable foreign key checks in the database.
+        Enable foreign key checks in the database again.
 
+        :param table: The table whose triggers are enabled; by default every table
+            disable_foreign_key_checks disabled.
         :raises Exception: If there is an error enabling foreign key checks.
         """
+        tables = [f"{self._schema}.{table}"] if table else sorted(self._disabled_triggers)
         try:
-            query = "SET session_replication_role = 'origin';"
-            self._db_connector.executeSql(self._conn, query)
+            for name in tables:
+                with self.metrics.timer('sql.enable_triggers', table=name.split('.')[-1]):
+                    self.execute_sql(f"ALTER TABLE {name} ENABLE TRIGGER ALL;")
+                self._disabled_triggers.discard(name)
             logging.info("Foreign key checks enabled.")
         except Exception as e:
             raise Exception(f"Failed to enable foreign key checks: {e}")
@@ -213,31 +461,215 @@ class DatabaseHandler:
         """
         try:
             query = f"TRUNCATE {schema}.{table_name} CASCADE;"
-            self._db_connector.executeSql(self._conn, query)
+            with self.metrics.timer('sql.truncate', table=table_name):
+                self.execute_sql(query)
             logging.info(f"Table '{schema}.{table_name}' truncated successfully.")
         except Exception as e:
             raise Exception(f"Failed to truncate table '{schema}.{table_name}': {e}")
 
-    def execute_ddl(self, cdm_version: str) -> None:
+    def execute_ddl(self, cdm_version: str, execute_primary_keys: bool=True, execute_foreign_keys: bool=True) -> None:
         """
         Execute the Common Data Model (CDM) DDL script.
         :param cdm_version: The version of the CDM to execute.
-        :param cdm_database_schema: The database schema for the CDM.
+        :param execute_primary_keys: Also add the primary keys. Set to False to create bare tables.
+        :param execute_foreign_keys: Also add the foreign keys. Set to False to create bare tables.
         :raises Exception: If there is an error executing the CDM DDL.
         """
-        if not self._conn_details:
-            raise Exception("Connection details are not set. Connect to the database first.")
-
+        connection_details = self.connection_details()
         try:
-            self._common_data_model.executeDdl(
-                connectionDetails=self._conn_details,
-                cdmVersion=cdm_version,
-                cdmDatabaseSchema=self._schema
-            )
+            with self.metrics.timer('sql.execute_ddl'):
+                self._common_data_model.executeDdl(
+                    connectionDetails=connection_details,
+                    cdmVersion=cdm_version,
+                    cdmDatabaseSchema=self._schema,
+                    executePrimaryKey=execute_primary_keys,
+                    executeForeignKey=execute_foreign_keys
+                )
             logging.info("CDM DDL execution completed successfully.")
-        except RRuntimeError as e:
+        except _r_error() as e:
             raise Exception(f"Error executing CDM DDL: {e}")
+
+    def supports_ddl_split(self, cdm_version: Optional[str] = None) -> bool:
+        """
+        Return True if the tables, keys and indices can be rendered separately.
+        When every part of ``cdm_version`` is already in the DDL cache, this is settled
+        without importing CommonDataModel, so R is only started on a cache miss.
+        :param cdm_version: The version of the CDM whose cached parts are checked.
+        """
+        if cdm_version is not None and all(
+                self._ddl_cache.get(self._dbms, cdm_version, part, self._schema) is not None for part in DDL_WRITERS):
+            return True
+        return all(hasattr(self._common_data_model, writer) for writer in DDL_WRITERS.values())
+
+    def render_ddl(self, cdm_version: str, part: str) -> str:
+        """
+        Render one part of the CDM DDL for this database with CommonDataModel.
+        Rendered DDL is cached on disk per dialect and CDM version, so R is only started
+        the first time a part is rendered.
+        :param cdm_version: The version of the CDM to render.
+        :param part: One of 'ddl', 'primary_keys', 'indices' or 'foreign_keys'.
+        :raises Exception: If the part is unknown or cannot be rendered.
+        """
+        if part not in DDL_WRITERS:
+            raise Exception(f"Unknown DDL part '{part}', expected one of {list(DDL_WRITERS)}")
+        cached = self._ddl_cache.get(self._dbms, cdm_version, part, self._schema)
+        if cached is not None:
+            return cached
+        try:
+            with tempfile.TemporaryDirectory() as outputfolder, self.metrics.timer('sql.render_ddl'):
+                getattr(self._common_data_model, DDL_WRITERS[part])(
+                    targetDialect=self._dbms,
+                    cdmVersion=cdm_version,
+                    cdmDatabaseSchema=SCHEMA_PLACEHOLDER,
+                    outputfolder=outputfolder
+                )
+                files = glob.glob(os.path.join(outputfolder, '*.sql'))
+                if not files:
+                    raise Exception(f"CommonDataModel wrote no SQL for '{part}'")
+                with open(files[0], encoding='utf-8') as handle:
+                    sql = handle.read()
+        except (_r_error(), AttributeError) as e:
+            raise Exception(f"Error rendering CDM {part} for version {cdm_version}: {e}")
+        self._ddl_cache.put(self._dbms, cdm_version, part, sql)
+        return substitute_schema(sql, self._schema)
+
+    def schema_diff(self, cdm_version: str) -> SchemaDiff:
+        """
+        Compare the tables, columns and types of the schema with the CDM DDL.
+        A matching fingerprint settles it with one information_schema query.
+        :param cdm_version: The version of the CDM to compare with.
+        """
+        expected = expected_columns(self.render_ddl(cdm_version, 'ddl'))
+        with self.metrics.timer('sql.schema_fingerprint'):
+            existing = existing_columns(self.query_sql(SchemaCatalog.query(self._schema)))
+        if schema_fingerprint(existing, expected) == schema_fingerprint(expected):
+            return SchemaDiff()
+        return diff_schema(expected, existing)
+
+    def apply_ddl(self, cdm_version: str, execute_primary_keys: bool=True, execute_foreign_keys: bool=True) -> SchemaDiff:
+        """
+        Bring the schema up to the CDM DDL with as little work as possible.
+
+        A schema that already matches is left alone. Otherwise only the missing tables
+        (with their own primary and foreign keys) and missing columns are created, natively
+        on the pool from the cached DDL. Columns whose type differs are reported, never
+        altered. If this
+        CommonDataModel cannot render the DDL in parts, execute_ddl runs instead.
+        :param cdm_version: The version of the CDM to apply.
+        :param execute_primary_keys: Also add the primary keys of created tables.
+        :param execute_foreign_keys: Also add the foreign keys of created tables.
+        :returns: The difference that was found before applying.
+        :raises Exception: If a statement fails.
+        """
+        cached = self._ddl_cache.get(self._dbms, cdm_version, 'ddl', self._schema) is not None
+        if not cached and not self.supports_ddl_split():
+            self.execute_ddl(cdm_version, execute_primary_keys, execute_foreign_keys)
+            return SchemaDiff()
+
+        diff = self.schema_diff(cdm_version)
+        for table, columns in diff.changed_types.items():
+            for column, expected, actual in columns:
+                logging.warning(f"Column '{self._schema}.{table}.{column}' is {actual}, the CDM DDL expects {expected}.")
+        if diff.empty:
+            logging.info(f"Schema '{self._schema}' matches the CDM {cdm_version} DDL; skipping DDL.")
+            return diff
+
+        logging.info(f"Schema '{self._schema}' differs from the CDM {cdm_version} DDL: {diff}.")
+        ddl = self.render_ddl(cdm_version, 'ddl')
+        statements = diff_statements(ddl, diff, self._schema)
+        parts = [part for part, wanted in (('primary_keys', execute_primary_keys),
+                                           ('foreign_keys', execute_foreign_keys)) if wanted]
+        keys = {part: ';\n'.join(statement for statement in split_sql(self.render_ddl(cdm_version, part))
+                                 if statement_table(statement) in diff.missing_tables)
+                for part in parts}
+
+        async def apply():
+            pool = await self.get_pool()
+            async with pool.connection() as conn:
+                for statement in statements:
+                    await conn.execute(statement)
+            # the created tables are empty, so checking their foreign keys costs nothing
+            builder = PostLoadBuilder(pool, validate_foreign_keys=True)
+            await builder.build(primary_key_sql=keys.get('primary_keys', ''),
+                                foreign_key_sql=keys.get('foreign_keys', ''))
+
+        try:
+            with self.metrics.timer('sql.apply_ddl'):
+                self.run_async(apply())
+            logging.info(f"Applied {len(statements)} DDL statements to '{self._schema}'.")
+        except Exception as e:
+            raise Exception(f"Error applying CDM DDL: {e}")
+        return diff
+
+    def drop_constraints(self, cdm_version: str) -> int:
+        """
+        Drop the primary keys, foreign keys and indexes of the CDM tables, so a deferred
+        load into a schema built before runs into bare tables and build_constraints
+        creates them again afterwards. Tables outside the CDM DDL are left alone.
+        :param cdm_version: The version of the CDM whose tables are cleared.
+        :returns: The number of constraints and indexes dropped.
+        :raises Exception: If a constraint or index cannot be dropped, e.g. because a
+            foreign key of another schema references the key.
+        """
+        tables = set(expected_columns(self.render_ddl(cdm_version, 'ddl')))
+        records = [record for record in self.query_sql(EXISTING_KEYS_QUERY, (self._schema, self._schema))
+                   if record[0].lower() in tables]
+        statements = drop_statements(records, self._schema)
+        if not statements:
+            return 0
+
+        async def drop():
+            pool = await self.get_pool()
+            async with pool.connection() as conn:
+                for statement in statements:
+                    await conn.execute(statement)
+
+        try:
+            with self.metrics.timer('sql.drop_constraints'):
+                self.run_async(drop())
+            logging.info(f"Dropped {len(statements)} constraints and indexes from '{self._schema}' before a deferred load.")
+        except Exception as e:
+            raise Exception(f"Error dropping CDM constraints: {e}")
+        return len(statements)
+
+    def build_constraints(self, cdm_version: str, workers: int=4, maintenance_work_mem: str='1GB',
+                          validate_foreign_keys: bool=False) -> None:
+        """
+        Build the primary keys, indexes and foreign keys of the CDM after a bulk load.
+        Statements for different tables run in parallel on the shared pool.
+        :param cdm_version: The version of the CDM whose DDL is rendered.
+        :param workers: Maximum number of tables being indexed at the same time.
+        :param maintenance_work_mem: maintenance_work_mem used by each build statement.
+        :param validate_foreign_keys: Check existing rows when adding foreign keys.
+        :raises Exception: If a primary key, index or foreign key cannot be built.
+        """
+        primary_key_sql = self.render_ddl(cdm_version, 'primary_keys')
+        index_sql = self.render_ddl(cdm_version, 'indices')
+        foreign_key_sql = self.render_ddl(cdm_version, 'foreign_keys')
+
+        async def build():
+            builder = PostLoadBuilder(await self.get_pool(), workers=workers,
+                                      maintenance_work_mem=maintenance_work_mem,
+                                      validate_foreign_keys=validate_foreign_keys)
+            await builder.build(primary_key_sql, index_sql, foreign_key_sql)
+
+        try:
+            with self.metrics.timer('sql.build_constraints'):
+                self.run_async(build())
+            logging.info("CDM primary keys, indexes and foreign keys built successfully.")
+        except Exception as e:
+            raise Exception(f"Error building CDM constraints: {e}")
         
+    def table_exists(self, table_name: str) -> bool:
+        """
+        Check whether a table exists in the handler's schema.
+        :param table_name: The table to look for (case-insensitive).
+        """
+        with self.metrics.timer('sql.table_exists', table=table_name):
+            return bool(self.query_sql(
+                "SELECT 1 FROM information_schema.tables WHERE table_schema = %s AND lower(table_name) = lower(%s)",
+                (self._schema, table_name)))
+
     def create_cdm_schema(self, schema: str) -> None:
         """
         Create the Common Data Model (CDM) schema in the database.
@@ -246,7 +678,8 @@ class DatabaseHandler:
         """
         try:
             query = f"CREATE SCHEMA IF NOT EXISTS {schema};"
-            self._db_connector.executeSql(self._conn, query)
+            with self.metrics.timer('sql.create_schema'):
+                self.execute_sql(query)
             logging.info(f"CDM schema '{schema}' created successfully.")
         except Exception as e:
             raise Exception(f"Error creating CDM schema '{schema}': {e}")
\ No newline at end of file
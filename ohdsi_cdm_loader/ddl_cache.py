@@ -0,0 +1,224 @@
+import os
+import re
+import json
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+from .post_load import split_sql
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ohdsi_cdm_loader', 'ddl')
+
+# DDL is rendered for this schema and cached; the real schema is substituted on read
+SCHEMA_PLACEHOLDER = 'cdm_ddl_schema'
+
+_CREATE_TABLE = re.compile(r'^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w."]+)\s*\((.*)\)\s*$',
+                           re.IGNORECASE | re.DOTALL)
+_COLUMN = re.compile(r'^\s*"?(\w+)"?\s+(\w+(?:\s+varying|\s+precision)?(?:\s*\(\s*[\w\s,]+\))?'
+                     r'(?:\s+(?:with|without)\s+time\s+zone)?)(.*)$', re.IGNORECASE | re.DOTALL)
+
+# rendered DDL type -> information_schema.columns.data_type
+_TYPE_NAMES = {
+    'int': 'integer', 'int4': 'integer', 'integer': 'integer',
+    'bigint': 'bigint', 'int8': 'bigint', 'smallint': 'smallint', 'int2': 'smallint',
+    'varchar': 'character varying', 'character varying': 'character varying',
+    'char': 'character', 'character': 'character',
+    'text': 'text', 'date': 'date',
+    'timestamp': 'timestamp without time zone', 'datetime': 'timestamp without time zone',
+    'timestamp without time zone': 'timestamp without time zone',
+    'timestamp with time zone': 'timestamp with time zone',
+    'numeric': 'numeric', 'decimal': 'numeric', 'float': 'double precision',
+    'double precision': 'double precision', 'real': 'real', 'boolean': 'boolean',
+}
+
+# table -> [(column, data_type, character_maximum_length)], as information_schema reports them
+TableColumns = Dict[str, List[Tuple[str, str, Optional[int]]]]
+
+
+def normalise_type(ddl_type: str) -> Tuple[str, Optional[int]]:
+    """Map a DDL column type such as 'varchar(50)' to its information_schema name and length."""
+    match = re.match(r'^\s*([a-z ]+?)\s*(?:\(\s*(\w+)\s*(?:,\s*\w+\s*)?\))?\s*$', ddl_type.lower())
+    if not match:
+        return ddl_type.lower(), None
+    name, length = match.group(1), match.group(2)
+    data_type = _TYPE_NAMES.get(name, name)
+    if data_type in ('character varying', 'character') and length and length.isdigit():
+        return data_type, int(length)
+    if data_type == 'character varying' and length:
+        # varchar(max) renders as unlimited text
+        return 'text', None
+    return data_type, None
+
+
+def substitute_schema(sql: str, schema: str) -> str:
+    """Replace SCHEMA_PLACEHOLDER in DDL rendered for it with ``schema``."""
+    return re.sub(rf'\b{SCHEMA_PLACEHOLDER}\.', f'{schema}.', sql)
+
+
+def _split_columns(body: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    for char in body:
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        if char == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _table_name(name: str) -> str:
+    return name.replace('"', '').split('.')[-1].lower()
+
+
+def parse_create_tables(ddl_sql: str) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Return the column definitions of every CREATE TABLE in a rendered DDL script.
+
+    :returns: table -> [(column, column definition as rendered)], in column order.
+    """
+    tables: Dict[str, List[Tuple[str, str]]] = {}
+    for statement in split_sql(ddl_sql):
+        match = _CREATE_TABLE.match(statement)
+        if not match:
+            continue
+        columns = []
+        for definition in _split_columns(match.group(2)):
+            column = _COLUMN.match(definition)
+            if column and column.group(1).upper() not in ('CONSTRAINT', 'PRIMARY', 'UNIQUE', 'FOREIGN', 'CHECK'):
+                columns.append((column.group(1).lower(), definition))
+        tables[_table_name(match.group(1))] = columns
+    return tables
+
+
+def expected_columns(ddl_sql: str) -> TableColumns:
+    """Return the columns the DDL creates, in the shape information_schema reports them."""
+    expected: TableColumns = {}
+    for table, columns in parse_create_tables(ddl_sql).items():
+        expected[table] = [(name, *normalise_type(_COLUMN.match(definition).group(2))) for name, definition in columns]
+    return expected
+
+
+def existing_columns(records: Iterable[tuple]) -> TableColumns:
+    """Group information_schema rows of (table, column, data_type, max_length) by table."""
+    existing: TableColumns = {}
+    for table_name, column_name, data_type, max_length in records:
+        length = int(max_length) if max_length is not None and max_length == max_length else None
+        existing.setdefault(table_name.lower(), []).append((column_name.lower(), data_type, length))
+    return existing
+
+
+def schema_fingerprint(columns: TableColumns, tables: Iterable[str] = None) -> str:
+    """Hash the tables, columns and types of a schema, optionally only of ``tables``."""
+    names = sorted(columns if tables is None else set(tables))
+    canonical = [[table, sorted(columns.get(table, []))] for table in names]
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()
+
+
+@dataclass
+class SchemaDiff:
+    """What an existing schema lacks compared with the CDM DDL."""
+    missing_tables: List[str] = field(default_factory=list)
+    missing_columns: Dict[str, List[str]] = field(default_factory=dict)
+    # table -> [(column, expected type, actual type)]; reported, never altered
+    changed_types: Dict[str, List[Tuple[str, tuple, tuple]]] = field(default_factory=dict)
+
+    @property
+    def empty(self) -> bool:
+        return not self.missing_tables and not self.missing_columns
+
+    def __str__(self) -> str:
+        if self.empty and not self.changed_types:
+            return 'schema matches the DDL'
+        parts = []
+        if self.missing_tables:
+            parts.append(f"{len(self.missing_tables)} missing tables ({', '.join(self.missing_tables)})")
+        if self.missing_columns:
+            parts.append(f"{sum(map(len, self.missing_columns.values()))} missing columns in "
+                         f"{', '.join(sorted(self.missing_columns))}")
+        if self.changed_types:
+            parts.append(f"type differences in {', '.join(sorted(self.changed_types))}")
+        return '; '.join(parts)
+
+
+def diff_schema(expected: TableColumns, existing: TableColumns) -> SchemaDiff:
+    """Compare the columns the DDL creates with the columns that exist."""
+    diff = SchemaDiff()
+    for table, columns in expected.items():
+        if table not in existing:
+            diff.missing_tables.append(table)
+            continue
+        actual = {name: (data_type, length) for name, data_type, length in existing[table]}
+        for name, data_type, length in columns:
+            if name not in actual:
+                diff.missing_columns.setdefault(table, []).append(name)
+            elif actual[name] != (data_type, length):
+                diff.changed_types.setdefault(table, []).append((name, (data_type, length), actual[name]))
+    return diff
+
+
+def diff_statements(ddl_sql: str, diff: SchemaDiff, schema: str) -> List[str]:
+    """
+    Return the statements that close a schema diff: the CREATE TABLE of every missing
+    table and an ADD COLUMN for every missing column. Added columns drop NOT NULL, as
+    the table may already hold rows.
+    """
+    statements = [statement for statement in split_sql(ddl_sql)
+                  if _CREATE_TABLE.match(statement)
+                  and _table_name(_CREATE_TABLE.match(statement).group(1)) in diff.missing_tables]
+    definitions = parse_create_tables(ddl_sql)
+    for table, names in diff.missing_columns.items():
+        for name, definition in definitions[table]:
+            if name in names:
+                nullable = re.sub(r'\bNOT\s+NULL\b', 'NULL', definition, flags=re.IGNORECASE)
+                statements.append(f"ALTER TABLE {schema}.{table} ADD COLUMN IF NOT EXISTS {nullable}")
+    return statements
+
+
+class DDLCache:
+    def __init__(self, folder: Optional[str] = None):
+        """
+        Rendered CDM DDL on disk, one file per dialect, CDM version and part, so only
+        the first run renders it with CommonDataModel (and starts R for it).
+
+        DDL is rendered for SCHEMA_PLACEHOLDER and the schema is substituted on read, so
+        one cache serves every schema.
+
+        :param folder: Cache folder; DEFAULT_CACHE_DIR when not given.
+        """
+        self._folder = folder or DEFAULT_CACHE_DIR
+
+    def path(self, dialect: str, cdm_version: str, part: str) -> str:
+        """Return the cache file of one rendered DDL part."""
+        return os.path.join(self._folder, f"{dialect.lower()}-{cdm_version}-{part}.sql")
+
+    def get(self, dialect: str, cdm_version: str, part: str, schema: str) -> Optional[str]:
+        """Return the cached DDL for ``schema``, or None if it was never rendered."""
+        path = self.path(dialect, cdm_version, part)
+        try:
+            with open(path, encoding='utf-8') as handle:
+                sql = handle.read()
+        except OSError:
+            return None
+        return substitute_schema(sql, schema)
+
+    def put(self, dialect: str, cdm_version: str, part: str, sql: str) -> None:
+        """Store DDL rendered for SCHEMA_PLACEHOLDER. Failing to write only costs a re-render."""
+        path = self.path(dialect, cdm_version, part)
+        try:
+            os.makedirs(self._folder, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._folder, prefix='.ddl-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+                handle.write(sql)
+            os.replace(tmp_path, path)
+            logging.info(f"Cached rendered DDL in '{path}'.")
+        except OSError as e:
+            logging.warning(f"Could not cache rendered DDL in '{path}': {e}")
@@ -0,0 +1,124 @@
+import time
+import logging
+from typing import Dict, Optional, Sequence
+from .schema_catalog import TablePlan
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# natural key of every Athena vocabulary table, used to match a release against the loaded rows
+NATURAL_KEYS: Dict[str, tuple] = {
+    'concept': ('concept_id',),
+    'vocabulary': ('vocabulary_id',),
+    'domain': ('domain_id',),
+    'concept_class': ('concept_class_id',),
+    'relationship': ('relationship_id',),
+    'concept_relationship': ('concept_id_1', 'concept_id_2', 'relationship_id'),
+    'concept_ancestor': ('ancestor_concept_id', 'descendant_concept_id'),
+    'concept_synonym': ('concept_id', 'concept_synonym_name', 'language_concept_id'),
+    'drug_strength': ('drug_concept_id', 'ingredient_concept_id'),
+}
+
+
+def _match(keys: Sequence[str], left: str, right: str) -> str:
+    return ' AND '.join(f"{left}.{key} = {right}.{key}" for key in keys)
+
+
+class DeltaRefresh:
+    def __init__(self, pool, schema: str, plan: TablePlan, keys: Optional[Sequence[str]] = None,
+                 suffix: str = '__delta'):
+        """
+        Apply a new vocabulary release to a loaded table as a diff.
+
+        The release is loaded into an UNLOGGED staging table next to the target, so the
+        load itself writes no WAL. ``apply`` first keeps one staged row per natural key, as
+        some Athena files repeat a key, then matches both tables on it and, in one transaction, deletes rows missing from the release, updates rows whose
+        other columns changed and inserts new rows. Unchanged rows are never rewritten.
+
+        :param pool: The shared async connection pool of the DatabaseHandler.
+        :param schema: The schema containing the target table.
+        :param plan: The conversion plan of the target table.
+        :param keys: Natural key columns; defaults to NATURAL_KEYS for the table.
+        :param suffix: Suffix of the staging table name.
+        :raises ValueError: If the table has no known natural key.
+        """
+        keys = tuple(keys) if keys is not None else NATURAL_KEYS.get(plan.table)
+        if not keys:
+            raise ValueError(f"No natural key known for table '{plan.table}'.")
+        unknown = [key for key in keys if key not in plan.types]
+        if unknown:
+            raise ValueError(f"Natural key columns {unknown} are not in table '{plan.table}'.")
+        self._pool = pool
+        self._schema = schema
+        self._plan = plan
+        self._keys = keys
+        self.staging = f"{plan.table}{suffix}"
+
+    @property
+    def _target(self) -> str:
+        return f"{self._schema}.{self._plan.table}"
+
+    @property
+    def _staged(self) -> str:
+        return f"{self._schema}.{self.staging}"
+
+    async def prepare(self) -> None:
+        """(Re)create the empty staging table with the target's columns."""
+        async with self._pool.connection() as conn:
+            await conn.execute(f"DROP TABLE IF EXISTS {self._staged}")
+            await conn.execute(f"CREATE UNLOGGED TABLE {self._staged} (LIKE {self._target} INCLUDING DEFAULTS)")
+
+    async def apply(self) -> Dict[str, int]:
+        """
+        Apply the staged release to the target table in one transaction.
+
+        :returns: The number of staged duplicates dropped, and of rows deleted, updated
+            and inserted.
+        """
+        start = time.perf_counter()
+        columns = self._plan.column_names
+        values = [column for column in columns if column not in self._keys]
+        column_list = ', '.join(columns)
+        counts = {}
+        async with self._pool.connection() as conn:
+            # a repeated key would insert twice and update in no particular order; the lowest row wins
+            order = f" ORDER BY {', '.join(values)}" if values else ''
+            cur = await conn.execute(
+                f"DELETE FROM {self._staged} s USING (SELECT ctid, row_number() OVER "
+                f"(PARTITION BY {', '.join(self._keys)}{order}) AS n FROM {self._staged}) d "
+                f"WHERE s.ctid = d.ctid AND d.n > 1")
+            counts['duplicates'] = cur.rowcount
+            if counts['duplicates']:
+                logging.warning(f"'{self.staging}' repeats natural keys; dropped {counts['duplicates']} staged rows.")
+            await conn.execute(f"CREATE INDEX ON {self._staged} ({', '.join(self._keys)})")
+            await conn.execute(f"ANALYZE {self._staged}")
+            async with conn.transaction():
+                cur = await conn.execute(
+                    f"DELETE FROM {self._target} t WHERE NOT EXISTS "
+                    f"(SELECT 1 FROM {self._staged} s WHERE {_match(self._keys, 's', 't')})")
+                counts['deleted'] = cur.rowcount
+                if values:
+                    assignments = ', '.join(f"{column} = s.{column}" for column in values)
+                    changed = (f"({', '.join('t.' + c for c in values)}) IS DISTINCT FROM "
+                               f"({', '.join('s.' + c for c in values)})")
+                    cur = await conn.execute(
+                        f"UPDATE {self._target} t SET {assignments} FROM {self._staged} s "
+                        f"WHERE {_match(self._keys, 't', 's')} AND {changed}")
+                    counts['updated'] = cur.rowcount
+                else:
+                    counts['updated'] = 0
+                cur = await conn.execute(
+                    f"INSERT INTO {self._target} ({column_list}) "
+                    f"SELECT {', '.join('s.' + c for c in columns)} FROM {self._staged} s WHERE NOT EXISTS "
+                    f"(SELECT 1 FROM {self._target} t WHERE {_match(self._keys, 't', 's')})")
+                counts['inserted'] = cur.rowcount
+        logging.info(
+            f"Delta applied to '{self._target}' in {time.perf_counter() - start:.1f}s: "
+            f"{counts['deleted']} deleted, {counts['updated']} updated, {counts['inserted']} inserted."
+        )
+        return counts
+
+    async def discard(self) -> None:
+        """Drop the staging table."""
+        async with self._pool.connection() as conn:
+            await conn.execute(f"DROP TABLE IF EXISTS {self._staged}")
@@ -1,33 +1,77 @@
 import os
-import pandas as pd
-import rpy2.robjects as robjs
-from rpy2.robjects.packages import importr
-from rpy2.rinterface_lib.embedded import RRuntimeError
 from .db_connector import DatabaseHandler
+from .schema_catalog import SchemaCatalog, TablePlan
+from .r_bridge import ArrowBridge
+from .copy_stream import CopyStreamer, copy_dataframe
+from .scheduler import TableScheduler
+from .pipeline import Chunk, ChunkPipeline
+from .readers import READERS, ArrowCSVReader, pandas_chunks, read_header
+from .conversion import TableConverter
+from .checkpoint import Checkpoint, CheckpointManifest, file_fingerprint, uncommitted_mask
+from .delta import NATURAL_KEYS, DeltaRefresh
+from .staging import StagingSwap
+from .upsert import PRIMARY_KEY_QUERY, UpsertMerge, primary_keys
+from .metrics import Measurement
+from .parallel_load import ByteRangeLoader, RANGE_BYTES
+from .parsed_cache import ParsedCache
+from .sizing import BatchSizer, ChunkSizer, parse_size, source_bytes_per_row
+from .sources import SourceFile, discover_shards, discover_sources, readable, source_name, source_size
+from .verify import LoadVerifier, VerificationReport
 import logging
 import time
 import asyncio
-import pyarrow.feather as feather
-from pg_bulk_loader import PgConnectionDetail, batch_insert_to_postgres
-from tqdm import tqdm
+from contextlib import nullcontext
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
+LOAD_ENGINES = ('pandas', 'copy', 'parallel')
+# how a load treats the rows already in a table
+WRITE_MODES = ('truncate', 'delta', 'staging', 'append', 'upsert')
+
 # Set the event loop policy to WindowsSelectorEventLoopPolicy if using Windows
 if hasattr(asyncio, 'WindowsSelectorEventLoopPolicy'):
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 class CSVLoader:
-    def __init__(self, conn=None, db_handler=None, 
+    def __init__(self, conn=None, db_handler=None, r_bridge: str='memory',
+                 queue_depth: int=2, convert_workers: int=2, insert_workers: int=2, reader: str='pandas',
+                 max_memory=None, targets: list=None, cache_dir: str=None, cache_size=None,
+                 parallel_workers: int=None, checkpoint_schema: str=None,
                  # Alias parameters to match documentation
                  db_connection=None, database_handler=None):
         """
         Initialize the CSVLoader class.
 
         Args:
-            conn (object): Database connection object.
+            conn (object): Database connection object, as returned by connect_to_db. Optional:
+                every query runs on the handler's connection pool.
             db_handler (object): Database handler object.
+            r_bridge (str): How data frames move between R and Python in r2p_convert: 'memory'
+                uses Arrow IPC buffers, 'disk' uses temporary feather files. R is only started
+                if r2p_convert is called.
+            queue_depth (int): Chunks allowed to wait between the read, convert and insert stages.
+            convert_workers (int): Chunks converted concurrently in worker threads.
+            insert_workers (int): Chunks inserted concurrently on the event loop.
+            reader (str): CSV reader backend, 'pandas' or 'arrow' (multi-threaded, typed
+                from the schema catalog).
+            max_memory (str | int): Memory budget for the chunks in flight, e.g. '2GB'. Chunk
+                sizes then follow the measured bytes per row and batch sizes the measured
+                insert latency; the chunk_size and batch_size arguments only seed them.
+            targets (list): Further DatabaseHandlers loaded from the same files, e.g. the test
+                and results schemas next to dev. Every chunk is read and converted once and
+                inserted into all targets concurrently. A target that fails is dropped for the
+                rest of the run while the others carry on; load_all_csvs then raises naming it.
+            cache_dir (str): Folder caching the converted chunks of every file as typed Arrow
+                IPC, keyed by the file's fingerprint, the schema and the table's types. Files
+                that did not change since are memory-mapped from the cache instead of being
+                parsed and converted again. Not used by the 'copy' engine.
+            cache_size (str | int): Size limit of the cache, e.g. '20GB'; the least recently
+                used files are evicted beyond it.
+            parallel_workers (int): Worker processes of a table loaded with the 'parallel'
+                engine; one per CPU when not given.
+            checkpoint_schema (str): Schema of the checkpoint manifest written by resumable
+                loads; the CDM schema when not given.
             
             # Documentation aliases
             db_connection (object): Alias for conn - Database connection object.
@@ -38,204 +82,840 @@ class CSVLoader:
         db_handler = database_handler if db_handler is None else db_handler
         
         # Check for required parameters
-        if conn is None or db_handler is None:
-            missing = []
-            if conn is None: missing.append("conn/db_connection")
-            if db_handler is None: missing.append("db_handler/database_handler")
-            raise ValueError(f"Missing required parameters: {', '.join(missing)}")
+        if db_handler is None:
+            raise ValueError("Missing required parameters: db_handler/database_handler")
         
+        if reader not in READERS:
+            raise ValueError(f"Unknown reader '{reader}', expected one of {READERS}")
+
         self.conn = conn
         self.schema = db_handler._schema
         self.db_connect = db_handler
-        self.db_con = importr('DatabaseConnector')
-        self.db_connector = self.db_connect.get_db_connector()
-        self._arrow = importr('arrow')
+        self._bridge = ArrowBridge(method=r_bridge)
         self._bulk_conn = db_handler.get_bulk_connection()
-        self._character = {}
-        
+        self._catalog: SchemaCatalog = None
+        self._scheduler: TableScheduler = None
+        self._pipeline = ChunkPipeline(queue_depth, convert_workers, insert_workers)
+        self._reader = reader
+        self._converters = {}
+        self._primary_keys = {}
+        # the handler first: it owns the catalog, the manifest and the event loop
+        self._targets = [db_handler] + list(targets or [])
+        for target in self._targets[1:]:
+            target.share_loop(db_handler)
+        self._failed_targets = {}
+        # target -> table -> rows inserted
+        self.target_rows = {}
+        self._max_memory = parse_size(max_memory)
+        # tables sharing the memory budget, set by load_all_csvs
+        self._memory_share = 1
+        self._manifest = CheckpointManifest(checkpoint_schema or self.schema)
+        self._cache = ParsedCache(cache_dir, parse_size(cache_size)) if cache_dir else None
+        self._parallel_workers = parallel_workers or os.cpu_count() or 1
+        # one recorder per run, shared with the handler's SQL calls
+        self.metrics = db_handler.metrics
+
+    def load_schema_catalog(self, refresh: bool=False) -> SchemaCatalog:
+        """
+        Fetch the column metadata for every table in the schema with a single query.
+        The catalog is cached on the loader and reused by every chunk.
+
+        Args:
+            refresh (bool): Re-query the database even if a catalog is cached.
+
+        Returns:
+            SchemaCatalog: The cached catalog.
+        """
+        if self._catalog is None or refresh:
+            with self.metrics.timer('metadata_query') as measurement:
+                result = self.db_connect.query_sql(SchemaCatalog.query(self.schema))
+                self._catalog = SchemaCatalog.from_records(self.schema, result)
+                measurement.rows = len(result)
+        return self._catalog
+
     def r2p_convert(self, rdf: object, direction: str) -> object:
         """
-        Compare the data frame columns with the database schema and convert columns as necessary.
+        Convert a data frame between R and Python through the Arrow bridge.
 
         Args:
-            rdf (object): R data frame to be compared and converted.
-            schema_dict (dict): Dictionary containing column names and expected data types.
+            rdf (object): R data frame ('to_python') or pandas data frame ('to_r').
+            direction (str): Either 'to_python' or 'to_r'.
 
         Returns:
-            object: The modified R data frame with converted data types.
+            object: The converted data frame.
         """
         if direction == 'to_python':
-             self._arrow.write_feather(rdf, 'temp.feather')
-             rdf = feather.read_feather('temp.feather')
+            rdf = self._bridge.to_python(rdf)
         elif direction == 'to_r':
-            feather.write_feather(rdf, 'temp.feather')
-            rdf = self._arrow.read_feather('temp.feather')
+            rdf = self._bridge.to_r(rdf)
         return rdf
 
-    def check_data_types(self, rdf: object, result_schema, similar_columns) -> None:
+    def converter(self, table: str) -> TableConverter:
+        """Return the conversion engine of a table, compiling it from the catalog on first use."""
+        key = table.lower()
+        if key not in self._converters:
+            self._converters[key] = TableConverter(self.load_schema_catalog().plan(key))
+        return self._converters[key]
+
+    def check_data_types(self, rdf: object, plan: TablePlan, similar_columns,
+                         converter: TableConverter=None) -> None:
         """
         Check the data types of the columns in the data frame and convert them as necessary.
+        Conversion is done by ``converter``, or by the table's precompiled TableConverter
+        when none is given.
         """
-        similar_columns = list(similar_columns)
-        # Select only the similar columns from the R data frame
-        new_rdf = rdf[similar_columns].copy()
-
-        # Iterate through each column to convert based on the database schema
-        for column in similar_columns:
-            if result_schema[column] in ['integer', 'bigint', 'smallint']:
-                new_rdf[column] = pd.to_numeric(new_rdf[column], errors='coerce').astype('Int64')
-            if result_schema[column] in ['numeric']:
-                new_rdf[column] = pd.to_numeric(new_rdf[column], errors='coerce')
-            if result_schema[column] in ['character','character varying']:
-                new_rdf[column] = new_rdf[column].fillna('').astype(str)
-                new_rdf[column] = new_rdf[column].str[:int(self._character[column])]
-            elif result_schema[column] in ['date', 'Date']:
-                new_rdf[column] = pd.to_datetime(new_rdf[column], format='%Y%m%d', errors='coerce')
-            elif result_schema[column] == 'logical':
-                new_rdf[column] = new_rdf[column].astype(bool)
-            elif result_schema[column] == 'complex':
-                new_rdf[column] = new_rdf[column].astype(complex)
-        return new_rdf
+        converter = converter or self.converter(plan.table)
+        with self.metrics.timer('check_data_types', plan.table, rows=len(rdf)) as measurement:
+            converted = converter.convert(rdf, similar_columns)
+            measurement.nulls = converted.attrs.get('coerced_to_null', 0)
+        return converted
     
-    def compare_and_convert(self, rdf: object, table: str):
+    def compare_and_convert(self, rdf: object, table: str, converter: TableConverter=None):
         """
         Compare the data frame columns with the database schema and convert columns as necessary
         rdf: R data frame to be compared and converted.
         table: table name to compare the schema with
+        converter: conversion engine whose report counts the values coerced to null, e.g. one
+            per loaded file; the table's shared converter by default
         """
-        # get the data type for the table, including the columns
-        query = f"SELECT column_name, data_type, character_maximum_length FROM information_schema.columns WHERE table_name = '{table}' and table_schema = '{self.schema}'"
-        result = self.db_con.querySql(
-            connection=self.conn,
-            sql=query)
-        
-        result = self.r2p_convert(result, 'to_python')
-        # create a dictionary of the columns and their data types
-        result_schema = dict(zip(result['COLUMN_NAME'], result['DATA_TYPE']))
-        self._character = dict(zip(result['COLUMN_NAME'], result['CHARACTER_MAXIMUM_LENGTH']))
-        # drop all rows without value.
-        rdf = rdf.dropna(axis=1, how='all')
-        required_columns = set(result_schema.keys())
-        dataframe_columns = set(rdf.columns)
-        # similar_columns 
-        similar_columns = required_columns.intersection(dataframe_columns)
-
-        return self.check_data_types(rdf, result_schema, similar_columns)
+        with self.metrics.timer('compare_and_convert', table, rows=len(rdf)):
+            # the column types come from the catalog, which is fetched once per run
+            plan = self.load_schema_catalog().plan(table)
+            # similar_columns, in database column order; unknown columns are dropped
+            similar_columns = plan.select(rdf.columns)
+
+            return self.check_data_types(rdf, plan, similar_columns, converter)
     
-    async def bulk_load_data(self, batch_size, data, table_name, max_pool_size: int=20, min_pool_size:int=20):
+    async def bulk_load_data(self, batch_size, data, table_name, max_pool_size: int=20, min_pool_size:int=20,
+                             checkpoint: Checkpoint=None, source_range: tuple=None, batch_sizer: BatchSizer=None,
+                             merge: UpsertMerge=None, db_handler: DatabaseHandler=None):
         """ bulk load data into database
         Args:
             batch_size: int representing batches
             data: pandas dataframe represent the dataframe data to be loaded.
             table_name: string representing the table name.
-            max_pool_size: int
-            min_pool_size: int
+            max_pool_size: int, unused; the shared pool is sized by the DatabaseHandler.
+            min_pool_size: int, unused; the shared pool is sized by the DatabaseHandler.
+            checkpoint (Checkpoint): When given, every batch is written on one connection and
+                ``source_range`` is recorded in the manifest in the same transaction.
+            source_range (tuple): The (start, end) source rows ``data`` was read from.
+            batch_sizer (BatchSizer): When given, overrides batch_size and learns from the
+                latency of every batch.
+            merge (UpsertMerge): When given, every batch is merged into the table through a
+                temporary table instead of being COPied into it.
+            db_handler (DatabaseHandler): Target written to; the loader's handler by default.
         """    
-        # Calculate the total number of batches using the provided batch size
-        num_batches = (len(data) + batch_size - 1) // batch_size
-
-        # Insert data into the database in batches with progress tracking
-        for i in tqdm(range(num_batches), desc="Inserting batches into database"):
-            start_idx = i * batch_size
-            end_idx = min(start_idx + batch_size, len(data))
-            batch_data = data.iloc[start_idx:end_idx]
-
-            # Insert each batch into the database
-            await batch_insert_to_postgres(
-                pg_conn_details=self._bulk_conn,
-                table_name=table_name,
-                input_data=batch_data,
-                batch_size=batch_size,
-                min_conn_pool_size=min_pool_size,
-                max_conn_pool_size=max_pool_size,
-                use_multi_process_for_create_index=False,
-                drop_and_create_index=False
-            )
+        with self.metrics.timer('bulk_load_data', table_name, rows=len(data)):
+            # every batch borrows a connection from the pool shared by all tables
+            handler = db_handler or self.db_connect
+            pool = await handler.get_pool()
+            target = f"{handler._schema}.{table_name}"
+            if batch_sizer is not None:
+                batch_size = batch_sizer.size
 
-    async def load_csv_to_db(self, file_path: str, table_name: str, chunk_size:int=100000, batch_size: int= 500000, synthea: bool=False) -> None:
+            async def copy_batch(conn, batch_data):
+                batch_start = time.perf_counter()
+                if merge is not None:
+                    await merge.merge_frame(conn, batch_data)
+                else:
+                    await copy_dataframe(conn, target, batch_data)
+                if batch_sizer is not None:
+                    batch_sizer.observe(len(batch_data), time.perf_counter() - batch_start)
+
+            if checkpoint is not None:
+                # the chunk and its manifest entry commit or roll back together
+                async with pool.connection() as conn:
+                    for i in range(0, len(data), batch_size):
+                        await copy_batch(conn, data.iloc[i:i + batch_size])
+                    await self._manifest.commit_range(conn, checkpoint, *source_range)
+                return
+
+            async def insert_batch(batch_data):
+                async with pool.connection() as conn:
+                    await copy_batch(conn, batch_data)
+
+            # Calculate the total number of batches using the provided batch size
+            num_batches = (len(data) + batch_size - 1) // batch_size
+            batches = [data.iloc[i * batch_size:min((i + 1) * batch_size, len(data))] for i in range(num_batches)]
+
+            # Insert the batches concurrently; the pool size bounds the open connections
+            await asyncio.gather(*[insert_batch(batch_data) for batch_data in batches])
+
+    async def load_csv_to_db(self, file_path: str, table_name: str, chunk_size:int=100000, batch_size: int= 500000, synthea: bool=False,
+                             checkpoint: Checkpoint=None, target: str=None, merge: UpsertMerge=None) -> None:
         """
         Load a CSV file into the specified database table.
 
         Args:
             file_path (str): Path to the CSV file.
             table_name (str): Name of the database table.
+            checkpoint (Checkpoint): Manifest entry of this file. Rows it already records are
+                skipped, and every chunk records its row range as it commits.
+            target (str): Table written to instead of ``table_name``, e.g. a staging table
+                with the same columns. Types still come from ``table_name``.
+            merge (UpsertMerge): Merge every chunk into the table instead of inserting it.
 
         Returns:
             None
         """
         try:
-            if synthea:
-                chunks = pd.read_csv(file_path, chunksize=chunk_size, low_memory=False)
-            else:
-                chunks = pd.read_csv(file_path, sep='\t', na_values=[], keep_default_na=False, chunksize=chunk_size, low_memory=False)
+            start = time.perf_counter()
+            # the catalog must be cached before conversion moves to worker threads
+            plan = self.load_schema_catalog().plan(table_name)
+            # a fresh converter per load, so its null report covers this file (or shard) only
+            converter = TableConverter(plan)
+            loaded = []
+            # rows before resume_row are committed; later committed ranges are dropped per chunk
+            skip = checkpoint.resume_row if checkpoint is not None else 0
+            committed = [r for r in checkpoint.ranges if r[1] > skip] if checkpoint is not None else []
+            if skip:
+                logging.info(f"Resuming '{table_name}' after {skip} committed rows.")
+            cached = cache_writer = None
+            if self._cache is not None:
+                cache_key = ParsedCache.key(file_path, self.schema, plan, synthea)
+                cached = self._cache.batches(cache_key, skip_rows=skip)
+                if cached is not None:
+                    logging.info(f"Loading '{table_name}' from the parsed cache.")
+                elif not skip and not committed:
+                    # only a file converted from its first row to its last is cached
+                    cache_writer = self._cache.writer(cache_key, plan)
 
-            for i, chunk in enumerate(tqdm(chunks, desc="Streaming CSV chunks into DB"), start=1):
-                chunk.columns = chunk.columns.str.lower()
-                cleaned_chunk = self.compare_and_convert(chunk, table_name)
+            chunk_sizer = batch_sizer = None
+            if self._max_memory:
+                source_row_bytes = source_bytes_per_row(file_path)
+                budget = self._max_memory // self._memory_share
+                chunk_sizer = ChunkSizer(budget, self._pipeline.chunks_in_flight, source_row_bytes)
+                batch_sizer = BatchSizer(min(batch_size, chunk_sizer.rows))
+                logging.info(
+                    f"'{table_name}': {budget / 2**20:,.0f} MiB budget, starting with chunks of {chunk_sizer.rows} rows "
+                    f"and batches of {batch_sizer.size} rows.")
 
-                await self.bulk_load_data(
-                    batch_size=batch_size,
-                    data=cleaned_chunk,
-                    table_name=table_name,
-                    max_pool_size=20,
-                    min_pool_size=20
-                )
+            # compressed sources are decompressed once, on a background thread; the Arrow
+            # reader opens the source itself, after reading its header
+            opened = cached is None and self._reader != 'arrow'
+            with readable(file_path) if opened else nullcontext() as input_file:
+                if cached is not None:
+                    # converted by an earlier run: batches only move to pandas
+                    chunks, finish = cached, ParsedCache.to_frame
+                elif self._reader == 'arrow':
+                    # batches arrive typed from the catalog; conversion only finishes them
+                    block_size = int(chunk_sizer.rows * source_row_bytes) if chunk_sizer else 16 << 20
+                    arrow_reader = ArrowCSVReader(plan, synthea=synthea, block_size=block_size, report=converter.report)
+                    chunks = arrow_reader.batches(file_path, skip_rows=skip)
+                    finish = arrow_reader.to_frame
+                else:
+                    chunks = pandas_chunks(input_file, chunk_sizer.rows if chunk_sizer else chunk_size,
+                                           synthea=synthea, skip_rows=skip)
+                    if chunk_sizer is not None:
+                        # every chunk is sized from the bytes per row measured so far
+                        chunks = chunk_sizer.chunks(chunks)
 
-                logging.info(f"Loaded chunk {i} into '{self.schema}.{table_name}'.")
+                    def finish(chunk):
+                        chunk.columns = chunk.columns.str.lower()
+                        return self.compare_and_convert(chunk, table_name, converter)
 
-            logging.info(f"Completed streaming all chunks into '{self.schema}.{table_name}'.")
+                def numbered():
+                    # tag every chunk with the source rows it covers for the manifest
+                    offset = skip
+                    iterator = iter(chunks)
+                    while True:
+                        read_start = time.perf_counter()
+                        raw = next(iterator, None)
+                        if raw is None:
+                            return
+                        self.metrics.record(Measurement('read', plan.table, offset, time.perf_counter() - read_start,
+                                                        rows=len(raw)))
+                        yield Chunk(offset, raw, len(raw))
+                        offset += len(raw)
+
+                def convert(chunk):
+                    with self.metrics.timer('convert', plan.table, chunk.start) as measurement:
+                        data = finish(chunk.data)
+                        measurement.nulls = data.attrs.get('coerced_to_null', 0)
+                        if cache_writer is not None:
+                            cache_writer.write(chunk.start, chunk.source_rows, data)
+                        if committed:
+                            data = data[uncommitted_mask(chunk.start, len(data), committed)]
+                        measurement.rows = len(data)
+                    return Chunk(chunk.start, data, chunk.source_rows)
+
+                async def insert_into(handler, chunk):
+                    primary = handler is self.db_connect
+                    await self.bulk_load_data(
+                        batch_size=batch_size,
+                        data=chunk.data,
+                        table_name=target or table_name,
+                        max_pool_size=20,
+                        min_pool_size=20,
+                        # the manifest and the latency feedback follow the handler's database
+                        checkpoint=checkpoint if primary else None,
+                        source_range=(chunk.start, chunk.end),
+                        batch_sizer=batch_sizer if primary else None,
+                        merge=merge if primary or merge is None else merge.for_schema(handler._schema),
+                        db_handler=handler
+                    )
+
+                async def insert(chunk):
+                    with self.metrics.timer('insert', plan.table, chunk.start, rows=len(chunk)):
+                        targets = await self._fan_out(table_name, len(chunk),
+                                                      lambda handler: insert_into(handler, chunk))
+                    loaded.append(len(chunk))
+                    self._report_rows(table_name, len(chunk))
+                    logging.info(f"Loaded chunk {len(loaded)} into '{table_name}' on {targets}.")
+
+                try:
+                    stages = await self._pipeline.run(numbered(), convert, insert)
+                except BaseException:
+                    if cache_writer is not None:
+                        cache_writer.discard()
+                    raise
+            if cache_writer is not None:
+                cache_writer.commit()
+            if checkpoint is not None:
+                pool = await self.db_connect.get_pool()
+                async with pool.connection() as conn:
+                    await self._manifest.complete(conn, checkpoint)
+            rows = sum(loaded)
+            for stage in stages.values():
+                logging.info(f"'{table_name}' {stage}")
+            coerced = converter.report.coerced()
+            if coerced:
+                logging.warning(f"Values coerced to NULL in '{table_name}' from '{source_name(file_path)}': {coerced}")
+            if chunk_sizer is not None:
+                logging.info(f"'{table_name}' settled on chunks of {chunk_sizer.rows} rows "
+                             f"({chunk_sizer.bytes_per_row:,.0f} bytes/row) and batches of {batch_sizer.size} rows.")
+
+            seconds = max(time.perf_counter() - start, 1e-9)
+            size = source_size(file_path)
+            size_mb = size / 1e6
+            self.metrics.record(Measurement('load_csv_to_db', plan.table, seconds=seconds, rows=rows, bytes=size,
+                                            nulls=sum(coerced.values())))
+            logging.info(
+                f"Completed streaming all chunks into '{self.schema}.{table_name}': {rows} rows in {seconds:.1f}s "
+                f"({rows / seconds:,.0f} rows/s, {size_mb / seconds:.1f} MB/s)."
+            )
 
         except Exception as e:
             raise RuntimeError(f"Error loading '{file_path}' into '{table_name}': {e}")
 
+    async def stream_csv_to_db(self, file_path: str, table_name: str, synthea: bool=False,
+                               checkpoint: Checkpoint=None, target: str=None, merge: UpsertMerge=None) -> dict:
+        """
+        Stream a CSV file into the specified table with COPY, bypassing pandas.
+
+        Args:
+            file_path (str): Path to the CSV file.
+            table_name (str): Name of the database table.
+            synthea (bool): Parse the file as quoted CSV instead of Athena TSV.
+            checkpoint (Checkpoint): Manifest entry of this file, marked complete in the
+                COPY's own transaction.
+            target (str): Table written to instead of ``table_name``.
+            merge (UpsertMerge): Stream the file into the merge's temporary table and merge
+                it into the table in the COPY's transaction.
+
+        Returns:
+            dict: Throughput statistics reported by the COPY engine.
+        """
+        try:
+            plan = self.load_schema_catalog().plan(table_name)
+            pool = await self.db_connect.get_pool()
+            if merge is not None:
+                # the temporary table lives in the COPY connection's own temp schema
+                streamer = CopyStreamer(pool, 'pg_temp', plan)
+                target = merge.temp
+                columns = plan.select(read_header(file_path, synthea))
+            else:
+                streamer = CopyStreamer(pool, self.schema, plan)
+
+            async def before_commit(conn):
+                if merge is not None:
+                    with self.metrics.timer('upsert_merge', plan.table):
+                        await merge.apply(conn, columns)
+                if checkpoint is not None:
+                    await self._manifest.complete(conn, checkpoint)
+
+            stats = await streamer.load(file_path, target or table_name, synthea=synthea,
+                                        progress=lambda rows: self._report_rows(table_name, rows),
+                                        before_copy=merge.prepare if merge is not None else None,
+                                        before_commit=before_commit if merge is not None or checkpoint is not None else None)
+            self.metrics.record(Measurement('copy_stream', plan.table, seconds=stats['seconds'], rows=stats['rows'],
+                                            bytes=stats['bytes']))
+            return stats
+        except Exception as e:
+            raise RuntimeError(f"Error streaming '{file_path}' into '{table_name}': {e}")
+
+    async def parallel_csv_to_db(self, file_path: str, table_name: str, checkpoint: Checkpoint=None,
+                                 target: str=None) -> dict:
+        """
+        Load one large plain Athena file with a pool of worker processes.
+
+        The file is split into newline-aligned byte ranges that worker processes parse,
+        convert and COPY on their own connections (see parallel_load.ByteRangeLoader).
+
+        Args:
+            file_path (str): Path to the uncompressed TSV file.
+            table_name (str): Name of the database table.
+            checkpoint (Checkpoint): Manifest entry of this file, marked complete once every
+                range committed. Ranges commit separately, so an interrupted load restarts.
+            target (str): Table written to instead of ``table_name``.
+
+        Returns:
+            dict: Rows, bytes, ranges, workers and seconds of the load.
+        """
+        try:
+            plan = self.load_schema_catalog().plan(table_name)
+            converter = TableConverter(plan)
+            range_bytes = RANGE_BYTES
+            if self._max_memory:
+                # a parsed and converted range takes about ten times its size in memory
+                range_bytes = min(RANGE_BYTES, self._max_memory // self._memory_share // (self._parallel_workers * 10))
+            loader = ByteRangeLoader(self.db_connect.get_conninfo(), self.schema, plan,
+                                     workers=self._parallel_workers, range_bytes=range_bytes)
+
+            def progress(result):
+                for stage in ('read', 'convert', 'insert'):
+                    self.metrics.record(Measurement(stage, plan.table, result['start'], result[stage],
+                                                    rows=result['rows']))
+                converter.report.add(result['rows'], result['coerced'])
+                self._report_rows(table_name, result['rows'])
+
+            stats = await loader.load(file_path, target or table_name, progress=progress)
+            if checkpoint is not None:
+                pool = await self.db_connect.get_pool()
+                async with pool.connection() as conn:
+                    await self._manifest.complete(conn, checkpoint)
+            if stats['coerced']:
+                logging.warning(f"Values coerced to NULL in '{table_name}' from '{source_name(file_path)}': "
+                                f"{stats['coerced']}")
+            seconds = max(stats['seconds'], 1e-9)
+            self.metrics.record(Measurement('parallel_load', plan.table, seconds=seconds, rows=stats['rows'],
+                                            bytes=stats['bytes'], nulls=sum(stats['coerced'].values())))
+            logging.info(
+                f"Completed loading '{self.schema}.{table_name}' in {stats['ranges']} ranges on {stats['workers']} "
+                f"processes: {stats['rows']} rows in {seconds:.1f}s ({stats['rows'] / seconds:,.0f} rows/s, "
+                f"{stats['bytes'] / 1e6 / seconds:.1f} MB/s)."
+            )
+            return stats
+        except Exception as e:
+            raise RuntimeError(f"Error loading '{file_path}' in parallel into '{table_name}': {e}")
+
+    async def delta_csv_to_db(self, file_path, table_name: str, engine='pandas', synthea: bool=False,
+                              batch_size: int=500000, shard_workers: int=4) -> dict:
+        """
+        Refresh a loaded vocabulary table with a new release by applying only the diff.
+
+        The file is loaded into an UNLOGGED staging table with the table's engine, then
+        DeltaRefresh deletes, updates and inserts the rows that differ on the natural key.
+
+        Args:
+            file_path (str | list): Path to the CSV file of the new release, or the list of
+                its shards, which are all staged before the diff is applied.
+            table_name (str): Name of the database table.
+            engine (str | dict): Engine loading the staging table, as in load_all_csvs.
+            shard_workers (int): Shards staged at the same time.
+
+        Returns:
+            dict: The number of rows deleted, updated and inserted.
+        """
+        try:
+            plan = self.load_schema_catalog().plan(table_name)
+            refresh = DeltaRefresh(await self.db_connect.get_pool(), self.schema, plan)
+            await refresh.prepare()
+            try:
+                shards = file_path if isinstance(file_path, list) else [file_path]
+                await self._load_shards(table_name, shards, self._source_loader(
+                    table_name, engine, synthea, batch_size, target=refresh.staging), shard_workers)
+                with self.metrics.timer('delta_apply', plan.table) as measurement:
+                    counts = await refresh.apply()
+                    measurement.rows = counts['deleted'] + counts['updated'] + counts['inserted']
+                return counts
+            finally:
+                await refresh.discard()
+        except Exception as e:
+            raise RuntimeError(f"Error refreshing '{table_name}': {e}")
+
+    @staticmethod
+    def _target_name(handler: DatabaseHandler) -> str:
+        return f"{handler._server}/{handler._database}.{handler._schema}"
+
+    def _live_targets(self) -> list:
+        return [handler for handler in self._targets if self._target_name(handler) not in self._failed_targets]
+
+    def _target_failed(self, handler: DatabaseHandler, error: BaseException) -> None:
+        """Drop a target for the rest of the run; with a single target the error is raised."""
+        if len(self._targets) == 1:
+            raise error
+        name = self._target_name(handler)
+        if name not in self._failed_targets:
+            self._failed_targets[name] = error
+            logging.error(f"Target '{name}' failed and is skipped from now on: {error}")
+
+    async def _fan_out(self, table_name: str, rows: int, insert) -> str:
+        """
+        Run ``insert(handler)`` for every live target concurrently and count the rows per target.
+
+        Returns:
+            str: The targets the rows went to, for the log.
+
+        Raises:
+            RuntimeError: If no target is left.
+        """
+        targets = self._live_targets()
+        if not targets:
+            raise RuntimeError(f"Every target failed: {self._failed_targets}")
+        results = await asyncio.gather(*[insert(handler) for handler in targets], return_exceptions=True)
+        succeeded = []
+        for handler, result in zip(targets, results):
+            if isinstance(result, BaseException):
+                self._target_failed(handler, result)
+                continue
+            name = self._target_name(handler)
+            tables = self.target_rows.setdefault(name, {})
+            tables[table_name.lower()] = tables.get(table_name.lower(), 0) + rows
+            succeeded.append(name)
+        if not succeeded:
+            raise RuntimeError(f"Every target failed: {self._failed_targets}")
+        return ', '.join(succeeded) if len(self._targets) > 1 else f"'{self.schema}'"
+
+    def _each_mirror(self, action) -> None:
+        """Call ``action(handler)`` on every live target besides the loader's own handler, dropping those it fails on."""
+        for handler in self._live_targets():
+            if handler is self.db_connect:
+                continue
+            try:
+                action(handler)
+            except Exception as e:
+                self._target_failed(handler, e)
+
+    def _report_rows(self, table_name: str, rows: int) -> None:
+        """Forward loaded row counts to the combined progress of the running scheduler."""
+        if self._scheduler is not None:
+            self._scheduler.advance(table_name, rows)
+
+    @staticmethod
+    def _engine_for(table: str, engine) -> str:
+        """Resolve the load engine of a table from a single name or a per-table mapping."""
+        if isinstance(engine, dict):
+            engine = engine.get(table.lower(), engine.get(table, 'pandas'))
+        if engine not in LOAD_ENGINES:
+            raise ValueError(f"Unknown load engine '{engine}' for table '{table}', expected one of {LOAD_ENGINES}")
+        return engine
+
+
+    @staticmethod
+    def table_sources(folder_path: str, table_order: list, upper: bool = True, shards: dict = None) -> dict:
+        """
+        Find the source files of every table, as load_all_csvs loads them.
+
+        Args:
+            folder_path (str): Folder or Athena zip archive of the CSV files.
+            table_order (list): Tables to look for.
+            upper (bool): File names are upper case ('CONCEPT.csv').
+            shards (dict): Optional mapping of table name to a glob of its shards.
+
+        Returns:
+            dict: table -> its sources: its single file, its shards, or none.
+        """
+        sources = discover_sources(folder_path, [f"{table.upper() if upper else table}.csv" for table in table_order])
+        table_sources = {}
+        for table in table_order:
+            table_name = table.upper() if upper else table
+            single = sources.get(f'{table_name}.csv')
+            pattern = (shards or {}).get(table.lower())
+            found = discover_shards(folder_path, table_name, pattern) if pattern or single is None else []
+            if found:
+                logging.info(f"'{table_name}' is loaded from {len(found)} shards.")
+            table_sources[table] = found or ([single] if single is not None else [])
+        return table_sources
+
+    def verify_load(self, folder_path: str, table_order: list, upper: bool = True, synthea: bool = False,
+                    shards: dict = None, checksums: bool = False, workers: int = None) -> VerificationReport:
+        """
+        Compare the loaded tables with their source files (see verify.LoadVerifier).
+
+        Args:
+            folder_path (str): The folder_path given to load_all_csvs.
+            table_order (list): Tables to verify.
+            checksums (bool): Also compare order-independent column checksums.
+            workers (int): Processes that scan the source files; one per CPU by default.
+
+        Returns:
+            VerificationReport: Per-table pass/fail result; print it for a summary.
+        """
+        catalog = self.load_schema_catalog()
+        verifier = LoadVerifier(self.db_connect, catalog, workers=workers, checksums=checksums, synthea=synthea)
+        with self.metrics.timer('verify'):
+            return verifier.verify(self.table_sources(folder_path, table_order, upper, shards))
 
     def load_all_csvs(self, folder_path: str, table_order: list=['vocabulary', 
             'domain', 'concept_class', 'relationship', 'drug_strength',  'concept_synonym', 'concept', 'concept_relationship', 
-            'concept_ancestor'], batch_size: int = 500000, upper: bool=True, synthea: bool=False) -> None:
+            'concept_ancestor'], batch_size: int = 500000, upper: bool=True, synthea: bool=False,
+            engine='pandas', max_workers: int=1, dependencies: dict=None, disable_triggers: bool=True,
+            resume: bool=False, mode: str='truncate', shards: dict=None, shard_workers: int=4,
+            staging_logged: bool=True) -> None:
         """
         Load all CSV files from the specified folder into the database schema.
 
+        Tables are loaded concurrently by a TableScheduler, biggest file first.
+
         Args:
-            folder_path (str): Path to the folder containing CSV files.
+            folder_path (str): Path to the folder containing CSV files, or of an Athena zip
+                archive. Files may also be gzip or zstd compressed ('CONCEPT.csv.gz') or
+                sit in a zip archive in the folder; they are decompressed while streaming.
+                A table without a single file is loaded from its shards, if it has any: the
+                files of a '{table}/' folder, or '{table}_<n>.csv' files (see sources.discover_shards).
+            engine (str | dict): 'pandas', 'copy' or 'parallel', either for every table or as a
+                mapping of table name to engine. Tables missing from the mapping use 'pandas'.
+                'parallel' splits a single large file over worker processes (see
+                parallel_csv_to_db); it falls back to 'pandas' where it does not apply.
+            max_workers (int): Maximum number of tables loaded at the same time.
+            dependencies (dict): Optional mapping of table to the tables that must be
+                loaded before it, e.g. scheduler.CDM_VOCABULARY_DEPENDENCIES.
+            disable_triggers (bool): Disable triggers (and so FK checks) on every table while loading.
+            resume (bool): Record progress in the checkpoint manifest and continue from it
+                instead of truncating every table: tables whose file is unchanged and complete
+                are skipped, partial ones continue after their committed rows, and only the
+                rest are truncated. Without it no manifest is created or written, so a run
+                that may need resuming must set it from the start. Tables
+                loaded with the 'copy' engine commit atomically, and those loaded with 'parallel'
+                commit ranges in any order, so both either skip or restart.
+            mode (str): 'truncate' empties every table and reloads it. 'delta' keeps the loaded
+                rows and applies only the difference with the new release, matched on the
+                natural keys in delta.NATURAL_KEYS; tables without one are reloaded in full.
+                'staging' loads every table into an UNLOGGED shadow table, indexes it there and
+                swaps all of them into the schema in one transaction once every table loaded;
+                if any table fails the shadow tables are dropped and the live tables are untouched.
+                'append' keeps the loaded rows and inserts the files on top of them. 'upsert' keeps
+                them too and merges every chunk on the table's primary key (see upsert.UpsertMerge):
+                rows of an existing key are updated, others inserted. Neither empties a table.
+            shards (dict): Optional mapping of table name to a glob of its shards, relative to
+                folder_path, e.g. {'concept_relationship': 'cr/part-*.csv.gz'}. Used instead of
+                the table's single file.
+            shard_workers (int): Shards of one table loaded at the same time. A failed shard
+                does not stop the others; every failure is reported and the table fails.
+            staging_logged (bool): In 'staging' mode, make each shadow table LOGGED before the
+                swap, so the new tables survive a crash and reach replicas. False leaves them
+                UNLOGGED for good, which only suits throwaway databases (see staging.StagingSwap).
 
         Returns:
             None
         """
+        if mode not in WRITE_MODES:
+            raise ValueError(f"Unknown write mode '{mode}', expected one of {WRITE_MODES}")
+        if len(self._targets) > 1 and (mode in ('delta', 'staging') or resume):
+            raise ValueError(f"Loading into several targets supports the 'truncate', 'append' and 'upsert' "
+                             f"modes without resume, not mode '{mode}'{' with resume' if resume else ''}")
+        self._failed_targets, self.target_rows = {}, {}
         table_order = table_order
         file_to_table_mapping = {f"{table}.csv": table.lower() for table in table_order}
         missing_files = []
 
+        # fetch the column metadata for all tables once, before any chunk is read
+        self.load_schema_catalog(refresh=True)
+
+        table_sources = self.table_sources(folder_path, table_order, upper, shards)
+        if mode == 'upsert':
+            self._primary_keys = primary_keys(self.db_connect.query_sql(PRIMARY_KEY_QUERY, (self.schema,)))
+        # these modes add to what is loaded, so no table is emptied
+        keep_rows = mode in ('append', 'upsert')
+        # concurrent tables, and shards within them, split the memory budget evenly
+        sharded = any(len(found) > 1 for found in table_sources.values())
+        self._memory_share = max(1, max_workers) * (max(1, shard_workers) if sharded else 1)
+
+        # only resumable runs keep a manifest, a table that is not part of the CDM
+        checkpoints = {}
+        if resume:
+            self.db_connect.run_async(self._with_pool(self._manifest.ensure))
+            checkpoints = self.db_connect.run_async(self._with_pool(self._manifest.load))
+        resumed = {}
+        to_empty = []
+        for table in table_order:
+            table_name = table.upper() if upper else table
+            found = table_sources[table]
+            if mode == 'staging' or (mode == 'delta' and table.lower() in NATURAL_KEYS):
+                # these modes keep the loaded rows; missing files leave their table as is
+                continue
+            if not found:
+                if not keep_rows:
+                    to_empty.append(table)
+                continue
+            fingerprints = {source_name(source): file_fingerprint(source) for source in found}
+            recorded = {name: checkpoint for (key, name), checkpoint in checkpoints.items() if key == table.lower()}
+            # a table resumes only if it was loaded from exactly these, unchanged, files
+            if set(recorded) == set(fingerprints) and all(
+                    checkpoint.fingerprint == fingerprints[name] and (
+                        checkpoint.completed or self._engine_for(table_name, engine) == 'pandas')
+                    for name, checkpoint in recorded.items()):
+                resumed[table] = recorded
+                continue
+            if not keep_rows:
+                to_empty.append(table)
+            if resume:
+                resumed[table] = self.db_connect.run_async(self._with_pool(
+                    self._manifest.start_many, table.lower(), list(fingerprints.items())))
+
         try:
             print("\n\nDeleting data from table before loading...\n\n")
             time.sleep(1)
-            a = [self.db_connect.empty_table(self.schema, table_name) for table_name in table_order]
+            a = [self.db_connect.empty_table(self.schema, table_name) for table_name in to_empty]
+            self._each_mirror(lambda handler: [handler.empty_table(handler._schema, table_name)
+                                               for table_name in to_empty])
             time.sleep(1)
             print("\n\n Next - Inserting data...\n\n")
             time.sleep(1)
         except Exception as e:
             logging.error(f"Failed to empty table': {e}")
 
+        staging = None
+        if mode == 'staging':
+            staging = StagingSwap(self.db_connect.run_async(self.db_connect.get_pool()), self.schema,
+                                  logged=staging_logged)
 
+        scheduler = TableScheduler(max_workers=max_workers, dependencies=dependencies)
+        jobs = []
         for table in table_order:
             filename = file_to_table_mapping.get(f'{table}.csv')
             print(filename)
             if filename:
                 table_name = table.upper() if upper else table
-                self.db_connect.disable_foreign_key_checks(table_name)
+                if disable_triggers and staging is None:
+                    self.db_connect.disable_foreign_key_checks(table_name)
+                    self._each_mirror(lambda handler: handler.disable_foreign_key_checks(table_name))
                 print(f"Table: {table_name}") if upper else None
-                file_path = os.path.join(folder_path, f'{table_name}.csv')
-                if os.path.exists(file_path):
-                    try:
-                        asyncio.run(self.load_csv_to_db(file_path, table_name, synthea=synthea, batch_size=batch_size))
-                    except Exception as e:
-                        raise RuntimeError(f"Failed to load '{filename}' into '{table_name}': {e}")
+                table_checkpoints = resumed.get(table, {})
+                pending = [source for source in table_sources[table]
+                           if not getattr(table_checkpoints.get(source_name(source)), 'completed', False)]
+                if table_sources[table] and not pending:
+                    logging.info(f"Skipping '{table_name}': '{filename}' is unchanged and already loaded.")
+                elif pending:
+                    jobs.append(scheduler.job(table, sum(source_size(source) for source in pending),
+                                              self._table_loader(pending, table_name, engine, synthea, batch_size,
+                                                                 table_checkpoints, mode, staging, shard_workers),
+                                              shards=len(pending)))
                 else:
                     logging.warning(f"File '{filename}' not found in folder '{folder_path}'.")
                     missing_files.append(filename)
-        
+
+        self._scheduler = scheduler
+        try:
+            self.db_connect.run_async(scheduler.run(jobs))
+        except Exception:
+            if staging is not None:
+                # the live tables were never touched; drop what was staged
+                self.db_connect.run_async(staging.discard())
+            raise
+        finally:
+            self._scheduler = None
+
+        if staging is not None:
+            with self.metrics.timer('staging_swap'):
+                self.db_connect.run_async(staging.swap())
+
         self.db_connect.enable_foreign_key_checks()
+        self._each_mirror(lambda handler: handler.enable_foreign_key_checks())
 
         if missing_files:
             logging.warning(f"Missing files: {missing_files}")
 
-        logging.info("All CSV files have been processed.")
\ No newline at end of file
+        logging.info("All CSV files have been processed.")
+        if len(self._targets) > 1:
+            for name, tables in self.target_rows.items():
+                logging.info(f"Target '{name}': {sum(tables.values()):,} rows into {len(tables)} tables.")
+            if self._failed_targets:
+                details = "; ".join(f"{name}: {error}" for name, error in self._failed_targets.items())
+                raise RuntimeError(f"{len(self._failed_targets)} of {len(self._targets)} targets failed ({details})")
+
+    async def _with_pool(self, method, *args):
+        """Call a manifest method with the shared pool, on the handler's event loop."""
+        return await method(await self.db_connect.get_pool(), *args)
+
+    def _source_loader(self, table_name: str, engine, synthea: bool, batch_size: int,
+                       checkpoints: dict=None, target: str=None, merge: UpsertMerge=None, restartable: bool=True):
+        """
+        Return a coroutine function that loads one source file of a table with its engine.
+        ``restartable`` is False when an interrupted load cannot simply be loaded again
+        (the append and upsert modes), which rules out the 'parallel' engine.
+        """
+        checkpoints = checkpoints or {}
+
+        async def load(source):
+            checkpoint = checkpoints.get(source_name(source))
+            selected = self._engine_for(table_name, engine)
+            # COPY streams the raw file into one database; fan-out goes through the chunk pipeline
+            if selected == 'copy' and len(self._targets) == 1:
+                return await self.stream_csv_to_db(source, table_name, synthea=synthea, checkpoint=checkpoint,
+                                                   target=target, merge=merge)
+            if selected == 'parallel':
+                # byte ranges need an uncompressed file of one-line records, loaded into one database
+                if (restartable and merge is None and not synthea and len(self._targets) == 1
+                        and not isinstance(source, SourceFile)):
+                    return await self.parallel_csv_to_db(source, table_name, checkpoint=checkpoint, target=target)
+                logging.info(f"Loading '{source_name(source)}' into '{table_name}' through the chunk pipeline: "
+                             f"the 'parallel' engine needs a plain Athena file, one target and a truncating mode.")
+            return await self.load_csv_to_db(source, table_name, synthea=synthea, batch_size=batch_size,
+                                             checkpoint=checkpoint, target=target, merge=merge)
+        return load
+
+    async def _load_shards(self, table_name: str, shards: list, load, workers: int=4) -> list:
+        """
+        Load the shards of one table concurrently, up to ``workers`` at once.
+
+        A failed shard does not cancel the others, so one run reports every bad shard.
+
+        Raises:
+            RuntimeError: Naming every shard that failed, after all shards finished.
+        """
+        if len(shards) == 1:
+            return [await load(shards[0])]
+        semaphore = asyncio.Semaphore(max(1, workers))
+        finished = []
+
+        async def load_shard(shard):
+            async with semaphore:
+                with self.metrics.timer('shard', table_name):
+                    result = await load(shard)
+            finished.append(shard)
+            if self._scheduler is not None:
+                self._scheduler.shard_done(table_name)
+            logging.info(f"Loaded shard '{source_name(shard)}' of '{table_name}' ({len(finished)}/{len(shards)}).")
+            return result
+
+        results = await asyncio.gather(*[load_shard(shard) for shard in shards], return_exceptions=True)
+        failed = {source_name(shard): result for shard, result in zip(shards, results)
+                  if isinstance(result, BaseException)}
+        for name, error in failed.items():
+            logging.error(f"Shard '{name}' of '{table_name}' failed: {error}")
+        if failed:
+            details = "; ".join(f"{name}: {error}" for name, error in failed.items())
+            raise RuntimeError(f"{len(failed)} of {len(shards)} shards of '{table_name}' failed ({details})")
+        return results
+
+    def _table_loader(self, sources: list, table_name: str, engine, synthea: bool, batch_size: int,
+                      checkpoints: dict=None, mode: str='truncate', staging: StagingSwap=None,
+                      shard_workers: int=4):
+        """Return a coroutine factory that loads one table, from one or more source files, with its selected engine."""
+        async def load():
+            try:
+                if staging is not None:
+                    shadow = await staging.create(table_name)
+                    stats = await self._load_shards(table_name, sources, self._source_loader(
+                        table_name, engine, synthea, batch_size, target=shadow), shard_workers)
+                    with self.metrics.timer('staging_build', table_name):
+                        await staging.build(table_name)
+                    return stats
+                if mode == 'delta' and table_name.lower() in NATURAL_KEYS:
+                    return await self.delta_csv_to_db(sources, table_name, engine=engine, synthea=synthea,
+                                                      batch_size=batch_size, shard_workers=shard_workers)
+                merge = None
+                if mode == 'upsert':
+                    plan = self.load_schema_catalog().plan(table_name)
+                    merge = UpsertMerge(self.schema, plan, self._primary_keys.get(plan.table))
+                    logging.info(f"Upserting '{table_name}' on {', '.join(merge.keys)}"
+                                 f"{'' if merge.conflict else ' (no primary key; natural key)'}.")
+                return await self._load_shards(table_name, sources, self._source_loader(
+                    table_name, engine, synthea, batch_size, checkpoints, merge=merge,
+                    restartable=mode not in ('append', 'upsert')), shard_workers)
+            except Exception as e:
+                names = source_name(sources[0]) if len(sources) == 1 else f"{len(sources)} shards"
+                raise RuntimeError(f"Failed to load '{names}' into '{table_name}': {e}")
+        return load
@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+
+@dataclass
+class Measurement:
+    """One timed call of a stage; the caller fills in rows, bytes and nulls while it runs."""
+    stage: str
+    table: Optional[str] = None
+    chunk: Optional[int] = None
+    seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    nulls: int = 0
+
+
+@dataclass
+class StageTotals:
+    """Sum of the measurements of one stage for one table."""
+    calls: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    nulls: int = 0
+
+    def add(self, measurement: Measurement) -> None:
+        self.calls += 1
+        self.seconds += measurement.seconds
+        self.rows += measurement.rows
+        self.bytes += measurement.bytes
+        self.nulls += measurement.nulls
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRecorder:
+    def __init__(self, keep_chunks: bool = True):
+        """
+        Thread-safe recorder of stage durations, rows, bytes and values coerced to null.
+
+        Measurements are summed per (stage, table); chunk-level measurements are also
+        kept individually for the JSON run report. Stages are free-form names such as
+        'read', 'convert', 'insert' or 'sql.truncate'.
+
+        :param keep_chunks: Keep every chunk measurement, not only the totals.
+        """
+        self._lock = threading.Lock()
+        self._totals: Dict[Tuple[str, str], StageTotals] = {}
+        self._chunks: List[Measurement] = []
+        self._keep_chunks = keep_chunks
+        self.started = time.time()
+
+    def record(self, measurement: Measurement) -> None:
+        """Add a finished measurement."""
+        with self._lock:
+            key = (measurement.stage, measurement.table or '')
+            self._totals.setdefault(key, StageTotals()).add(measurement)
+            if self._keep_chunks and measurement.chunk is not None:
+                self._chunks.append(measurement)
+
+    @contextmanager
+    def timer(self, stage: str, table: Optional[str] = None, chunk: Optional[int] = None,
+              rows: int = 0, bytes: int = 0) -> Iterator[Measurement]:
+        """
+        Time the enclosed block as one call of ``stage``. The measurement is recorded
+        even if the block raises, so failed calls still show where the time went.
+        """
+        measurement = Measurement(stage, table.lower() if table else None, chunk, rows=rows, bytes=bytes)
+        start = time.perf_counter()
+        try:
+            yield measurement
+        finally:
+            measurement.seconds = time.perf_counter() - start
+            self.record(measurement)
+
+    def totals(self) -> Dict[Tuple[str, str], StageTotals]:
+        """Return a copy of the totals keyed by (stage, table)."""
+        with self._lock:
+            return {key: StageTotals(**asdict(value)) for key, value in self._totals.items()}
+
+    def stage_totals(self) -> Dict[str, StageTotals]:
+        """Return the totals of every stage over all tables."""
+        stages: Dict[str, StageTotals] = {}
+        for (stage, _), totals in self.totals().items():
+            merged = stages.setdefault(stage, StageTotals())
+            merged.calls += totals.calls
+            merged.seconds += totals.seconds
+            merged.rows += totals.rows
+            merged.bytes += totals.bytes
+            merged.nulls += totals.nulls
+        return stages
+
+    def to_dict(self) -> dict:
+        """Return the run report: totals per stage, per stage and table, and every chunk."""
+        tables: Dict[str, Dict[str, dict]] = {}
+        for (stage, table), totals in sorted(self.totals().items()):
+            tables.setdefault(table or '_', {})[stage] = dict(asdict(totals), rows_per_sec=totals.rows_per_sec)
+        with self._lock:
+            chunks = [asdict(chunk) for chunk in self._chunks]
+        return {
+            'started': self.started,
+            'elapsed_seconds': time.time() - self.started,
+            'stages': {stage: dict(asdict(totals), rows_per_sec=totals.rows_per_sec)
+                       for stage, totals in sorted(self.stage_totals().items())},
+            'tables': tables,
+            'chunks': chunks,
+        }
+
+    def to_prometheus(self, prefix: str = 'cdm_loader') -> str:
+        """Render the totals in the Prometheus text exposition format."""
+        totals = sorted(self.totals().items())
+        lines = []
+        for field, help_text in (('seconds', 'Seconds spent in each stage.'),
+                                 ('rows', 'Rows handled by each stage.'),
+                                 ('bytes', 'Bytes read by each stage.'),
+                                 ('nulls', 'Values coerced to NULL by each stage.'),
+                                 ('calls', 'Calls of each stage.')):
+            name = f"{prefix}_stage_{field}_total"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for (stage, table), value in totals:
+                labels = f'stage="{_escape_label(stage)}",table="{_escape_label(table)}"'
+                lines.append(f"{name}{{{labels}}} {getattr(value, field)}")
+        lines.append(f"# HELP {prefix}_run_elapsed_seconds Seconds since the run started.")
+        lines.append(f"# TYPE {prefix}_run_elapsed_seconds gauge")
+        lines.append(f"{prefix}_run_elapsed_seconds {time.time() - self.started:.3f}")
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path: str) -> None:
+        """Write the run report to ``path`` as JSON."""
+        _write_atomic(path, json.dumps(self.to_dict(), indent=2))
+        logging.info(f"Metrics run report written to '{path}'.")
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Write the totals as a Prometheus textfile. The file is replaced atomically, as
+        the node_exporter textfile collector requires.
+        """
+        _write_atomic(path, self.to_prometheus())
+        logging.info(f"Prometheus metrics written to '{path}'.")
+
+    def summary(self) -> str:
+        """Return a human-readable table of the stages, slowest first."""
+        stages = sorted(self.stage_totals().items(), key=lambda item: item[1].seconds, reverse=True)
+        lines = [f"{'stage':28s} {'calls':>7s} {'seconds':>9s} {'rows':>13s} {'rows/s':>12s} {'MB':>9s} {'nulls':>9s}"]
+        for stage, totals in stages:
+            lines.append(
+                f"{stage:28s} {totals.calls:>7d} {totals.seconds:>9.1f} {totals.rows:>13,d} "
+                f"{totals.rows_per_sec:>12,.0f} {totals.bytes / 1e6:>9.1f} {totals.nulls:>9,d}")
+        lines.append(f"Total elapsed: {time.time() - self.started:.1f}s")
+        return '\n'.join(lines)
+
+
+def _write_atomic(path: str, text: str) -> None:
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix='.metrics-')
+    try:
+        with os.fdopen(fd, 'w') as handle:
+            handle.write(text)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,181 @@
+import io
+import os
+import mmap
+import time
+import asyncio
+import logging
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import Callable, Dict, List, Optional, Tuple
+import pandas as pd
+import psycopg
+from .conversion import TableConverter
+from .readers import ATHENA_TSV, read_header
+from .schema_catalog import TablePlan
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# bytes of source text one worker parses, converts and COPies in one transaction
+RANGE_BYTES = 64 << 20
+_MIN_RANGE_BYTES = 1 << 20
+# ranges per worker, so the last ones to finish are small next to the whole file
+_RANGES_PER_WORKER = 4
+
+
+def newline_ranges(path: str, range_bytes: int = RANGE_BYTES) -> List[Tuple[int, int]]:
+    """
+    Split a plain file after its header line into [start, end) byte ranges of about
+    ``range_bytes`` each. Every range ends just after a newline (or at the end of the
+    file), so it holds whole records; boundaries are found by scanning the file
+    memory-mapped. Assumes no record spans lines, as in Athena files.
+    """
+    with open(path, 'rb') as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return []
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            start = mapped.find(b'\n') + 1
+            if start == 0:
+                # only a header line
+                return []
+            ranges = []
+            while start < size:
+                end = start + range_bytes
+                if end >= size:
+                    end = size
+                else:
+                    newline = mapped.find(b'\n', end - 1)
+                    end = size if newline < 0 else newline + 1
+                ranges.append((start, end))
+                start = end
+            return ranges
+
+
+# ---------------------------------------------------------------------------
+# Worker processes: one database connection each, one byte range at a time
+# ---------------------------------------------------------------------------
+
+_WORKER: Dict[str, object] = {}
+
+
+def _init_worker(conninfo: str, path: str, header: List[str], columns: List[str], plan: TablePlan,
+                 table: str) -> None:
+    conn = psycopg.connect(conninfo)
+    # closed when the worker exits, rather than left for the server to notice
+    Finalize(conn, conn.close, exitpriority=10)
+    _WORKER.update(conn=conn, path=path, header=header, columns=columns, plan=plan, table=table)
+
+
+def _load_range(start: int, end: int) -> dict:
+    """Parse, convert and COPY one byte range in its own transaction; returns its statistics."""
+    conn, plan, columns = _WORKER['conn'], _WORKER['plan'], _WORKER['columns']
+    read_start = time.perf_counter()
+    with open(_WORKER['path'], 'rb') as handle, \
+            mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        text = mapped[start:end]
+    frame = pd.read_csv(io.BytesIO(text), header=None, names=_WORKER['header'], usecols=columns,
+                        low_memory=False, **ATHENA_TSV)
+    convert_start = time.perf_counter()
+    converter = TableConverter(plan)
+    data = converter.convert(frame, columns)
+    insert_start = time.perf_counter()
+    if not data.empty:
+        payload = data.to_csv(header=False, index=False)
+        try:
+            with conn.cursor() as cur:
+                with cur.copy(f"COPY {_WORKER['table']} ({','.join(columns)}) FROM STDIN WITH (FORMAT CSV)") as copy:
+                    copy.write(payload)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return {
+        'start': start,
+        'rows': len(data),
+        'bytes': end - start,
+        'coerced': converter.report.coerced(),
+        'read': convert_start - read_start,
+        'convert': insert_start - convert_start,
+        'insert': time.perf_counter() - insert_start,
+    }
+
+
+class ByteRangeLoader:
+    def __init__(self, conninfo: str, schema: str, plan: TablePlan, workers: Optional[int] = None,
+                 range_bytes: int = RANGE_BYTES):
+        """
+        Load one large plain source file with a pool of worker processes.
+
+        The file is split into newline-aligned byte ranges. Every worker process opens
+        its own database connection and, one range at a time, parses the range with
+        pandas, converts it with the table's TableConverter and COPies it in its own
+        transaction. Ranges are handed to whichever worker is free, and there are several
+        per worker, so a slow range does not leave the other cores idle at the end.
+
+        :param conninfo: libpq connection string of the target database.
+        :param schema: The schema containing the target table.
+        :param plan: The conversion plan of the target table.
+        :param workers: Worker processes; one per CPU when not given.
+        :param range_bytes: Upper bound of the bytes in one range.
+        """
+        self._conninfo = conninfo
+        self._schema = schema
+        self._plan = plan
+        self._workers = workers or os.cpu_count() or 1
+        self._range_bytes = range_bytes
+
+    def ranges(self, path: str) -> List[Tuple[int, int]]:
+        """The byte ranges of ``path``, sized so every worker gets several of them."""
+        balanced = os.path.getsize(path) // (self._workers * _RANGES_PER_WORKER)
+        return newline_ranges(path, max(_MIN_RANGE_BYTES, min(self._range_bytes, balanced)))
+
+    async def load(self, path: str, table: Optional[str] = None,
+                   progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Load ``path`` into ``table`` (default: the plan's table) of the schema.
+
+        :param path: Path of the plain Athena TSV file.
+        :param table: Table written to, e.g. a staging table with the same columns.
+        :param progress: Called on the event loop with the statistics of every loaded range.
+        :returns: Rows, bytes, ranges, workers and seconds of the load, and the values
+            coerced to null per column.
+        :raises Exception: The first error of any range; ranges not yet started are
+            cancelled, ranges already committed stay loaded.
+        """
+        start = time.perf_counter()
+        header = read_header(path)
+        columns = self._plan.select(header)
+        ranges = self.ranges(path)
+        stats = {'rows': 0, 'bytes': 0, 'ranges': len(ranges), 'workers': min(self._workers, len(ranges)),
+                 'coerced': {}}
+        if ranges:
+            loop = asyncio.get_running_loop()
+            target = f"{self._schema}.{table or self._plan.table}"
+            # spawned, not forked: other tables' threads may hold locks a forked child would inherit
+            pool = ProcessPoolExecutor(stats['workers'], mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=_init_worker,
+                                       initargs=(self._conninfo, path, header, columns, self._plan, target))
+            futures = []
+            try:
+                futures = [loop.run_in_executor(pool, _load_range, range_start, range_end)
+                           for range_start, range_end in ranges]
+                for future in asyncio.as_completed(futures):
+                    result = await future
+                    stats['rows'] += result['rows']
+                    stats['bytes'] += result['bytes']
+                    for column, count in result['coerced'].items():
+                        stats['coerced'][column] = stats['coerced'].get(column, 0) + count
+                    if progress is not None:
+                        progress(result)
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                # waits for the ranges still running, off the event loop so other tables keep loading
+                await loop.run_in_executor(None, functools.partial(pool.shutdown, cancel_futures=True))
+        stats['seconds'] = time.perf_counter() - start
+        return stats
@@ -0,0 +1,220 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, Iterator, Optional
+import pandas as pd
+import pyarrow as pa
+from .checkpoint import file_fingerprint
+from .readers import _PANDAS_TYPES
+from .schema_catalog import TablePlan, INTEGER_TYPES, NUMERIC_TYPES
+from .sources import Source
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ohdsi_cdm_loader', 'parsed')
+
+_SUFFIX = '.arrow'
+_TEMP_PREFIX = '.parsed-'
+# temporary files of loads that died without cleaning up are removed after a day
+_STALE_SECONDS = 24 * 3600
+
+
+def _arrow_type(data_type: Optional[str]) -> Optional[pa.DataType]:
+    """The Arrow type a converted column is cached as, or None to keep what pandas produced."""
+    if data_type in INTEGER_TYPES:
+        return pa.int64()
+    if data_type in NUMERIC_TYPES:
+        # a chunk of whole numbers converts to int64, the next one may not
+        return pa.float64()
+    return None
+
+
+class ParsedCacheWriter:
+    def __init__(self, cache: "ParsedCache", key: str, plan: TablePlan):
+        """
+        Write the converted chunks of one source file into a cache entry.
+
+        Chunks may finish converting out of order; they are written in source order, so
+        the rows of the entry keep the positions checkpoints record. The entry only
+        becomes visible once ``commit`` renames it into place.
+
+        :param cache: The cache the entry belongs to.
+        :param key: The entry's key, from ParsedCache.key.
+        :param plan: The conversion plan of the table.
+        """
+        self._cache = cache
+        self._key = key
+        self._plan = plan
+        self._lock = threading.Lock()
+        self._pending: Dict[int, tuple] = {}
+        self._next = 0
+        self._schema: Optional[pa.Schema] = None
+        self._writer = None
+        self._failed = False
+        fd, self._tmp_path = tempfile.mkstemp(dir=cache.folder, prefix=_TEMP_PREFIX, suffix=_SUFFIX)
+        os.close(fd)
+
+    def _to_table(self, data: pd.DataFrame) -> pa.Table:
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        if self._schema is None:
+            fields = []
+            for field in table.schema:
+                data_type = _arrow_type(self._plan.types.get(field.name))
+                fields.append(pa.field(field.name, data_type or field.type))
+            self._schema = pa.schema(fields)
+            self._writer = pa.ipc.new_file(self._tmp_path, self._schema)
+        return table.cast(self._schema)
+
+    def write(self, start: int, source_rows: int, data: pd.DataFrame) -> None:
+        """
+        Add the converted chunk covering source rows [start, start + source_rows).
+        A chunk that does not fit the entry's types only stops the caching of this file.
+        """
+        with self._lock:
+            if self._failed:
+                return
+            self._pending[start] = (source_rows, data)
+            try:
+                while self._next in self._pending:
+                    source_rows, data = self._pending.pop(self._next)
+                    table = self._to_table(data)
+                    self._writer.write_table(table)
+                    self._next += source_rows
+            except (pa.ArrowException, ValueError, TypeError) as e:
+                logging.warning(f"Not caching '{self._plan.table}': {e}")
+                self._failed = True
+                self._pending.clear()
+
+    def commit(self) -> None:
+        """Publish the entry once every chunk was written, then enforce the cache's size limit."""
+        with self._lock:
+            complete = not self._failed and not self._pending and self._writer is not None
+            if complete:
+                self._writer.close()
+                self._writer = None
+        if not complete:
+            self.discard()
+            return
+        path = self._cache.path(self._key)
+        os.replace(self._tmp_path, path)
+        logging.info(f"Cached parsed '{self._plan.table}' in '{path}' ({os.path.getsize(path) / 2**20:,.1f} MiB).")
+        self._cache.evict()
+
+    def discard(self) -> None:
+        """Drop the partial entry, e.g. after the load failed."""
+        with self._lock:
+            self._failed = True
+            self._pending.clear()
+            if self._writer is not None:
+                try:
+                    self._writer.close()
+                except pa.ArrowException:
+                    pass
+                self._writer = None
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+class ParsedCache:
+    def __init__(self, folder: Optional[str] = None, max_bytes: Optional[int] = None):
+        """
+        Converted source files on disk as typed Arrow IPC files, so unchanged files are
+        reloaded without parsing or converting them again.
+
+        An entry is keyed by the source file's fingerprint, the target schema and the
+        table's conversion plan, so a new vocabulary release, another schema or a DDL
+        change each miss. Entries are memory-mapped on read and their record batches go
+        straight to the inserter. Reading an entry marks it as used; once the entries
+        exceed ``max_bytes``, the least recently used ones are removed.
+
+        :param folder: Cache folder; DEFAULT_CACHE_DIR when not given.
+        :param max_bytes: Size limit of all entries together; unlimited when not given.
+        """
+        self.folder = folder or DEFAULT_CACHE_DIR
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.folder, exist_ok=True)
+
+    @staticmethod
+    def key(source: Source, schema: str, plan: TablePlan, synthea: bool = False) -> str:
+        """Return the key of a source file's entry for a table of ``schema``."""
+        digest = hashlib.sha256()
+        digest.update(file_fingerprint(source).encode())
+        columns = [(c.name, c.data_type, c.max_length) for c in plan.columns]
+        digest.update(json.dumps([schema.lower(), plan.table, columns, synthea]).encode())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        """Return the cache file of one entry."""
+        return os.path.join(self.folder, f"{key}{_SUFFIX}")
+
+    def batches(self, key: str, skip_rows: int = 0) -> Optional[Iterator[pa.RecordBatch]]:
+        """
+        Return the record batches of an entry from the memory-mapped file, without the
+        first ``skip_rows`` rows, or None if the entry is not cached.
+        """
+        path = self.path(key)
+        try:
+            source = pa.memory_map(path, 'r')
+            reader = pa.ipc.open_file(source)
+        except (OSError, pa.ArrowException):
+            return None
+        # the modification time orders entries by last use
+        os.utime(path)
+
+        def read():
+            skip = skip_rows
+            with source:
+                for index in range(reader.num_record_batches):
+                    batch = reader.get_batch(index)
+                    if skip >= len(batch):
+                        skip -= len(batch)
+                        continue
+                    if skip:
+                        batch, skip = batch.slice(skip), 0
+                    yield batch
+        return read()
+
+    @staticmethod
+    def to_frame(batch: pa.RecordBatch) -> pd.DataFrame:
+        """Hand a cached batch to pandas with the nullable integers conversion produced."""
+        frame = batch.to_pandas(types_mapper=_PANDAS_TYPES.get, date_as_object=False)
+        frame.attrs['coerced_to_null'] = 0
+        return frame
+
+    def writer(self, key: str, plan: TablePlan) -> ParsedCacheWriter:
+        """Start writing the entry of ``key``."""
+        return ParsedCacheWriter(self, key, plan)
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits its size limit."""
+        with self._lock:
+            entries = []
+            now = time.time()
+            for entry in os.scandir(self.folder):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                if entry.name.startswith(_TEMP_PREFIX):
+                    if now - stat.st_mtime > _STALE_SECONDS:
+                        os.remove(entry.path)
+                elif entry.name.endswith(_SUFFIX):
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            if self._max_bytes is None:
+                return
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self._max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                logging.info(f"Evicted '{path}' from the parsed cache ({size / 2**20:,.1f} MiB).")
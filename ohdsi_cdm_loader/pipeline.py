@@ -0,0 +1,138 @@
+import time
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterator
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# marks the end of a stage's input
+_DONE = object()
+
+
+@dataclass
+class Chunk:
+    """A slice of a source file: the offset of its first row, its data and how many source rows it covers."""
+    start: int
+    data: object
+    source_rows: int
+
+    @property
+    def end(self) -> int:
+        return self.start + self.source_rows
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+@dataclass
+class StageStats:
+    """Rows handled by one pipeline stage and the time it spent busy."""
+    name: str
+    rows: int = 0
+    items: int = 0
+    seconds: float = 0.0
+
+    def add(self, rows: int, seconds: float) -> None:
+        self.rows += rows
+        self.items += 1
+        self.seconds += seconds
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.rows} rows in {self.items} chunks, {self.seconds:.1f}s busy ({self.rows_per_sec:,.0f} rows/s)"
+
+
+class ChunkPipeline:
+    def __init__(self, queue_depth: int = 2, convert_workers: int = 2, insert_workers: int = 2):
+        """
+        Bounded read -> convert -> insert pipeline for the chunks of one file.
+
+        Reading and conversion run in worker threads so the event loop stays free for
+        inserts; at most ``queue_depth`` chunks wait between two stages, which bounds
+        the memory held by the pipeline.
+
+        :param queue_depth: Maximum number of chunks queued between two stages.
+        :param convert_workers: Number of chunks converted at the same time.
+        :param insert_workers: Number of chunks inserted at the same time.
+        """
+        if min(queue_depth, convert_workers, insert_workers) < 1:
+            raise ValueError("queue_depth, convert_workers and insert_workers must be at least 1")
+        self._queue_depth = queue_depth
+        self._convert_workers = convert_workers
+        self._insert_workers = insert_workers
+
+    @property
+    def chunks_in_flight(self) -> int:
+        """Most chunks alive at once: both queues full, one being read, one per worker (two while converting)."""
+        return 2 * self._queue_depth + 1 + 2 * self._convert_workers + self._insert_workers
+
+    async def run(self, chunks: Iterator, convert: Callable[[object], object],
+                  insert: Callable[[object], Awaitable[None]]) -> Dict[str, StageStats]:
+        """
+        Drive every chunk of ``chunks`` through ``convert`` and ``insert``.
+
+        :param chunks: Iterator of raw chunks, read sequentially in a worker thread.
+        :param convert: Function turning a raw chunk into insertable data; runs in a worker thread.
+        :param insert: Coroutine function inserting converted data; runs on the event loop.
+        :returns: The statistics of the read, convert and insert stages.
+        :raises Exception: The first error raised by any stage; the other stages are cancelled.
+        """
+        loop = asyncio.get_running_loop()
+        stats = {name: StageStats(name) for name in ('read', 'convert', 'insert')}
+        converted_queue: asyncio.Queue = asyncio.Queue(self._queue_depth)
+        read_queue: asyncio.Queue = asyncio.Queue(self._queue_depth)
+        executor = ThreadPoolExecutor(max_workers=self._convert_workers + 1, thread_name_prefix="cdm-pipeline")
+
+        async def read():
+            while True:
+                start = time.perf_counter()
+                chunk = await loop.run_in_executor(executor, next, chunks, _DONE)
+                if chunk is _DONE:
+                    break
+                stats['read'].add(len(chunk), time.perf_counter() - start)
+                await read_queue.put(chunk)
+            for _ in range(self._convert_workers):
+                await read_queue.put(_DONE)
+
+        async def convert_one():
+            while True:
+                chunk = await read_queue.get()
+                if chunk is _DONE:
+                    return
+                start = time.perf_counter()
+                data = await loop.run_in_executor(executor, convert, chunk)
+                stats['convert'].add(len(data), time.perf_counter() - start)
+                await converted_queue.put(data)
+
+        async def convert_all():
+            await asyncio.gather(*[convert_one() for _ in range(self._convert_workers)])
+            for _ in range(self._insert_workers):
+                await converted_queue.put(_DONE)
+
+        async def insert_one():
+            while True:
+                data = await converted_queue.get()
+                if data is _DONE:
+                    return
+                start = time.perf_counter()
+                await insert(data)
+                stats['insert'].add(len(data), time.perf_counter() - start)
+
+        tasks = [asyncio.ensure_future(read()), asyncio.ensure_future(convert_all())]
+        tasks += [asyncio.ensure_future(insert_one()) for _ in range(self._insert_workers)]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            executor.shutdown(wait=False)
+        return stats
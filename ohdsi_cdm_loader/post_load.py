@@ -0,0 +1,143 @@
+import re
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from psycopg import errors
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# statement -> table it touches
+_TABLE_PATTERNS = [
+    re.compile(r'^\s*ALTER\s+TABLE\s+(?:ONLY\s+)?([\w."]+)', re.IGNORECASE),
+    re.compile(r'^\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+.*?\s+ON\s+(?:ONLY\s+)?([\w."]+)', re.IGNORECASE | re.DOTALL),
+    re.compile(r'^\s*CLUSTER\s+([\w."]+)', re.IGNORECASE),
+]
+
+# errors raised when the object already exists from a previous run
+_ALREADY_EXISTS = (errors.DuplicateObject, errors.DuplicateTable, errors.InvalidTableDefinition)
+
+
+# primary, unique and foreign keys, and the indexes that back none of them, of a schema's tables
+EXISTING_KEYS_QUERY = """
+SELECT c.relname, con.conname, con.contype
+FROM pg_constraint con
+JOIN pg_class c ON c.oid = con.conrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = %s AND con.contype IN ('p', 'u', 'f')
+UNION ALL
+SELECT t.relname, i.relname, 'i'
+FROM pg_index x
+JOIN pg_class i ON i.oid = x.indexrelid
+JOIN pg_class t ON t.oid = x.indrelid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+WHERE n.nspname = %s AND NOT EXISTS (
+    SELECT 1 FROM pg_constraint con WHERE con.conrelid = x.indrelid AND con.conindid = x.indexrelid
+)
+"""
+
+
+def drop_statements(records: List[tuple], schema: str) -> List[str]:
+    """
+    Turn EXISTING_KEYS_QUERY rows of (table, name, kind) into DROP statements. Foreign
+    keys go first, so the primary keys they reference can be dropped after them.
+    """
+    order = {'f': 0, 'p': 1, 'u': 1, 'i': 2}
+    statements = []
+    for table, name, kind in sorted(records, key=lambda record: (order[record[2]], record[0], record[1])):
+        if kind == 'i':
+            statements.append(f'DROP INDEX IF EXISTS {schema}."{name}"')
+        else:
+            statements.append(f'ALTER TABLE {schema}."{table}" DROP CONSTRAINT IF EXISTS "{name}"')
+    return statements
+
+
+def split_sql(sql: str) -> List[str]:
+    """Split rendered DDL into single statements, dropping comments and blanks."""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def statement_table(statement: str) -> Optional[str]:
+    """Return the (unqualified, lower-case) table a DDL statement applies to."""
+    for pattern in _TABLE_PATTERNS:
+        match = pattern.match(statement)
+        if match:
+            return match.group(1).replace('"', '').split('.')[-1].lower()
+    return None
+
+
+def group_by_table(statements: List[str]) -> Dict[str, List[str]]:
+    """Group statements by their target table, keeping the rendered order within each table."""
+    groups: Dict[str, List[str]] = {}
+    for statement in statements:
+        groups.setdefault(statement_table(statement) or '', []).append(statement)
+    return groups
+
+
+class PostLoadBuilder:
+    def __init__(self, pool, workers: int = 4, maintenance_work_mem: str = '1GB',
+                 validate_foreign_keys: bool = False):
+        """
+        Build primary keys, indexes and foreign keys after a bulk load.
+
+        Tables are processed in parallel, up to ``workers`` at once. Within a table the
+        primary key is added first, then every CREATE INDEX runs concurrently, then the
+        remaining statements (such as CLUSTER) run in their rendered order. Foreign keys
+        are added last, one at a time, because they lock both tables they link.
+
+        :param pool: The shared async connection pool of the DatabaseHandler.
+        :param workers: Maximum number of tables being indexed at the same time.
+        :param maintenance_work_mem: maintenance_work_mem for every build statement.
+        :param validate_foreign_keys: Check existing rows when adding foreign keys. When
+            False they are added NOT VALID, matching a load with triggers disabled.
+        """
+        self._pool = pool
+        self._workers = workers
+        self._maintenance_work_mem = maintenance_work_mem
+        self._validate_foreign_keys = validate_foreign_keys
+
+    async def _execute(self, statement: str) -> None:
+        start = time.perf_counter()
+        try:
+            async with self._pool.connection() as conn:
+                await conn.execute(f"SET LOCAL maintenance_work_mem = '{self._maintenance_work_mem}'")
+                await conn.execute(statement)
+        except _ALREADY_EXISTS as e:
+            logging.info(f"Skipped, already present: {e}")
+            return
+        logging.info(f"{statement.splitlines()[0][:100]} ({time.perf_counter() - start:.1f}s)")
+
+    async def _build_table(self, primary_keys: List[str], indices: List[str], semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            for statement in primary_keys:
+                await self._execute(statement)
+            creates = [s for s in indices if re.match(r'^\s*CREATE\s', s, re.IGNORECASE)]
+            others = [s for s in indices if s not in creates]
+            await asyncio.gather(*[self._execute(statement) for statement in creates])
+            for statement in others:
+                await self._execute(statement)
+
+    async def build(self, primary_key_sql: str = '', index_sql: str = '', foreign_key_sql: str = '') -> None:
+        """
+        Run the rendered primary key, index and foreign key scripts.
+
+        :raises Exception: The first statement that failed for a reason other than the
+            object already existing.
+        """
+        start = time.perf_counter()
+        primary_keys = group_by_table(split_sql(primary_key_sql))
+        indices = group_by_table(split_sql(index_sql))
+        semaphore = asyncio.Semaphore(self._workers)
+        tables = sorted(set(primary_keys) | set(indices))
+        await asyncio.gather(*[
+            self._build_table(primary_keys.get(table, []), indices.get(table, []), semaphore)
+            for table in tables
+        ])
+
+        for statement in split_sql(foreign_key_sql):
+            if not self._validate_foreign_keys and re.search(r'\bFOREIGN\s+KEY\b', statement, re.IGNORECASE):
+                statement = f"{statement} NOT VALID"
+            await self._execute(statement)
+        logging.info(f"Post-load build of {len(tables)} tables completed in {time.perf_counter() - start:.1f}s.")
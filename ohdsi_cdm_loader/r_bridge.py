@@ -0,0 +1,105 @@
+import os
+import logging
+import tempfile
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+BRIDGE_METHODS = ('memory', 'disk')
+
+
+class ArrowBridge:
+    def __init__(self, arrow: object = None, method: str = 'memory'):
+        """
+        Move data frames between R and Python through Arrow.
+
+        The 'memory' method serialises the frame into an Arrow IPC stream held in an
+        R raw vector, so nothing touches the filesystem. The 'disk' method writes a
+        feather file into a private temporary file and is kept as a fallback for R
+        arrow builds that cannot read or write IPC streams.
+
+        :param arrow: The imported R arrow package. Imported, with R, on the first conversion when not given.
+        :param method: Either 'memory' or 'disk'.
+        """
+        if method not in BRIDGE_METHODS:
+            raise ValueError(f"Unknown bridge method '{method}', expected one of {BRIDGE_METHODS}")
+        self._arrow_package = arrow
+        self._method = method
+
+    @property
+    def _arrow(self) -> object:
+        if self._arrow_package is None:
+            from rpy2.robjects.packages import importr
+            self._arrow_package = importr('arrow')
+        return self._arrow_package
+
+    def get_method(self) -> str:
+        """Return the active conversion method."""
+        return self._method
+
+    def to_python(self, rdf: object) -> pd.DataFrame:
+        """Convert an R data frame into a pandas data frame."""
+        if self._method == 'memory':
+            try:
+                return self._memory_to_python(rdf)
+            except Exception as e:
+                self._fall_back(e)
+        return self._disk_to_python(rdf)
+
+    def to_r(self, df: pd.DataFrame) -> object:
+        """Convert a pandas data frame into an R data frame."""
+        if self._method == 'memory':
+            try:
+                return self._memory_to_r(df)
+            except Exception as e:
+                self._fall_back(e)
+        return self._disk_to_r(df)
+
+    def _fall_back(self, error: Exception) -> None:
+        logging.warning(f"In-memory Arrow bridge failed ({error}); falling back to feather files on disk.")
+        self._method = 'disk'
+
+    def _memory_to_python(self, rdf: object) -> pd.DataFrame:
+        raw = self._arrow.write_to_raw(rdf, format='stream')
+        try:
+            # share the R raw vector's memory instead of copying it into a bytes object
+            buffer = pa.py_buffer(raw.memoryview())
+        except (AttributeError, NotImplementedError):
+            buffer = pa.py_buffer(bytes(raw))
+        with pa.ipc.open_stream(buffer) as reader:
+            return reader.read_pandas()
+
+    def _memory_to_r(self, df: pd.DataFrame) -> object:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        from rpy2.robjects.vectors import ByteVector
+        raw = ByteVector(sink.getvalue().to_pybytes())
+        return self._arrow.read_ipc_stream(raw, as_data_frame=True)
+
+    def _disk_to_python(self, rdf: object) -> pd.DataFrame:
+        path = self._temp_path()
+        try:
+            self._arrow.write_feather(rdf, path)
+            return feather.read_feather(path)
+        finally:
+            os.remove(path)
+
+    def _disk_to_r(self, df: pd.DataFrame) -> object:
+        path = self._temp_path()
+        try:
+            feather.write_feather(df, path)
+            return self._arrow.read_feather(path)
+        finally:
+            os.remove(path)
+
+    @staticmethod
+    def _temp_path() -> str:
+        # a private file per call, so concurrent loads never share a path
+        handle, path = tempfile.mkstemp(suffix='.feather')
+        os.close(handle)
+        return path
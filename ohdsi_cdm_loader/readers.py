@@ -0,0 +1,156 @@
+import csv
+import logging
+from typing import Iterator, List
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.compute as pc
+from .schema_catalog import TablePlan, CHARACTER_TYPES, DATE_TYPES
+from .conversion import ConversionReport, _to_number
+from .sources import Source, open_text, readable
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+READERS = ('pandas', 'arrow')
+
+# database type -> Arrow type the column is parsed into
+ARROW_TYPES = {
+    'smallint': pa.int16(),
+    'integer': pa.int32(),
+    'bigint': pa.int64(),
+    'numeric': pa.float64(),
+    'double precision': pa.float64(),
+    'real': pa.float64(),
+}
+
+# pd.read_csv options of an Athena TSV, shared by every engine that parses one with pandas.
+# Athena files are unquoted: a quote is part of the value, as COPY and the Arrow reader keep it.
+ATHENA_TSV = dict(sep='\t', quoting=csv.QUOTE_NONE, na_values=[], keep_default_na=False)
+
+# nullable pandas dtypes for the Arrow integer columns
+_PANDAS_TYPES = {
+    pa.int16(): pd.Int16Dtype(),
+    pa.int32(): pd.Int32Dtype(),
+    pa.int64(): pd.Int64Dtype(),
+}
+
+
+def read_header(file_path: Source, synthea: bool = False) -> List[str]:
+    """Return the lower-cased column names in the first line of a source file."""
+    with open_text(file_path) as handle:
+        if synthea:
+            header = next(csv.reader(handle), [])
+        else:
+            header = handle.readline().rstrip('\r\n').split('\t')
+    return [name.strip().lower() for name in header]
+
+
+def pandas_chunks(file_path, chunk_size: int, synthea: bool = False, skip_rows: int = 0):
+    """
+    Return the pandas chunk iterator for an Athena TSV or a Synthea CSV, optionally
+    starting ``skip_rows`` records after the header. ``file_path`` may also be an open
+    binary stream, e.g. from sources.readable.
+    """
+    skiprows = range(1, skip_rows + 1) if skip_rows else None
+    if synthea:
+        return pd.read_csv(file_path, chunksize=chunk_size, low_memory=False, skiprows=skiprows)
+    return pd.read_csv(file_path, chunksize=chunk_size, low_memory=False, skiprows=skiprows, **ATHENA_TSV)
+
+
+class ArrowCSVReader:
+    def __init__(self, plan: TablePlan, synthea: bool = False, block_size: int = 16 << 20,
+                 report: ConversionReport = None):
+        """
+        Stream a source file as Arrow record batches parsed on multiple threads.
+
+        Column types come from the table plan instead of inference: IDs become
+        int16/int32/int64, numerics float64 and strings stay strings. Numbers and dates
+        are read as text and converted per batch, so an invalid value becomes NULL and is
+        counted, as with the pandas reader, instead of failing the whole table. Columns
+        the table does not have are never materialised.
+
+        :param plan: The conversion plan of the target table.
+        :param synthea: Parse quoted Synthea CSV instead of Athena TSV.
+        :param block_size: Bytes of source text parsed per record batch.
+        :param report: Tally of invalid numbers and dates coerced to null; a new one when not given.
+        """
+        self._plan = plan
+        self._synthea = synthea
+        self._block_size = block_size
+        self._date_format = '%Y-%m-%d' if synthea else '%Y%m%d'
+        self.report = report if report is not None else ConversionReport()
+
+    def batches(self, file_path: Source, skip_rows: int = 0) -> Iterator[pa.RecordBatch]:
+        """
+        Yield the record batches of ``file_path`` restricted to the table's columns,
+        optionally starting ``skip_rows`` records after the header. ``file_path`` is a
+        source, not an open stream: its header is read first, then it is opened again
+        (decompressing if needed) for the batches.
+        """
+        header = read_header(file_path, self._synthea)
+        columns = self._plan.select(header)
+        # every column is parsed as text; to_frame casts numbers so a bad value cannot fail the read
+        column_types = {column: pa.string() for column in columns}
+
+        read_options = pa_csv.ReadOptions(
+            use_threads=True,
+            block_size=self._block_size,
+            skip_rows=1,
+            skip_rows_after_names=skip_rows,
+            column_names=header,
+        )
+        if self._synthea:
+            parse_options = pa_csv.ParseOptions(delimiter=',', newlines_in_values=True)
+        else:
+            # Athena files are unquoted; quotes inside concept names are literal
+            parse_options = pa_csv.ParseOptions(delimiter='\t', quote_char=False)
+        convert_options = pa_csv.ConvertOptions(
+            column_types=column_types,
+            include_columns=columns,
+            strings_can_be_null=False,
+        )
+        with readable(file_path) as input_file, pa_csv.open_csv(
+                input_file, read_options=read_options,
+                parse_options=parse_options, convert_options=convert_options) as reader:
+            for batch in reader:
+                yield batch
+
+    @staticmethod
+    def _to_number(array: pa.Array, arrow_type: pa.DataType):
+        """Cast a text column to ``arrow_type``; empty values are NULL and so are invalid ones, counted."""
+        array = pc.if_else(pc.equal(array, ''), pa.scalar(None, pa.string()), array)
+        try:
+            return pc.cast(array, arrow_type), 0
+        except pa.ArrowInvalid:
+            # rare: coerce the batch the way the pandas converter does
+            series, coerced = _to_number(array.to_pandas(), pa.types.is_integer(arrow_type))
+            return pa.array(series).cast(arrow_type), coerced
+
+    def to_frame(self, batch: pa.RecordBatch) -> pd.DataFrame:
+        """
+        Finish a record batch for insertion: cast numbers, parse dates, cut strings to
+        their varchar limit and hand the result to pandas with nullable integers.
+        """
+        arrays, names, coerced = [], [], {}
+        for name, array in zip(batch.schema.names, batch.columns):
+            data_type = self._plan.types.get(name)
+            if data_type in ARROW_TYPES:
+                array, coerced[name] = self._to_number(array, ARROW_TYPES[data_type])
+            elif data_type in DATE_TYPES:
+                if self._synthea:
+                    array = pc.utf8_slice_codeunits(array, 0, 10)
+                present = pc.not_equal(array, '')
+                array = pc.cast(pc.strptime(array, format=self._date_format, unit='s', error_is_null=True), pa.date32())
+                coerced[name] = pc.sum(pc.and_(present, pc.is_null(array))).as_py() or 0
+            elif data_type in CHARACTER_TYPES:
+                max_length = self._plan.max_lengths.get(name)
+                if max_length and len(array) and (pc.max(pc.utf8_length(array)).as_py() or 0) > max_length:
+                    array = pc.utf8_slice_codeunits(array, 0, max_length)
+            arrays.append(array)
+            names.append(name)
+        self.report.add(len(batch), coerced)
+        table = pa.Table.from_arrays(arrays, names=names)
+        frame = table.to_pandas(types_mapper=_PANDAS_TYPES.get, date_as_object=False)
+        frame.attrs['coerced_to_null'] = sum(coerced.values())
+        return frame
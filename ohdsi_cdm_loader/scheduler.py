@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+from tqdm import tqdm
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Vocabulary tables that reference CONCEPT without CONCEPT referencing them back.
+# CONCEPT itself is circular with VOCABULARY, DOMAIN and CONCEPT_CLASS, so with FK
+# triggers enabled those tables can only be ordered after CONCEPT, not before it.
+CDM_VOCABULARY_DEPENDENCIES = {
+    'concept_relationship': ['concept', 'relationship'],
+    'concept_ancestor': ['concept'],
+    'concept_synonym': ['concept'],
+    'drug_strength': ['concept'],
+}
+
+
+@dataclass
+class TableJob:
+    """One table to load: its name, source size in bytes, a coroutine factory and its number of source files."""
+    table: str
+    size: int
+    load: Callable[[], Awaitable[object]]
+    depends_on: List[str] = field(default_factory=list)
+    shards: int = 1
+
+
+class TableScheduler:
+    def __init__(self, max_workers: int = 4, dependencies: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Run table loads concurrently, biggest source file first.
+
+        :param max_workers: Maximum number of tables loading at the same time.
+        :param dependencies: Optional mapping of table to the tables that must finish
+            loading before it starts. Tables outside the current run are ignored.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self._max_workers = max_workers
+        self._dependencies = {k.lower(): [d.lower() for d in v] for k, v in (dependencies or {}).items()}
+        self._rows: Dict[str, int] = {}
+        self._shards_done: Dict[str, int] = {}
+        self._running: List[str] = []
+        self._progress: Optional[tqdm] = None
+
+    def job(self, table: str, size: int, load: Callable[[], Awaitable[object]], shards: int = 1) -> TableJob:
+        """Build a job for ``table`` with the dependencies configured on the scheduler."""
+        return TableJob(table, size, load, list(self._dependencies.get(table.lower(), [])), shards)
+
+    def advance(self, table: str, rows: int) -> None:
+        """Record ``rows`` loaded into ``table`` in the combined progress display."""
+        table = table.lower()
+        self._rows[table] = self._rows.get(table, 0) + rows
+        self._refresh()
+
+    def shard_done(self, table: str) -> None:
+        """Count one finished source file of a sharded table in the combined progress."""
+        # loaders report 'CONCEPT' when the files are upper case; jobs are keyed 'concept'
+        table = table.lower()
+        self._shards_done[table] = self._shards_done.get(table, 0) + 1
+        if self._progress is not None:
+            self._progress.update(1)
+
+    def _refresh(self) -> None:
+        if self._progress is not None:
+            self._progress.set_postfix(
+                rows=f"{sum(self._rows.values()):,}",
+                running=",".join(self._running) or "-",
+                refresh=True,
+            )
+
+    def _check_graph(self, jobs: List[TableJob]) -> None:
+        """Reject dependency cycles among the scheduled tables."""
+        names = {job.table.lower() for job in jobs}
+        graph = {job.table.lower(): [d for d in job.depends_on if d in names] for job in jobs}
+        visiting, done = set(), set()
+
+        def visit(node, path):
+            if node in done:
+                return
+            if node in visiting:
+                raise ValueError(f"Dependency cycle between tables: {' -> '.join(path + [node])}")
+            visiting.add(node)
+            for dep in graph[node]:
+                visit(dep, path + [node])
+            visiting.discard(node)
+            done.add(node)
+
+        for node in graph:
+            visit(node, [])
+
+    async def run(self, jobs: List[TableJob]) -> Dict[str, object]:
+        """
+        Load every job and return each table's result.
+
+        :raises RuntimeError: If any table failed. Tables that depend on a failed
+            table are not started; tables already running are allowed to finish.
+        """
+        self._check_graph(jobs)
+        names = {job.table.lower() for job in jobs}
+        pending = sorted(jobs, key=lambda job: job.size, reverse=True)
+        finished, failed = set(), {}
+        results: Dict[str, object] = {}
+        running: Dict[asyncio.Task, TableJob] = {}
+
+        # sharded tables advance the bar once per source file
+        self._progress = tqdm(total=sum(job.shards for job in jobs), desc="Loading tables", unit="file")
+        try:
+            while pending or running:
+                for job in list(pending):
+                    if len(running) >= self._max_workers or failed:
+                        break
+                    deps = [d for d in job.depends_on if d in names]
+                    if all(d in finished for d in deps):
+                        pending.remove(job)
+                        running[asyncio.ensure_future(job.load())] = job
+                        self._running.append(job.table)
+                        logging.info(f"Started loading '{job.table}' ({job.size / 1e6:,.1f} MB).")
+                self._refresh()
+
+                if not running:
+                    # nothing can start: remaining jobs wait on a failed table
+                    break
+
+                done, _ = await asyncio.wait(running.keys(), return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    job = running.pop(task)
+                    self._running.remove(job.table)
+                    try:
+                        results[job.table] = task.result()
+                        finished.add(job.table.lower())
+                    except Exception as e:
+                        failed[job.table] = e
+                        logging.error(f"Failed to load table '{job.table}': {e}")
+                    self._progress.update(max(job.shards - self._shards_done.pop(job.table.lower(), 0), 0))
+        finally:
+            self._progress.close()
+            self._progress = None
+
+        if failed:
+            skipped = [job.table for job in pending]
+            details = "; ".join(f"{table}: {error}" for table, error in failed.items())
+            raise RuntimeError(f"Failed to load {len(failed)} table(s) ({details}). Not started: {skipped}")
+        return results
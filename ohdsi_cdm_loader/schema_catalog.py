@@ -0,0 +1,132 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+INTEGER_TYPES = ('integer', 'bigint', 'smallint')
+NUMERIC_TYPES = ('numeric', 'double precision', 'real')
+CHARACTER_TYPES = ('character', 'character varying', 'text')
+DATE_TYPES = ('date', 'Date')
+DATETIME_TYPES = ('timestamp without time zone', 'timestamp with time zone')
+
+
+@dataclass
+class ColumnSpec:
+    """A single column of a CDM table as reported by information_schema."""
+    name: str
+    data_type: str
+    max_length: Optional[int] = None
+
+
+@dataclass
+class TablePlan:
+    """
+    Conversion plan for one table, built once from the schema catalog and
+    reused for every chunk loaded into that table.
+    """
+    table: str
+    columns: List[ColumnSpec] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.types: Dict[str, str] = {c.name: c.data_type for c in self.columns}
+        self.max_lengths: Dict[str, Optional[int]] = {c.name: c.max_length for c in self.columns}
+        self.integer_columns = [c.name for c in self.columns if c.data_type in INTEGER_TYPES]
+        self.numeric_columns = [c.name for c in self.columns if c.data_type in NUMERIC_TYPES]
+        self.character_columns = [c.name for c in self.columns if c.data_type in CHARACTER_TYPES]
+        self.date_columns = [c.name for c in self.columns if c.data_type in DATE_TYPES]
+        self.datetime_columns = [c.name for c in self.columns if c.data_type in DATETIME_TYPES]
+
+    @property
+    def column_names(self) -> List[str]:
+        """Column names in database ordinal order."""
+        return [c.name for c in self.columns]
+
+    def select(self, dataframe_columns: Iterable[str]) -> List[str]:
+        """
+        Return the columns that exist both in the table and the data frame,
+        in database ordinal order. Unknown source columns are dropped.
+        """
+        available = set(dataframe_columns)
+        return [name for name in self.column_names if name in available]
+
+
+class SchemaCatalog:
+    """
+    Column metadata for every table in a CDM schema, fetched with a single
+    information_schema query at startup.
+    """
+
+    QUERY = (
+        "SELECT table_name, column_name, data_type, character_maximum_length "
+        "FROM information_schema.columns WHERE table_schema = '{schema}' "
+        "ORDER BY table_name, ordinal_position"
+    )
+
+    def __init__(self, schema: str):
+        """
+        Initialize an empty catalog for the given schema.
+
+        :param schema: The CDM schema the catalog describes.
+        """
+        self._schema = schema
+        self._columns: Dict[str, List[ColumnSpec]] = {}
+        self._plans: Dict[str, TablePlan] = {}
+
+    @classmethod
+    def query(cls, schema: str) -> str:
+        """Return the SQL that fetches the catalog for ``schema``."""
+        return cls.QUERY.format(schema=schema)
+
+    @classmethod
+    def from_records(cls, schema: str, records) -> "SchemaCatalog":
+        """
+        Build a catalog from a pandas data frame (or iterable of 4-tuples) holding
+        table name, column name, data type and character maximum length.
+        """
+        catalog = cls(schema)
+        if hasattr(records, 'columns'):
+            frame = records.copy()
+            frame.columns = [str(c).lower() for c in frame.columns]
+            records = frame[['table_name', 'column_name', 'data_type', 'character_maximum_length']].itertuples(index=False, name=None)
+
+        for table_name, column_name, data_type, max_length in records:
+            catalog.add_column(table_name, column_name, data_type, max_length)
+        logging.info(f"Schema catalog loaded for '{schema}' with {len(catalog._columns)} tables.")
+        return catalog
+
+    def add_column(self, table: str, column: str, data_type: str, max_length=None) -> None:
+        """Register a column; invalidates any plan already built for the table."""
+        try:
+            max_length = int(max_length) if max_length is not None and max_length == max_length else None
+        except (TypeError, ValueError):
+            max_length = None
+        table = table.lower()
+        self._columns.setdefault(table, []).append(ColumnSpec(column.lower(), data_type, max_length))
+        self._plans.pop(table, None)
+
+    def get_schema(self) -> str:
+        """Return the schema described by the catalog."""
+        return self._schema
+
+    def tables(self) -> List[str]:
+        """Return the tables known to the catalog."""
+        return list(self._columns.keys())
+
+    def has_table(self, table: str) -> bool:
+        """Return True if the table exists in the catalog."""
+        return table.lower() in self._columns
+
+    def plan(self, table: str) -> TablePlan:
+        """
+        Return the cached conversion plan for a table.
+
+        :raises ValueError: If the table is not part of the schema.
+        """
+        key = table.lower()
+        if key not in self._plans:
+            if key not in self._columns:
+                raise ValueError(f"Table '{table}' not found in schema '{self._schema}'.")
+            self._plans[key] = TablePlan(key, self._columns[key])
+        return self._plans[key]
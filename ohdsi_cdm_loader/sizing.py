@@ -0,0 +1,124 @@
+import re
+import threading
+import logging
+from typing import Iterator, Union
+import pandas as pd
+from .sources import Source, open_binary
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+_UNITS = {'': 1, 'B': 1, 'K': 1 << 10, 'KB': 1 << 10, 'M': 1 << 20, 'MB': 1 << 20,
+          'G': 1 << 30, 'GB': 1 << 30, 'T': 1 << 40, 'TB': 1 << 40}
+
+# bytes of source text sampled to estimate the width of a row before any chunk is read
+_SAMPLE_BYTES = 1 << 20
+
+# pandas object columns take several times the bytes of their text; used until a chunk is measured
+_DEFAULT_EXPANSION = 8.0
+
+
+def parse_size(value: Union[str, int, None]) -> int:
+    """
+    Parse a memory size such as '2GB', '512M' or 1073741824 into bytes.
+
+    :raises ValueError: If the value is not a size.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?B?)\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid memory size '{value}', expected e.g. '2GB' or '512MB'")
+    return int(float(match.group(1)) * _UNITS[match.group(2)])
+
+
+def source_bytes_per_row(file_path: Source) -> float:
+    """Average bytes per line in the first MiB of a source file."""
+    with open_binary(file_path) as handle:
+        handle.readline()  # header
+        sample = handle.read(_SAMPLE_BYTES)
+    lines = sample.count(b'\n')
+    return len(sample) / lines if lines else max(len(sample), 1)
+
+
+class ChunkSizer:
+    def __init__(self, budget: int, chunks_in_flight: int, bytes_per_row: float,
+                 min_rows: int = 1000, max_rows: int = 2_000_000, smoothing: float = 0.5):
+        """
+        Size chunks so the chunks held by one load stay within a memory budget.
+
+        The first chunk is sized from the width of the source rows times a conservative
+        expansion factor; every chunk read after that is measured with
+        ``memory_usage(deep=True)`` and the bytes per row are smoothed over chunks.
+
+        :param budget: Bytes the chunks of this load may occupy together.
+        :param chunks_in_flight: Chunks the pipeline can hold at the same time.
+        :param bytes_per_row: Source bytes per row, e.g. from source_bytes_per_row.
+        :param smoothing: Weight of the newest measurement in the moving average.
+        """
+        self._budget = budget
+        self._chunks_in_flight = max(chunks_in_flight, 1)
+        self._min_rows = min_rows
+        self._max_rows = max_rows
+        self._smoothing = smoothing
+        self._lock = threading.Lock()
+        self.bytes_per_row = bytes_per_row * _DEFAULT_EXPANSION
+
+    @property
+    def rows(self) -> int:
+        """Rows of the next chunk."""
+        rows = int(self._budget / self._chunks_in_flight / max(self.bytes_per_row, 1.0))
+        return max(self._min_rows, min(rows, self._max_rows))
+
+    def observe(self, frame: pd.DataFrame) -> None:
+        """Update the bytes-per-row estimate from a chunk that was read."""
+        if len(frame) == 0:
+            return
+        measured = frame.memory_usage(deep=True, index=True).sum() / len(frame)
+        with self._lock:
+            self.bytes_per_row = self._smoothing * measured + (1 - self._smoothing) * self.bytes_per_row
+
+    def chunks(self, reader) -> Iterator[pd.DataFrame]:
+        """Read a pandas TextFileReader with chunk sizes following the estimate."""
+        while True:
+            try:
+                chunk = reader.get_chunk(self.rows)
+            except StopIteration:
+                return
+            self.observe(chunk)
+            yield chunk
+
+
+class BatchSizer:
+    def __init__(self, initial: int, min_rows: int = 1000, max_rows: int = 1_000_000,
+                 target_seconds: float = 2.0, increase: float = 0.25):
+        """
+        Adapt the insert batch size to measured insert latency (additive increase,
+        multiplicative decrease).
+
+        A batch that finishes under ``target_seconds`` grows the next one by
+        ``increase`` of the initial size; a batch slower than twice the target halves it.
+        Throughput stays near the maximum the database sustains while each COPY stays
+        short enough not to hold a connection, and its payload, for long.
+
+        :param initial: Batch size to start from.
+        :param target_seconds: Insert latency the batch size aims for.
+        :param increase: Fraction of ``initial`` added after a fast batch.
+        """
+        self._min_rows = min_rows
+        self._max_rows = max(max_rows, min_rows)
+        self._target = target_seconds
+        self._step = max(int(initial * increase), 1)
+        self._lock = threading.Lock()
+        self.size = max(min_rows, min(initial, self._max_rows))
+
+    def observe(self, rows: int, seconds: float) -> None:
+        """Record the latency of one inserted batch."""
+        if rows <= 0:
+            return
+        with self._lock:
+            if seconds > 2 * self._target:
+                self.size = max(self._min_rows, self.size // 2)
+            elif seconds < self._target and rows >= self.size:
+                # only a full batch says anything about a bigger one
+                self.size = min(self._max_rows, self.size + self._step)
@@ -0,0 +1,256 @@
+import io
+import os
+import re
+import glob
+import gzip
+import queue
+import zipfile
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for .zst vocabularies
+    zstandard = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+COMPRESSIONS = ('gz', 'zst')
+
+# decompressed bytes handed over per block, and blocks buffered ahead of the parser
+_BLOCK_BYTES = 4 << 20
+_BLOCKS_AHEAD = 8
+_EOF = object()
+
+
+@dataclass(frozen=True)
+class SourceFile:
+    """A compressed source: a member of a zip archive, or a .gz / .zst file."""
+    path: str
+    compression: str
+    member: Optional[str] = None
+    size: int = 0
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.member) if self.member else os.path.basename(self.path)
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.member}" if self.member else self.path
+
+
+Source = Union[str, SourceFile]
+
+
+def source_name(source: Source) -> str:
+    """Return the file name of a source, e.g. 'CONCEPT.csv'."""
+    return source.name if isinstance(source, SourceFile) else os.path.basename(source)
+
+
+def source_size(source: Source) -> int:
+    """Return the (uncompressed, where known) size of a source in bytes."""
+    return source.size if isinstance(source, SourceFile) else os.path.getsize(source)
+
+
+@contextmanager
+def _decompressed(source: SourceFile):
+    """Yield the decompressed byte stream of a compressed source."""
+    if source.compression == 'zip':
+        with zipfile.ZipFile(source.path) as archive, archive.open(source.member) as stream:
+            yield stream
+    elif source.compression == 'gz':
+        with gzip.open(source.path, 'rb') as stream:
+            yield stream
+    elif source.compression == 'zst':
+        with open(source.path, 'rb') as raw, zstandard.ZstdDecompressor().stream_reader(raw) as stream:
+            yield stream
+    else:
+        raise ValueError(f"Unknown compression '{source.compression}' for '{source.path}'.")
+
+
+class _ThreadedReader(io.RawIOBase):
+    def __init__(self, source: SourceFile, block_size: int = _BLOCK_BYTES, blocks_ahead: int = _BLOCKS_AHEAD):
+        """
+        Raw stream whose data is decompressed on a background thread.
+
+        zlib and zstd release the GIL while they decompress, so decompression of the
+        next blocks overlaps parsing of the current one. At most ``blocks_ahead``
+        blocks are buffered, which bounds memory.
+        """
+        super().__init__()
+        if source.compression == 'zst' and zstandard is None:
+            raise RuntimeError(f"Reading '{source.path}' needs the optional 'zstandard' package.")
+        self._queue: queue.Queue = queue.Queue(blocks_ahead)
+        self._stop = threading.Event()
+        self._pending = memoryview(b'')
+        self._done = False
+        self._thread = threading.Thread(target=self._pump, args=(source, block_size),
+                                        name='cdm-decompress', daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _pump(self, source: SourceFile, block_size: int) -> None:
+        try:
+            with _decompressed(source) as stream:
+                while not self._stop.is_set():
+                    block = stream.read(block_size)
+                    if not block or not self._put(block):
+                        break
+        except BaseException as e:
+            self._put(e)
+        self._put(_EOF)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            if self._done:
+                return 0
+            item = self._queue.get()
+            if item is _EOF:
+                self._done = True
+                return 0
+            if isinstance(item, BaseException):
+                self._done = True
+                raise item
+            self._pending = memoryview(item)
+        count = min(len(buffer), len(self._pending))
+        buffer[:count] = self._pending[:count]
+        self._pending = self._pending[count:]
+        return count
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            # unblock the pump if it waits on a full queue
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._thread.join(timeout=5)
+        super().close()
+
+
+def open_binary(source: Source) -> io.BufferedIOBase:
+    """Open a source for binary reading, decompressing on a background thread if needed."""
+    if isinstance(source, SourceFile):
+        return io.BufferedReader(_ThreadedReader(source), buffer_size=1 << 20)
+    return open(source, 'rb')
+
+
+def open_text(source: Source) -> io.TextIOBase:
+    """Open a source as UTF-8 text, keeping line endings as they are."""
+    if isinstance(source, SourceFile):
+        return io.TextIOWrapper(open_binary(source), encoding='utf-8', newline='')
+    return open(source, 'r', encoding='utf-8', newline='')
+
+
+@contextmanager
+def readable(source: Source):
+    """Yield what pandas and pyarrow read fastest: the path of a plain file, or a decompressing stream."""
+    if isinstance(source, SourceFile):
+        with open_binary(source) as handle:
+            yield handle
+    else:
+        yield source
+
+
+def _compressed(path: str) -> Optional[str]:
+    for compression in COMPRESSIONS:
+        if path.lower().endswith(f".csv.{compression}"):
+            return compression
+    return None
+
+
+def as_source(path: str) -> Source:
+    """Return a plain path as is, or a SourceFile for a .csv.gz / .csv.zst path."""
+    compression = _compressed(path)
+    return SourceFile(path, compression, size=os.path.getsize(path)) if compression else path
+
+
+def discover_shards(folder_path: str, table_name: str, pattern: Optional[str] = None) -> List[Source]:
+    """
+    Find the part files of a table that is exported as several shards.
+
+    Shards are the CSV files in a folder named after the table
+    (``concept_relationship/*.csv``), or files named ``{table}_<n>.csv`` or
+    ``{table}-part-<n>.csv`` next to the other files. Each may be gzip or zstd
+    compressed. Names of other tables never match, e.g. 'concept' does not pick up
+    'concept_relationship.csv'.
+
+    :param folder_path: The folder of the source files.
+    :param table_name: The table, matched case-insensitively.
+    :param pattern: A glob, absolute or relative to folder_path, used instead of the
+        default discovery, e.g. 'exports/cr_*.csv.gz'.
+    :returns: The shards in name order; empty when none are found.
+    """
+    if not os.path.isdir(folder_path):
+        return []
+    if pattern is not None:
+        paths = glob.glob(os.path.join(folder_path, pattern))
+    else:
+        shard_name = re.compile(rf'^{re.escape(table_name)}[_-](?:part[_-]?)?\d+\.csv(?:\.(?:{"|".join(COMPRESSIONS)}))?$',
+                                re.IGNORECASE)
+        paths = []
+        for entry in os.listdir(folder_path):
+            path = os.path.join(folder_path, entry)
+            if entry.lower() == table_name.lower() and os.path.isdir(path):
+                paths += [os.path.join(path, name) for name in os.listdir(path)
+                          if name.lower().endswith('.csv') or _compressed(name)]
+            elif shard_name.match(entry):
+                paths.append(path)
+    return [as_source(path) for path in sorted(paths) if os.path.isfile(path)]
+
+
+def discover_sources(folder_path: str, file_names: Iterable[str]) -> Dict[str, Source]:
+    """
+    Find the source of every ``{name}.csv`` in a folder or an Athena zip archive.
+
+    In a folder, a plain ``{name}.csv`` wins over ``{name}.csv.gz`` and ``{name}.csv.zst``,
+    which win over a member of any ``.zip`` in the folder. Zip members are matched by
+    base name, case-insensitively, so archives with a top-level directory work too.
+
+    :param folder_path: A folder, or the path of a zip archive.
+    :param file_names: File names to look for, e.g. 'CONCEPT.csv'.
+    :returns: file name -> plain path or SourceFile, for the names that were found.
+    """
+    wanted = {name.lower(): name for name in file_names}
+    found: Dict[str, Source] = {}
+    archives = []
+    if os.path.isfile(folder_path) and zipfile.is_zipfile(folder_path):
+        archives.append(folder_path)
+    elif os.path.isdir(folder_path):
+        entries = sorted(os.listdir(folder_path))
+        for entry in entries:
+            path = os.path.join(folder_path, entry)
+            lower = entry.lower()
+            compression = _compressed(entry)
+            if lower in wanted and os.path.isfile(path):
+                found[wanted[lower]] = path
+            elif compression:
+                name = wanted.get(lower[:-(len(compression) + 1)])
+                if name and not isinstance(found.get(name), str):
+                    found.setdefault(name, SourceFile(path, compression, size=os.path.getsize(path)))
+            elif lower.endswith('.zip') and zipfile.is_zipfile(path):
+                archives.append(path)
+    for archive in archives:
+        with zipfile.ZipFile(archive) as handle:
+            for info in handle.infolist():
+                name = wanted.get(os.path.basename(info.filename).lower())
+                if name and not info.is_dir() and name not in found:
+                    found[name] = SourceFile(archive, 'zip', info.filename, info.file_size)
+    for name, source in found.items():
+        if isinstance(source, SourceFile):
+            logging.info(f"Streaming '{name}' from '{source}'.")
+    return found
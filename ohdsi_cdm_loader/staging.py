@@ -0,0 +1,127 @@
+import re
+import time
+import logging
+from typing import Dict, List
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+_INDEXES = (
+    "SELECT i.indexname, i.indexdef, c.conname IS NOT NULL "
+    "FROM pg_indexes i "
+    "LEFT JOIN pg_constraint c ON c.conname = i.indexname AND c.connamespace = %s::regnamespace "
+    "AND c.contype IN ('p', 'u', 'x') "
+    "WHERE i.schemaname = %s AND i.tablename = %s"
+)
+
+_CONSTRAINTS = (
+    "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+    "WHERE conrelid = %s::regclass AND contype IN ('p', 'u')"
+)
+
+# foreign keys from or to any of the swapped tables, which must follow the new tables
+_FOREIGN_KEYS = (
+    "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint "
+    "WHERE contype = 'f' AND (conrelid = ANY(%s::regclass[]) OR confrelid = ANY(%s::regclass[]))"
+)
+
+
+class StagingSwap:
+    def __init__(self, pool, schema: str, suffix: str = '__staging', logged: bool = True):
+        """
+        Load tables into UNLOGGED shadow tables and swap them into the CDM schema at once.
+
+        Each shadow table has the target's columns but no indexes, so the load writes no
+        WAL and maintains no index. ``build`` then copies the target's primary key, unique
+        constraints and indexes onto the shadow table and makes it LOGGED. ``swap`` replaces every target with
+        its shadow in a single transaction, re-pointing foreign keys, so readers keep the
+        old tables until it commits. ``discard`` drops the shadow tables and leaves the
+        targets untouched.
+
+        :param pool: The shared async connection pool of the DatabaseHandler.
+        :param schema: The schema containing the target tables.
+        :param suffix: Suffix of the shadow table and index names.
+        :param logged: Make the shadow tables logged before the swap, so the swapped-in
+            tables survive a crash and reach streaming replicas; this writes each table
+            into the WAL once, inside ``build``. Pass False only for throwaway databases:
+            the tables then stay unlogged for good, Postgres empties them after a crash
+            and replicas never receive them.
+        """
+        self._pool = pool
+        self._schema = schema
+        self._suffix = suffix
+        self._logged = logged
+        # target table -> names of the indexes copied onto its shadow table
+        self._tables: Dict[str, List[str]] = {}
+
+    def shadow(self, table: str) -> str:
+        """Return the unqualified name of a table's shadow table."""
+        return f"{table.lower()}{self._suffix}"
+
+    async def create(self, table: str) -> str:
+        """(Re)create the empty shadow table of ``table`` and return its name."""
+        table = table.lower()
+        async with self._pool.connection() as conn:
+            await conn.execute(f"DROP TABLE IF EXISTS {self._schema}.{self.shadow(table)}")
+            await conn.execute(
+                f"CREATE UNLOGGED TABLE {self._schema}.{self.shadow(table)} "
+                f"(LIKE {self._schema}.{table} INCLUDING DEFAULTS)")
+        self._tables[table] = []
+        return self.shadow(table)
+
+    async def build(self, table: str) -> None:
+        """Copy the keys and indexes of ``table`` onto its loaded shadow table."""
+        table = table.lower()
+        start = time.perf_counter()
+        shadow = self.shadow(table)
+        async with self._pool.connection() as conn:
+            cur = await conn.execute(_CONSTRAINTS, (f"{self._schema}.{table}",))
+            for name, definition in await cur.fetchall():
+                await conn.execute(
+                    f"ALTER TABLE {self._schema}.{shadow} ADD CONSTRAINT {name}{self._suffix} {definition}")
+                self._tables[table].append(name)
+            cur = await conn.execute(_INDEXES, (self._schema, self._schema, table))
+            for name, definition, is_constraint in await cur.fetchall():
+                if is_constraint:
+                    continue
+                definition = re.sub(rf"INDEX {re.escape(name)} ON ", f"INDEX {name}{self._suffix} ON ", definition, count=1)
+                definition = re.sub(rf" ON (ONLY )?{re.escape(self._schema)}\.{re.escape(table)} ",
+                                    f" ON {self._schema}.{shadow} ", definition, count=1)
+                await conn.execute(definition)
+                self._tables[table].append(name)
+            if self._logged:
+                await conn.execute(f"ALTER TABLE {self._schema}.{shadow} SET LOGGED")
+            await conn.execute(f"ANALYZE {self._schema}.{shadow}")
+        logging.info(f"Shadow table '{self._schema}.{shadow}' indexed in {time.perf_counter() - start:.1f}s.")
+
+    async def swap(self) -> None:
+        """Replace every target table with its shadow table in one transaction."""
+        if not self._tables:
+            return
+        tables = [f"{self._schema}.{table}" for table in self._tables]
+        async with self._pool.connection() as conn:
+            async with conn.transaction():
+                cur = await conn.execute(_FOREIGN_KEYS, (tables, tables))
+                foreign_keys = await cur.fetchall()
+                for owner, name, _ in foreign_keys:
+                    await conn.execute(f"ALTER TABLE {owner} DROP CONSTRAINT {name}")
+                for table, indexes in self._tables.items():
+                    await conn.execute(f"DROP TABLE {self._schema}.{table}")
+                    await conn.execute(f"ALTER TABLE {self._schema}.{self.shadow(table)} RENAME TO {table}")
+                    for index in indexes:
+                        # renaming an index that backs a constraint renames the constraint too
+                        await conn.execute(f"ALTER INDEX {self._schema}.{index}{self._suffix} RENAME TO {index}")
+                for owner, name, definition in foreign_keys:
+                    # NOT VALID as in the deferred load mode; VALIDATE CONSTRAINT can check them later
+                    definition = definition.replace(' NOT VALID', '')
+                    await conn.execute(f"ALTER TABLE {owner} ADD CONSTRAINT {name} {definition} NOT VALID")
+        logging.info(f"Swapped {len(tables)} staging tables into '{self._schema}'.")
+        self._tables.clear()
+
+    async def discard(self) -> None:
+        """Drop every shadow table, leaving the target tables as they were."""
+        async with self._pool.connection() as conn:
+            for table in self._tables:
+                await conn.execute(f"DROP TABLE IF EXISTS {self._schema}.{self.shadow(table)}")
+        logging.info(f"Discarded {len(self._tables)} staging tables in '{self._schema}'.")
+        self._tables.clear()
@@ -0,0 +1,599 @@
+import os
+import csv
+import math
+import time
+import shutil
+import hashlib
+import logging
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+from .sources import Source, discover_sources, open_text, readable, source_size
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Synthea file -> column holding the patient it belongs to (lower case)
+SYNTHEA_FILES = {
+    'patients': 'id',
+    'encounters': 'patient',
+    'conditions': 'patient',
+    'medications': 'patient',
+    'immunizations': 'patient',
+    'procedures': 'patient',
+    'observations': 'patient',
+}
+
+# CDM tables written by the ETL, in load order
+CDM_TABLES = ('person', 'observation_period', 'death', 'visit_occurrence', 'condition_occurrence',
+              'drug_exposure', 'procedure_occurrence', 'measurement', 'observation')
+
+# Synthea files whose rows share one id space in the CDM, e.g. both kinds of drug exposure
+ID_SPACES = (('patients',), ('encounters',), ('conditions',), ('medications', 'immunizations'),
+             ('procedures',), ('observations',))
+
+# vocabulary of the CODE column of each file, unless the file has a SYSTEM column
+FILE_VOCABULARIES = {
+    'encounters': 'SNOMED',
+    'conditions': 'SNOMED',
+    'medications': 'RxNorm',
+    'immunizations': 'CVX',
+    'procedures': 'SNOMED',
+    'observations': 'LOINC',
+}
+SYSTEM_VOCABULARIES = {
+    'http://snomed.info/sct': 'SNOMED',
+    'http://loinc.org': 'LOINC',
+    'http://www.nlm.nih.gov/research/umls/rxnorm': 'RxNorm',
+    'http://hl7.org/fhir/sid/cvx': 'CVX',
+}
+LOOKUP_VOCABULARIES = ('SNOMED', 'RxNorm', 'LOINC', 'CVX', 'UCUM')
+
+EHR_TYPE_CONCEPT_ID = 32817
+GENDER_CONCEPTS = {'m': 8507, 'f': 8532}
+RACE_CONCEPTS = {'white': 8527, 'black': 8516, 'asian': 8515, 'native': 8657, 'hawaiian': 8557}
+ETHNICITY_CONCEPTS = {'hispanic': 38003563, 'nonhispanic': 38003564}
+VISIT_CONCEPTS = {'ambulatory': 9202, 'outpatient': 9202, 'wellness': 9202, 'virtual': 9202,
+                  'emergency': 9203, 'urgentcare': 9203, 'inpatient': 9201}
+
+# CDM ids are 32-bit integers
+_MAX_ID = 2 ** 31 - 1
+# source bytes per partition; a partition's files are transformed in one worker's memory
+_PARTITION_BYTES = 256 << 20
+_DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ohdsi_cdm_loader', 'concepts')
+
+LOOKUP_QUERY = (
+    "SELECT c.vocabulary_id, c.concept_code, c.concept_id, COALESCE(t.concept_id, 0), "
+    "COALESCE(t.domain_id, c.domain_id) "
+    "FROM {schema}.concept c "
+    "LEFT JOIN {schema}.concept_relationship r ON r.concept_id_1 = c.concept_id "
+    "AND r.relationship_id = 'Maps to' AND r.invalid_reason IS NULL "
+    "LEFT JOIN {schema}.concept t ON t.concept_id = r.concept_id_2 AND t.invalid_reason IS NULL "
+    "WHERE c.vocabulary_id = ANY(%s)"
+)
+
+
+class ConceptLookup:
+    def __init__(self, frame: pd.DataFrame, path: Optional[str] = None):
+        """
+        Source-code to concept lookup, joined against whole columns at once.
+
+        :param frame: One row per (vocabulary_id, concept_code) with the columns key
+            ('vocabulary|code'), source_concept_id, concept_id (the standard concept it
+            maps to, 0 if none) and domain_id.
+        :param path: Feather file the lookup was loaded from or saved to.
+        """
+        self.path = path
+        self._index = pd.Index(frame['key'].to_numpy())
+        self._source = frame['source_concept_id'].to_numpy(dtype='int64')
+        self._concept = frame['concept_id'].to_numpy(dtype='int64')
+        self._domain = frame['domain_id'].to_numpy(dtype=object)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @classmethod
+    def from_records(cls, records) -> "ConceptLookup":
+        """Build the lookup from (vocabulary_id, concept_code, concept_id, mapped concept_id, domain_id) rows."""
+        frame = pd.DataFrame(records, columns=['vocabulary_id', 'concept_code', 'source_concept_id',
+                                               'concept_id', 'domain_id'])
+        frame['key'] = frame['vocabulary_id'] + '|' + frame['concept_code'].astype(str)
+        # a code with several 'Maps to' targets keeps the lowest, so reruns agree
+        frame = frame.sort_values(['key', 'concept_id']).drop_duplicates('key', ignore_index=True)
+        return cls(frame[['key', 'source_concept_id', 'concept_id', 'domain_id']])
+
+    @classmethod
+    def from_database(cls, db_handler, vocabularies=LOOKUP_VOCABULARIES,
+                      cache_dir: Optional[str] = None) -> "ConceptLookup":
+        """
+        Return the lookup of the loaded vocabularies, from the on-disk cache when the
+        vocabulary release has not changed since it was built.
+
+        :param db_handler: The DatabaseHandler of the CDM schema holding the vocabularies.
+        :param vocabularies: Vocabularies whose codes are looked up.
+        :param cache_dir: Cache folder; ~/.cache/ohdsi_cdm_loader/concepts when not given.
+        """
+        schema = db_handler._schema
+        release = db_handler.query_sql(
+            f"SELECT (SELECT max(vocabulary_version) FROM {schema}.vocabulary WHERE vocabulary_id = 'None'), "
+            f"(SELECT count(*) FROM {schema}.concept)")[0]
+        key = hashlib.sha256(repr((schema, release, sorted(vocabularies))).encode()).hexdigest()[:16]
+        path = os.path.join(cache_dir or _DEFAULT_CACHE_DIR, f"concept-lookup-{key}.feather")
+        if os.path.exists(path):
+            logging.info(f"Concept lookup loaded from cache '{path}'.")
+            return cls.load(path)
+        start = time.perf_counter()
+        lookup = cls.from_records(db_handler.query_sql(LOOKUP_QUERY.format(schema=schema), (list(vocabularies),)))
+        logging.info(f"Concept lookup of {len(lookup):,} codes built in {time.perf_counter() - start:.1f}s.")
+        try:
+            lookup.save(path)
+        except OSError as e:
+            logging.warning(f"Could not cache the concept lookup in '{path}': {e}")
+        return lookup
+
+    @classmethod
+    def load(cls, path: str) -> "ConceptLookup":
+        return cls(feather.read_feather(path), path)
+
+    def save(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        frame = pd.DataFrame({'key': self._index.to_numpy(), 'source_concept_id': self._source,
+                              'concept_id': self._concept, 'domain_id': self._domain})
+        feather.write_feather(frame, path)
+        self.path = path
+
+    def map(self, vocabulary, codes: pd.Series) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Look up a column of codes.
+
+        :param vocabulary: One vocabulary_id for every code, or a Series of them.
+        :returns: source_concept_id, concept_id and domain_id arrays; 0 and '' where
+            the code is unknown.
+        """
+        positions = self._index.get_indexer(vocabulary + '|' + codes.astype(str))
+        found = positions >= 0
+        return (np.where(found, self._source[positions], 0),
+                np.where(found, self._concept[positions], 0),
+                np.where(found, self._domain[positions], ''))
+
+
+def _header(source: Source) -> list:
+    with open_text(source) as handle:
+        return next(csv.reader(handle), [])
+
+
+def _split_file(source: Source, name: str, folder: str, partitions: int) -> np.ndarray:
+    """Hash-partition the rows of one Synthea file by patient; return the rows per partition."""
+    header = _header(source)
+    patient = next((column for column in header if column.lower() == SYNTHEA_FILES[name]), None)
+    if patient is None:
+        raise RuntimeError(f"'{name}.csv' has no {SYNTHEA_FILES[name].upper()} column")
+    convert_options = pa_csv.ConvertOptions(column_types={column: pa.string() for column in header},
+                                            strings_can_be_null=False)
+    counts = np.zeros(partitions, dtype='int64')
+    writers = {}
+    try:
+        with readable(source) as input_file, pa_csv.open_csv(
+                input_file, read_options=pa_csv.ReadOptions(block_size=16 << 20),
+                convert_options=convert_options) as reader:
+            for batch in reader:
+                keys = pd.util.hash_pandas_object(batch.column(patient).to_pandas(), index=False).to_numpy()
+                partition = (keys % partitions).astype('int64')
+                # one take puts every partition's rows next to each other, in file order
+                batch = batch.take(pa.array(np.argsort(partition, kind='stable')))
+                sizes = np.bincount(partition, minlength=partitions)
+                starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+                for index in np.flatnonzero(sizes):
+                    if index not in writers:
+                        path = os.path.join(folder, f"{index:05d}", f"{name}.arrow")
+                        os.makedirs(os.path.dirname(path), exist_ok=True)
+                        writers[index] = pa.ipc.new_file(path, batch.schema)
+                    writers[index].write_batch(batch.slice(starts[index], sizes[index]))
+                counts += sizes
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Transform: runs in worker processes, one patient partition at a time
+# ---------------------------------------------------------------------------
+
+_LOOKUP: Optional[ConceptLookup] = None
+
+
+def _init_worker(lookup_path: str) -> None:
+    global _LOOKUP
+    _LOOKUP = ConceptLookup.load(lookup_path)
+
+
+def _read_part(folder: str, partition: int, name: str) -> Optional[pd.DataFrame]:
+    path = os.path.join(folder, f"{partition:05d}", f"{name}.arrow")
+    if not os.path.exists(path):
+        return None
+    with pa.ipc.open_file(path) as reader:
+        frame = reader.read_pandas()
+    frame.columns = frame.columns.str.lower()
+    return frame
+
+
+def _timestamps(series: pd.Series) -> np.ndarray:
+    """Parse Synthea ISO dates and times into naive UTC datetime64[s]; blanks become NaT."""
+    parsed = pd.to_datetime(series.where(series != ''), errors='coerce', utc=True, format='ISO8601')
+    return parsed.dt.tz_localize(None).to_numpy(dtype='datetime64[s]')
+
+
+def _date_parts(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    days = values.astype('datetime64[D]')
+    months = days.astype('datetime64[M]')
+    year = months.astype('datetime64[Y]').astype('int64') + 1970
+    month = months.astype('int64') % 12 + 1
+    day = (days - months.astype('datetime64[D]')).astype('int64') + 1
+    return year, month, day
+
+
+def _dates(values: np.ndarray) -> pd.arrays.IntegerArray:
+    """YYYYMMDD numbers, as Athena files carry dates; NaT becomes a null."""
+    year, month, day = _date_parts(values)
+    return pd.arrays.IntegerArray(year * 10000 + month * 100 + day, np.isnat(values))
+
+
+def _datetimes(values: np.ndarray) -> np.ndarray:
+    return np.where(np.isnat(values), '', np.datetime_as_string(values, unit='s'))
+
+
+def _text(series: pd.Series) -> pd.Series:
+    # values end up in a TSV; tabs and line breaks would split their row
+    return series.str.replace(r'[\t\r\n]+', ' ', regex=True)
+
+
+def _vocabulary(frame: pd.DataFrame, name: str):
+    if 'system' in frame:
+        return frame['system'].map(SYSTEM_VOCABULARIES).fillna(FILE_VOCABULARIES[name])
+    return FILE_VOCABULARIES[name]
+
+
+def _link(frame: pd.DataFrame, person_ids: pd.Series, visit_ids: pd.Series, first_id: int):
+    """
+    Give every event row its id (by position, so ids do not depend on what is dropped)
+    and resolve its person and visit. Rows of unknown patients are dropped.
+    """
+    ids = first_id + np.arange(len(frame), dtype='int64')
+    person = frame['patient'].map(person_ids)
+    keep = person.notna().to_numpy()
+    visit = frame['encounter'].map(visit_ids) if 'encounter' in frame else pd.Series(np.nan, index=frame.index)
+    frame = frame[keep]
+    return frame, ids[keep], person[keep].astype('int64').to_numpy(), visit[keep].astype('Int64').to_numpy()
+
+
+def _write(frame: pd.DataFrame, output: str, table: str, partition: int, name: str) -> int:
+    if frame.empty:
+        return 0
+    folder = os.path.join(output, table)
+    os.makedirs(folder, exist_ok=True)
+    frame.to_csv(os.path.join(folder, f"part-{partition:05d}-{name}.csv"), sep='\t', index=False, lineterminator='\n')
+    return len(frame)
+
+
+def _person(patients: pd.DataFrame, person_ids: np.ndarray) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    birth = _timestamps(patients['birthdate'])
+    year, month, day = _date_parts(birth)
+    person = pd.DataFrame({
+        'person_id': person_ids,
+        'gender_concept_id': patients['gender'].str.lower().map(GENDER_CONCEPTS).fillna(0).astype('int64'),
+        'year_of_birth': year,
+        'month_of_birth': month,
+        'day_of_birth': day,
+        'birth_datetime': _datetimes(birth),
+        'race_concept_id': patients['race'].str.lower().map(RACE_CONCEPTS).fillna(0).astype('int64'),
+        'ethnicity_concept_id': patients['ethnicity'].str.lower().map(ETHNICITY_CONCEPTS).fillna(0).astype('int64'),
+        'person_source_value': patients['id'],
+        'gender_source_value': patients['gender'],
+        'gender_source_concept_id': 0,
+        'race_source_value': patients['race'],
+        'race_source_concept_id': 0,
+        'ethnicity_source_value': patients['ethnicity'],
+        'ethnicity_source_concept_id': 0,
+    })[~np.isnat(birth)]
+    died = _timestamps(patients['deathdate']) if 'deathdate' in patients else np.full(len(patients), np.datetime64('NaT'))
+    dead = ~np.isnat(died)
+    death = pd.DataFrame({
+        'person_id': person_ids[dead],
+        'death_date': _dates(died[dead]),
+        'death_datetime': _datetimes(died[dead]),
+        'death_type_concept_id': EHR_TYPE_CONCEPT_ID,
+    })
+    return person, death
+
+
+def _visits(encounters: pd.DataFrame, person_ids: pd.Series, first_id: int):
+    frame, ids, person, _ = _link(encounters, person_ids, pd.Series(dtype='int64'), first_id)
+    start = _timestamps(frame['start'])
+    stop = _timestamps(frame['stop'])
+    stop = np.where(np.isnat(stop), start, stop)
+    source_concept, _, _ = _LOOKUP.map(_vocabulary(frame, 'encounters'), frame['code'])
+    visits = pd.DataFrame({
+        'visit_occurrence_id': ids,
+        'person_id': person,
+        'visit_concept_id': frame['encounterclass'].str.lower().map(VISIT_CONCEPTS).fillna(0).astype('int64').to_numpy(),
+        'visit_start_date': _dates(start),
+        'visit_start_datetime': _datetimes(start),
+        'visit_end_date': _dates(stop),
+        'visit_end_datetime': _datetimes(stop),
+        'visit_type_concept_id': EHR_TYPE_CONCEPT_ID,
+        'visit_source_value': frame['id'].to_numpy(),
+        'visit_source_concept_id': source_concept,
+    })
+    valid = ~np.isnat(start)
+    # one observation period per person, from the first to the last encounter
+    spans = pd.DataFrame({'person_id': person[valid], 'start': start[valid], 'stop': stop[valid]}) \
+        .groupby('person_id', sort=True).agg(start=('start', 'min'), stop=('stop', 'max'))
+    periods = pd.DataFrame({
+        'observation_period_id': spans.index.to_numpy(),
+        'person_id': spans.index.to_numpy(),
+        'observation_period_start_date': _dates(spans['start'].to_numpy()),
+        'observation_period_end_date': _dates(spans['stop'].to_numpy()),
+        'period_type_concept_id': EHR_TYPE_CONCEPT_ID,
+    })
+    return visits[valid], periods, pd.Series(ids, index=frame['id'].to_numpy())
+
+
+def _conditions(frame, person_ids, visit_ids, first_id) -> pd.DataFrame:
+    frame, ids, person, visit = _link(frame, person_ids, visit_ids, first_id)
+    start, stop = _timestamps(frame['start']), _timestamps(frame['stop'])
+    source_concept, concept, _ = _LOOKUP.map(_vocabulary(frame, 'conditions'), frame['code'])
+    return pd.DataFrame({
+        'condition_occurrence_id': ids,
+        'person_id': person,
+        'condition_concept_id': concept,
+        'condition_start_date': _dates(start),
+        'condition_start_datetime': _datetimes(start),
+        'condition_end_date': _dates(stop),
+        'condition_end_datetime': _datetimes(stop),
+        'condition_type_concept_id': EHR_TYPE_CONCEPT_ID,
+        'visit_occurrence_id': visit,
+        'condition_source_value': frame['code'].to_numpy(),
+        'condition_source_concept_id': source_concept,
+    })[~np.isnat(start)]
+
+
+def _drugs(frame, person_ids, visit_ids, first_id, name: str) -> pd.DataFrame:
+    frame, ids, person, visit = _link(frame, person_ids, visit_ids, first_id)
+    start = _timestamps(frame['start'] if 'start' in frame else frame['date'])
+    stop = _timestamps(frame['stop']) if 'stop' in frame else start
+    stop = np.where(np.isnat(stop), start, stop)
+    source_concept, concept, _ = _LOOKUP.map(_vocabulary(frame, name), frame['code'])
+    quantity = pd.to_numeric(frame['dispenses'], errors='coerce').to_numpy() if 'dispenses' in frame else np.nan
+    return pd.DataFrame({
+        'drug_exposure_id': ids,
+        'person_id': person,
+        'drug_concept_id': concept,
+        'drug_exposure_start_date': _dates(start),
+        'drug_exposure_start_datetime': _datetimes(start),
+        'drug_exposure_end_date': _dates(stop),
+        'drug_exposure_end_datetime': _datetimes(stop),
+        'drug_type_concept_id': EHR_TYPE_CONCEPT_ID,
+        'quantity': quantity,
+        'days_supply': np.maximum((stop - start).astype('timedelta64[D]').astype('int64'), 1),
+        'visit_occurrence_id': visit,
+        'drug_source_value': frame['code'].to_numpy(),
+        'drug_source_concept_id': source_concept,
+    })[~np.isnat(start)]
+
+
+def _procedures(frame, person_ids, visit_ids, first_id) -> pd.DataFrame:
+    frame, ids, person, visit = _link(frame, person_ids, visit_ids, first_id)
+    start = _timestamps(frame['start'] if 'start' in frame else frame['date'])
+    stop = _timestamps(frame['stop']) if 'stop' in frame else start
+    source_concept, concept, _ = _LOOKUP.map(_vocabulary(frame, 'procedures'), frame['code'])
+    return pd.DataFrame({
+        'procedure_occurrence_id': ids,
+        'person_id': person,
+        'procedure_concept_id': concept,
+        'procedure_date': _dates(start),
+        'procedure_datetime': _datetimes(start),
+        'procedure_end_date': _dates(stop),
+        'procedure_end_datetime': _datetimes(stop),
+        'procedure_type_concept_id': EHR_TYPE_CONCEPT_ID,
+        'visit_occurrence_id': visit,
+        'procedure_source_value': frame['code'].to_numpy(),
+        'procedure_source_concept_id': source_concept,
+    })[~np.isnat(start)]
+
+
+def _observations(frame, person_ids, visit_ids, first_id) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split observations.csv into MEASUREMENT and OBSERVATION rows by the domain of their concept."""
+    frame, ids, person, visit = _link(frame, person_ids, visit_ids, first_id)
+    date = _timestamps(frame['date'])
+    source_concept, concept, domain = _LOOKUP.map(_vocabulary(frame, 'observations'), frame['code'])
+    units = frame['units'] if 'units' in frame else pd.Series('', index=frame.index)
+    _, unit_concept, _ = _LOOKUP.map('UCUM', units)
+    value = frame['value'] if 'value' in frame else pd.Series('', index=frame.index)
+    number = pd.to_numeric(value, errors='coerce').to_numpy()
+    numeric_type = (frame['type'] == 'numeric').to_numpy() if 'type' in frame else ~np.isnan(number)
+    is_measurement = (domain == 'Measurement') | ((domain == '') & numeric_type)
+    valid = ~np.isnat(date)
+    common = {
+        'person_id': person,
+        'date': _dates(date),
+        'datetime': _datetimes(date),
+        'visit_occurrence_id': visit,
+        'value_as_number': number,
+        'unit_concept_id': unit_concept,
+        'unit_source_value': _text(units).to_numpy(),
+    }
+    measurements = pd.DataFrame({
+        'measurement_id': ids,
+        'person_id': common['person_id'],
+        'measurement_concept_id': concept,
+        'measurement_date': common['date'],
+        'measurement_datetime': common['datetime'],
+        'measurement_type_concept_id': EHR_TYPE_CONCEPT_ID,
+        'value_as_number': common['value_as_number'],
+        'unit_concept_id': common['unit_concept_id'],
+        'visit_occurrence_id': common['visit_occurrence_id'],
+        'measurement_source_value': frame['code'].to_numpy(),
+        'measurement_source_concept_id': source_concept,
+        'unit_source_value': common['unit_source_value'],
+        'value_source_value': _text(value).to_numpy(),
+    })[valid & is_measurement]
+    observations = pd.DataFrame({
+        'observation_id': ids,
+        'person_id': common['person_id'],
+        'observation_concept_id': concept,
+        'observation_date': common['date'],
+        'observation_datetime': common['datetime'],
+        'observation_type_concept_id': EHR_TYPE_CONCEPT_ID,
+        'value_as_number': common['value_as_number'],
+        'value_as_string': np.where(np.isnan(number), _text(value).to_numpy(), ''),
+        'unit_concept_id': common['unit_concept_id'],
+        'visit_occurrence_id': common['visit_occurrence_id'],
+        'observation_source_value': frame['code'].to_numpy(),
+        'observation_source_concept_id': source_concept,
+        'unit_source_value': common['unit_source_value'],
+    })[valid & ~is_measurement]
+    return measurements, observations
+
+
+def _transform_partition(task) -> Dict[str, int]:
+    """Turn the Synthea rows of one patient partition into CDM table files; return rows per table."""
+    folder, partition, first_ids, output = task
+    rows: Dict[str, int] = {}
+
+    def write(frame, table, name):
+        rows[table] = rows.get(table, 0) + _write(frame, output, table, partition, name)
+
+    patients = _read_part(folder, partition, 'patients')
+    if patients is None:
+        return rows
+    ids = first_ids['patients'] + np.arange(len(patients), dtype='int64')
+    person_ids = pd.Series(ids, index=patients['id'].to_numpy())
+    person, death = _person(patients, ids)
+    write(person, 'person', 'patients')
+    write(death, 'death', 'patients')
+    del patients, person, death
+
+    visit_ids = pd.Series(dtype='int64')
+    encounters = _read_part(folder, partition, 'encounters')
+    if encounters is not None:
+        visits, periods, visit_ids = _visits(encounters, person_ids, first_ids['encounters'])
+        write(visits, 'visit_occurrence', 'encounters')
+        write(periods, 'observation_period', 'encounters')
+        del encounters, visits, periods
+
+    # one event file at a time, so a partition never holds more than one of them
+    for name in ('conditions', 'medications', 'immunizations', 'procedures', 'observations'):
+        frame = _read_part(folder, partition, name)
+        if frame is None:
+            continue
+        if name == 'conditions':
+            write(_conditions(frame, person_ids, visit_ids, first_ids[name]), 'condition_occurrence', name)
+        elif name in ('medications', 'immunizations'):
+            write(_drugs(frame, person_ids, visit_ids, first_ids[name], name), 'drug_exposure', name)
+        elif name == 'procedures':
+            write(_procedures(frame, person_ids, visit_ids, first_ids[name]), 'procedure_occurrence', name)
+        else:
+            measurements, observations = _observations(frame, person_ids, visit_ids, first_ids[name])
+            write(measurements, 'measurement', name)
+            write(observations, 'observation', name)
+        del frame
+    return rows
+
+
+class SyntheaETL:
+    def __init__(self, output_folder: str, lookup: ConceptLookup, workers: Optional[int] = None,
+                 partitions: Optional[int] = None, work_dir: Optional[str] = None):
+        """
+        Convert Synthea CSV output into OMOP CDM tables.
+
+        Every Synthea file is first hash-partitioned by patient into Arrow files, so all
+        rows of a patient land in the same partition. Partitions are then transformed
+        in a process pool with vectorised pandas: concepts come from joining whole
+        code columns against the ConceptLookup, persons and visits from joining the
+        patient and encounter UUIDs within the partition. Each CDM table is written as
+        one Athena-style TSV shard per partition under ``{output_folder}/{table}/``,
+        which load_all_csvs loads as a sharded table.
+
+        Ids are assigned from the row position in the Synthea files, with a fixed
+        offset per partition, so the same input and partition count always produce the
+        same ids.
+
+        :param output_folder: Folder the CDM table shards are written to.
+        :param lookup: Source-code to concept lookup, e.g. ConceptLookup.from_database.
+        :param workers: Worker processes; the number of CPUs when not given.
+        :param partitions: Patient partitions; sized to ~256 MB of input each when not given.
+        :param work_dir: Folder for the partitioned intermediate files; the system
+            temporary folder when not given.
+        """
+        self._output = output_folder
+        self._lookup = lookup
+        self._workers = workers or os.cpu_count() or 1
+        self._partitions = partitions
+        self._work_dir = work_dir
+
+    def _offsets(self, counts: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """First id of every file's rows in every partition."""
+        offsets = {}
+        for space in ID_SPACES:
+            base = 1
+            for name in space:
+                if name not in counts:
+                    continue
+                offsets[name] = base + np.concatenate(([0], np.cumsum(counts[name])[:-1]))
+                base += int(counts[name].sum())
+            if base - 1 > _MAX_ID:
+                raise RuntimeError(f"{base - 1:,} rows in {'/'.join(space)} exceed the 32-bit ids of the CDM")
+        return offsets
+
+    def run(self, source_folder: str) -> Dict[str, int]:
+        """
+        Convert the Synthea files in ``source_folder`` (plain, compressed or zipped, see
+        sources.discover_sources).
+
+        :returns: Rows written per CDM table.
+        :raises RuntimeError: If there is no patients.csv or a partition fails.
+        """
+        sources = discover_sources(source_folder, [f"{name}.csv" for name in SYNTHEA_FILES])
+        if 'patients.csv' not in sources:
+            raise RuntimeError(f"No patients.csv found in '{source_folder}'")
+        total = sum(source_size(source) for source in sources.values())
+        partitions = self._partitions or max(self._workers, math.ceil(total / _PARTITION_BYTES))
+        for table in CDM_TABLES:
+            # shards of a previous run would otherwise be loaded again
+            shutil.rmtree(os.path.join(self._output, table), ignore_errors=True)
+
+        work = tempfile.mkdtemp(prefix='synthea-etl-', dir=self._work_dir)
+        try:
+            lookup_path = self._lookup.path
+            if lookup_path is None:
+                lookup_path = os.path.join(work, 'concept-lookup.feather')
+                self._lookup.save(lookup_path)
+
+            start = time.perf_counter()
+            counts = {}
+            for name in SYNTHEA_FILES:
+                if f"{name}.csv" in sources:
+                    counts[name] = _split_file(sources[f"{name}.csv"], name, work, partitions)
+            logging.info(f"Partitioned {sum(int(c.sum()) for c in counts.values()):,} Synthea rows into "
+                         f"{partitions} patient partitions in {time.perf_counter() - start:.1f}s.")
+            offsets = self._offsets(counts)
+
+            start = time.perf_counter()
+            tasks = [(work, partition, {name: int(first[partition]) for name, first in offsets.items()}, self._output)
+                     for partition in range(partitions)]
+            rows: Dict[str, int] = {}
+            with ProcessPoolExecutor(self._workers, initializer=_init_worker, initargs=(lookup_path,)) as pool:
+                for result in pool.map(_transform_partition, tasks):
+                    for table, count in result.items():
+                        rows[table] = rows.get(table, 0) + count
+            logging.info(f"Transformed Synthea into {sum(rows.values()):,} CDM rows with {self._workers} workers "
+                         f"in {time.perf_counter() - start:.1f}s: {rows}")
+            return rows
+        finally:
+            shutil.rmtree(work, ignore_errors=True)
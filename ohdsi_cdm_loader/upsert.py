@@ -0,0 +1,135 @@
+import copy
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import pandas as pd
+from .copy_stream import copy_dataframe
+from .delta import NATURAL_KEYS
+from .schema_catalog import TablePlan
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+PRIMARY_KEY_QUERY = (
+    "SELECT tc.table_name, kcu.column_name "
+    "FROM information_schema.table_constraints tc "
+    "JOIN information_schema.key_column_usage kcu "
+    "ON kcu.constraint_schema = tc.constraint_schema AND kcu.constraint_name = tc.constraint_name "
+    "AND kcu.table_name = tc.table_name "
+    "WHERE tc.constraint_type = 'PRIMARY KEY' AND tc.table_schema = %s "
+    "ORDER BY tc.table_name, kcu.ordinal_position"
+)
+
+
+def primary_keys(records: Iterable[tuple]) -> Dict[str, Tuple[str, ...]]:
+    """Group PRIMARY_KEY_QUERY rows of (table, column) into table -> key columns."""
+    keys: Dict[str, List[str]] = {}
+    for table_name, column_name in records:
+        keys.setdefault(table_name.lower(), []).append(column_name.lower())
+    return {table: tuple(columns) for table, columns in keys.items()}
+
+
+def _match(keys: Sequence[str], left: str, right: str) -> str:
+    return ' AND '.join(f"{left}.{key} = {right}.{key}" for key in keys)
+
+
+class UpsertMerge:
+    def __init__(self, schema: str, plan: TablePlan, primary_key: Optional[Sequence[str]] = None,
+                 suffix: str = '__upsert'):
+        """
+        Merge loaded rows into a populated table instead of replacing its contents.
+
+        Every chunk is COPied into a session-local temporary table (ON COMMIT DELETE ROWS,
+        so it is empty again once the chunk commits) and merged into the target with one
+        set-based statement in the same transaction:
+
+        * on the table's primary key: ``INSERT ... ON CONFLICT (key) DO UPDATE``;
+        * without one (e.g. before a deferred load built its keys), on the natural key of
+          delta.NATURAL_KEYS or the table's ``{table}_id`` column: an UPDATE of the
+          matching rows and an INSERT of the others, serialised per table by an advisory
+          lock, as nothing in the database would stop two chunks inserting the same key.
+
+        Rows whose values did not change are not rewritten. Within one chunk, one row per
+        key is kept.
+
+        :param schema: The schema containing the target table.
+        :param plan: The conversion plan of the target table.
+        :param primary_key: The table's primary key columns, if it has one.
+        :param suffix: Suffix of the temporary table name.
+        :raises ValueError: If the table has neither a primary key nor a natural key.
+        """
+        if primary_key:
+            keys, conflict = tuple(primary_key), True
+        elif plan.table in NATURAL_KEYS:
+            keys, conflict = NATURAL_KEYS[plan.table], False
+        elif f"{plan.table}_id" in plan.types:
+            keys, conflict = (f"{plan.table}_id",), False
+        else:
+            raise ValueError(f"Table '{plan.table}' has no primary or natural key to upsert on.")
+        self._schema = schema
+        self._plan = plan
+        self.keys = keys
+        self.conflict = conflict
+        self.temp = f"{plan.table}{suffix}"
+
+    def for_schema(self, schema: str) -> "UpsertMerge":
+        """The same merge into the table of another schema, e.g. a further load target."""
+        merge = copy.copy(self)
+        merge._schema = schema
+        return merge
+
+    @property
+    def _target(self) -> str:
+        return f"{self._schema}.{self._plan.table}"
+
+    async def prepare(self, conn) -> None:
+        """Create the temporary table on this connection, once per session."""
+        await conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {self.temp} "
+                           f"(LIKE {self._target} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS")
+
+    def statement(self, columns: Sequence[str]) -> str:
+        """The SQL merging the temporary table's ``columns`` into the target."""
+        missing = [key for key in self.keys if key not in columns]
+        if missing:
+            raise ValueError(f"Key columns {missing} of '{self._plan.table}' are not in the source.")
+        column_list = ', '.join(columns)
+        values = [column for column in columns if column not in self.keys]
+        source = (f"SELECT DISTINCT ON ({', '.join(self.keys)}) {column_list} "
+                  f"FROM pg_temp.{self.temp}")
+        if self.conflict:
+            if not values:
+                action = "DO NOTHING"
+            else:
+                assignments = ', '.join(f"{column} = EXCLUDED.{column}" for column in values)
+                changed = (f"({', '.join(f't.{c}' for c in values)}) IS DISTINCT FROM "
+                           f"({', '.join(f'EXCLUDED.{c}' for c in values)})")
+                action = f"DO UPDATE SET {assignments} WHERE {changed}"
+            return (f"INSERT INTO {self._target} AS t ({column_list}) {source} "
+                    f"ON CONFLICT ({', '.join(self.keys)}) {action}")
+        insert = (f"INSERT INTO {self._target} ({column_list}) SELECT {column_list} FROM source s "
+                  f"WHERE NOT EXISTS (SELECT 1 FROM {self._target} t WHERE {_match(self.keys, 't', 's')})")
+        if not values:
+            return f"WITH source AS ({source}) {insert}"
+        assignments = ', '.join(f"{column} = s.{column}" for column in values)
+        changed = (f"({', '.join(f't.{c}' for c in values)}) IS DISTINCT FROM "
+                   f"({', '.join(f's.{c}' for c in values)})")
+        return (f"WITH source AS ({source}), updated AS (UPDATE {self._target} t SET {assignments} "
+                f"FROM source s WHERE {_match(self.keys, 't', 's')} AND {changed}) {insert}")
+
+    async def apply(self, conn, columns: Sequence[str]) -> int:
+        """Merge what the temporary table holds on this connection; returns the rows written."""
+        if not self.conflict:
+            # held until the chunk commits, so the next chunk sees its inserts
+            await conn.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (self._target,))
+        cur = await conn.execute(self.statement(columns))
+        return max(cur.rowcount, 0)
+
+    async def merge_frame(self, conn, data: pd.DataFrame) -> int:
+        """COPY a converted data frame into the temporary table and merge it into the target."""
+        if data.empty:
+            return 0
+        await self.prepare(conn)
+        await copy_dataframe(conn, f"pg_temp.{self.temp}", data)
+        rows = await self.apply(conn, list(data.columns))
+        # batches sharing one transaction (checkpointed loads) must not merge each other's rows again
+        await conn.execute(f"TRUNCATE pg_temp.{self.temp}")
+        return rows
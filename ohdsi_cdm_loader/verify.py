@@ -0,0 +1,326 @@
+import os
+import mmap
+import time
+import asyncio
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from .conversion import parse_yyyymmdd
+from .readers import ATHENA_TSV
+from .schema_catalog import SchemaCatalog, TablePlan
+from .sources import Source, SourceFile, open_binary, readable, source_name
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# bytes of a plain file counted by one task, so a single big file spreads over all workers
+_RANGE_BYTES = 256 << 20
+_BLOCK_BYTES = 16 << 20
+_CHUNK_ROWS = 500_000
+
+# a column checksum: (non-null values, order-independent sum over them)
+Checksum = Tuple[int, int]
+
+
+def count_newlines(path: str, start: int = 0, end: Optional[int] = None) -> int:
+    """Count the newlines in a byte range of a plain file, scanning it memory-mapped."""
+    with open(path, 'rb') as handle:
+        size = os.fstat(handle.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if end <= start:
+            return 0
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            count = 0
+            for offset in range(start, end, _BLOCK_BYTES):
+                count += mapped[offset:min(offset + _BLOCK_BYTES, end)].count(b'\n')
+            return count
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, 'rb') as handle:
+        handle.seek(0, os.SEEK_END)
+        if handle.tell() == 0:
+            return True
+        handle.seek(-1, os.SEEK_END)
+        return handle.read(1) == b'\n'
+
+
+def _count_stream(source: SourceFile) -> Tuple[int, bool]:
+    """Newlines of a compressed source, and whether its data ends with one."""
+    count, last = 0, b'\n'
+    with open_binary(source) as handle:
+        while True:
+            block = handle.read(_BLOCK_BYTES)
+            if not block:
+                return count, last == b'\n'
+            count += block.count(b'\n')
+            last = block[-1:]
+
+
+def _hash_strings(values: pd.Series) -> int:
+    """Sum of the first 8 md5 bytes (signed) of every value, as checksum_query computes it in Postgres."""
+    return sum(int.from_bytes(hashlib.md5(value.encode('utf-8')).digest()[:8], 'big', signed=True)
+               for value in values)
+
+
+def source_checksums(source: Source, plan: TablePlan, columns: List[str], synthea: bool = False) -> Dict[str, Checksum]:
+    """
+    Checksum columns of a source file the way ``checksum_query`` does in the database.
+
+    Values are taken as the source has them: an integer or date that does not parse
+    still counts as a value, so a value the loader coerced to null shows up as a
+    mismatch. Empty strings count as null, as COPY loads them.
+    """
+    sums = {column: [0, 0] for column in columns}
+    with readable(source) as input_file:
+        if synthea:
+            reader = pd.read_csv(input_file, chunksize=_CHUNK_ROWS, dtype=str, keep_default_na=False)
+        else:
+            reader = pd.read_csv(input_file, dtype=str, chunksize=_CHUNK_ROWS, **ATHENA_TSV)
+        for chunk in reader:
+            chunk.columns = chunk.columns.str.strip().str.lower()
+            for column in columns:
+                if column not in chunk:
+                    continue
+                values = chunk[column]
+                values = values[values != '']
+                sums[column][0] += len(values)
+                if column in plan.integer_columns:
+                    numbers = pd.to_numeric(values, errors='coerce').dropna()
+                    sums[column][1] += int(numbers.astype('int64').sum())
+                elif column in plan.date_columns:
+                    dates, _ = parse_yyyymmdd(values)
+                    days = dates.to_numpy().astype('datetime64[D]')
+                    sums[column][1] += int(days[~np.isnat(days)].astype('int64').sum())
+                else:
+                    sums[column][1] += _hash_strings(values)
+    return {column: (count, total) for column, (count, total) in sums.items()}
+
+
+def checksum_columns(plan: TablePlan) -> List[str]:
+    """Columns that round-trip exactly and so can be checksummed: integers, dates and strings."""
+    return [column for column in plan.column_names
+            if column in plan.integer_columns or column in plan.date_columns or column in plan.character_columns]
+
+
+def checksum_query(schema: str, plan: TablePlan, columns: List[str]) -> str:
+    """SQL returning count(*) and then the (count, sum) of every column in ``columns``."""
+    parts = ['count(*)']
+    for column in columns:
+        if column in plan.integer_columns:
+            value = f"sum({column})"
+        elif column in plan.date_columns:
+            value = f"sum({column} - DATE '1970-01-01')"
+        else:
+            value = f"sum(('x' || substr(md5(NULLIF({column}, '')), 1, 16))::bit(64)::bigint)"
+        parts += [f"count(NULLIF({column}::text, ''))", f"COALESCE({value}, 0)"]
+    return f"SELECT {', '.join(parts)} FROM {schema}.{plan.table}"
+
+
+@dataclass
+class TableCheck:
+    """Verification result of one table."""
+    table: str
+    source_rows: Optional[int] = None
+    table_rows: Optional[int] = None
+    # column -> (source checksum, table checksum)
+    checksums: Dict[str, Tuple[Checksum, Checksum]] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def skipped(self) -> bool:
+        return self.source_rows is None and self.error is None
+
+    @property
+    def mismatched_columns(self) -> List[str]:
+        return [column for column, (source, table) in self.checksums.items() if source != table]
+
+    @property
+    def passed(self) -> bool:
+        return self.skipped or (self.error is None and self.source_rows == self.table_rows
+                                and not self.mismatched_columns)
+
+    @property
+    def status(self) -> str:
+        return 'SKIP' if self.skipped else 'PASS' if self.passed else 'FAIL'
+
+
+@dataclass
+class VerificationReport:
+    """Per-table pass/fail result of a verification run."""
+    checks: List[TableCheck] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return all(check.passed for check in self.checks)
+
+    @property
+    def failed(self) -> List[TableCheck]:
+        return [check for check in self.checks if not check.passed]
+
+    def to_dict(self) -> dict:
+        return {
+            'passed': self.passed,
+            'seconds': round(self.seconds, 3),
+            'tables': [{'table': check.table, 'status': check.status, 'source_rows': check.source_rows,
+                        'table_rows': check.table_rows, 'mismatched_columns': check.mismatched_columns,
+                        'error': check.error} for check in self.checks],
+        }
+
+    def __str__(self) -> str:
+        lines = [f"{'table':24s} {'status':6s} {'source rows':>14s} {'table rows':>14s}  details"]
+        for check in self.checks:
+            if check.error:
+                details = check.error
+            elif check.skipped:
+                details = 'no source file'
+            elif check.mismatched_columns:
+                details = f"checksum mismatch: {', '.join(check.mismatched_columns)}"
+            elif check.source_rows != check.table_rows:
+                details = f"{(check.table_rows or 0) - check.source_rows:+,} rows"
+            else:
+                details = f"{len(check.checksums)} columns checksummed" if check.checksums else ''
+            source = f"{check.source_rows:,}" if check.source_rows is not None else '-'
+            table = f"{check.table_rows:,}" if check.table_rows is not None else '-'
+            lines.append(f"{check.table:24s} {check.status:6s} {source:>14s} {table:>14s}  {details}")
+        lines.append(f"{len(self.checks) - len(self.failed)}/{len(self.checks)} tables passed "
+                     f"in {self.seconds:.1f}s")
+        return '\n'.join(lines)
+
+
+class LoadVerifier:
+    def __init__(self, db_handler, catalog: SchemaCatalog, workers: Optional[int] = None,
+                 checksums: bool = False, synthea: bool = False):
+        """
+        Check loaded tables against their source files.
+
+        Source records are counted by scanning for newlines: plain files are memory-mapped
+        and split into byte ranges, and compressed files are streamed, all in a process
+        pool. Meanwhile every table's count(*) runs concurrently on the connection pool.
+        With ``checksums`` each integer, date and string column is also summed on both
+        sides (a sum of values, day numbers or md5 prefixes, with the non-null count),
+        which does not depend on row order. This catches values that were truncated or
+        coerced to null even when the row count matches.
+
+        Counting lines assumes a record never spans lines, which holds for Athena files.
+
+        :param db_handler: The DatabaseHandler of the loaded schema.
+        :param catalog: Schema catalog of the loaded schema.
+        :param workers: Worker processes; the number of CPUs when not given.
+        :param checksums: Also compare column checksums (reads every source in full).
+        :param synthea: The sources are Synthea CSVs rather than Athena TSVs.
+        """
+        self._db = db_handler
+        self._catalog = catalog
+        self._workers = workers or os.cpu_count() or 1
+        self._checksums = checksums
+        self._synthea = synthea
+
+    def _count_tasks(self, pool: ProcessPoolExecutor, sources: List[Source]):
+        """Submit the newline counts of a table's sources; return futures and the end-of-file fix-ups."""
+        futures, unterminated = [], 0
+        for source in sources:
+            if isinstance(source, SourceFile):
+                futures.append(pool.submit(_count_stream, source))
+                continue
+            size = os.path.getsize(source)
+            for start in range(0, max(size, 1), _RANGE_BYTES):
+                futures.append(pool.submit(count_newlines, source, start, start + _RANGE_BYTES))
+            # a last line without a newline is a record too
+            unterminated += 0 if _ends_with_newline(source) else 1
+        return futures, unterminated
+
+    async def _table_stats(self, queries: Dict[str, str]) -> Dict[str, object]:
+        pool = await self._db.get_pool()
+
+        async def fetch(query):
+            try:
+                async with pool.connection() as conn:
+                    cur = await conn.execute(query)
+                    return await cur.fetchone()
+            except Exception as e:
+                return e
+
+        results = await asyncio.gather(*(fetch(query) for query in queries.values()))
+        return dict(zip(queries, results))
+
+    def verify(self, table_sources: Dict[str, List[Source]]) -> VerificationReport:
+        """
+        Verify every table against its sources.
+
+        :param table_sources: table -> its source files (several for a sharded table);
+            tables without sources are reported as skipped.
+        :returns: The per-table report; see VerificationReport.passed.
+        """
+        start = time.perf_counter()
+        checks = {table: TableCheck(table.lower()) for table in table_sources}
+        queries, columns = {}, {}
+        for table, sources in table_sources.items():
+            if not sources:
+                continue
+            if not self._catalog.has_table(table):
+                checks[table].error = f"table not in schema '{self._catalog.get_schema()}'"
+                continue
+            plan = self._catalog.plan(table)
+            columns[table] = checksum_columns(plan) if self._checksums else []
+            queries[table] = checksum_query(self._catalog.get_schema(), plan, columns[table])
+
+        with ProcessPoolExecutor(self._workers) as pool:
+            counts, sums = {}, {}
+            for table in queries:
+                counts[table] = self._count_tasks(pool, table_sources[table])
+                if columns[table]:
+                    plan = self._catalog.plan(table)
+                    sums[table] = [pool.submit(source_checksums, source, plan, columns[table], self._synthea)
+                                   for source in table_sources[table]]
+            # the database counts while the workers scan the files
+            stats = self._db.run_async(self._table_stats(queries))
+
+            for table, (futures, unterminated) in counts.items():
+                check = checks[table]
+                row = stats[table]
+                if isinstance(row, Exception):
+                    check.error = f"query failed: {row}"
+                    continue
+                check.table_rows = int(row[0])
+                try:
+                    newlines = 0
+                    for future in futures:
+                        result = future.result()
+                        if isinstance(result, tuple):
+                            result, terminated = result
+                            unterminated += 0 if terminated else 1
+                        newlines += result
+                except Exception as e:
+                    check.error = f"counting {', '.join(source_name(s) for s in table_sources[table])} failed: {e}"
+                    continue
+                # every source starts with a header line
+                check.source_rows = max(newlines + unterminated - len(table_sources[table]), 0)
+                if table not in sums:
+                    continue
+                try:
+                    source_sums = {column: [0, 0] for column in columns[table]}
+                    for future in sums[table]:
+                        for column, (count, total) in future.result().items():
+                            source_sums[column][0] += count
+                            source_sums[column][1] += total
+                except Exception as e:
+                    check.error = f"checksum of the source failed: {e}"
+                    continue
+                for index, column in enumerate(columns[table]):
+                    table_sum = (int(row[1 + 2 * index]), int(row[2 + 2 * index]))
+                    check.checksums[column] = (tuple(source_sums[column]), table_sum)
+
+        report = VerificationReport([checks[table] for table in table_sources], time.perf_counter() - start)
+        for check in report.failed:
+            logging.error(f"Verification of '{check.table}' failed: source {check.source_rows} rows, "
+                          f"table {check.table_rows} rows, mismatched columns {check.mismatched_columns}, "
+                          f"error {check.error}")
+        logging.info(f"Verified {len(report.checks)} tables in {report.seconds:.1f}s: "
+                     f"{'all passed' if report.passed else f'{len(report.failed)} failed'}.")
+        return report
@@ -19,13 +19,18 @@ setup(
     packages=find_packages(),
     python_requires='>=3.7',
     install_requires=[
-        'pandas>=1.0.0',
+        'pandas>=2.0.0',
         'rpy2==3.5.12',
         'pg_bulk_loader==1.1.2',
+        'psycopg[binary]>=3.2.3',
+        'psycopg_pool>=3.2.4',
         'pyarrow==18.1.0',
         'python-dotenv==1.0.1',
         'tqdm==4.67.1'
     ],
+    extras_require={
+        'zstd': ['zstandard'],
+    },
     description='A package for loading OHDSI CDM CSV files into a relational database.',
     long_description=open('README2.md').read(),  # Detailed description from your README
     long_description_content_type="text/markdown",
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from ohdsi_cdm_loader.metrics import MetricsRecorder
+from ohdsi_cdm_loader.schema_catalog import ColumnSpec, TablePlan
+
+
+class Handler:
+    """Stands in for a DatabaseHandler where a loader only needs its names and metrics."""
+    _schema = 'cdm'
+    _server = 'localhost'
+    _database = 'cdm'
+
+    def __init__(self):
+        self.metrics = MetricsRecorder()
+
+    def get_bulk_connection(self):
+        return None
+
+
+@pytest.fixture
+def handler():
+    return Handler()
+
+
+@pytest.fixture
+def concept_plan():
+    return TablePlan('concept', [
+        ColumnSpec('concept_id', 'integer'),
+        ColumnSpec('concept_name', 'character varying', 255),
+        ColumnSpec('valid_start_date', 'date'),
+    ])
+
+
+@pytest.fixture
+def make_loader(handler, concept_plan):
+    """Build a CSVLoader with the concept plan whose bulk inserts collect the frames in ``inserted``."""
+    from ohdsi_cdm_loader.load_csv import CSVLoader
+
+    def make(**kwargs):
+        loader = CSVLoader(db_handler=handler, **kwargs)
+        loader._catalog = type('Catalog', (), {'plan': staticmethod(lambda table: concept_plan)})()
+        loader.inserted = []
+
+        async def bulk_load_data(**kwargs):
+            # yield like a real insert, so concurrent loads interleave
+            await asyncio.sleep(0)
+            loader.inserted.append(kwargs['data'])
+
+        loader.bulk_load_data = bulk_load_data
+        return loader
+    return make
@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from athena_generator import TABLE_COLUMNS, generate  # noqa: E402
+from bench_suite import measure  # noqa: E402
+from ohdsi_cdm_loader.readers import pandas_chunks  # noqa: E402
+
+
+def test_generator_writes_every_table_with_unique_keys(tmp_path):
+    rows = generate(str(tmp_path), concepts=500, upper=True)
+
+    assert set(rows) == set(TABLE_COLUMNS)
+    for table, count in rows.items():
+        frame = pd.concat(pandas_chunks(str(tmp_path / f"{table.upper()}.csv"), 10_000))
+        assert list(frame.columns) == [name for name, _, _ in TABLE_COLUMNS[table]]
+        assert len(frame) == count
+    concept = pd.read_csv(tmp_path / 'CONCEPT.csv', sep='\t', usecols=['concept_id'])
+    assert concept['concept_id'].is_unique
+
+
+def test_generator_is_reproducible(tmp_path):
+    generate(str(tmp_path / 'a'), concepts=200, tables=['concept'])
+    generate(str(tmp_path / 'b'), concepts=200, tables=['concept'])
+
+    assert (tmp_path / 'a' / 'concept.csv').read_bytes() == (tmp_path / 'b' / 'concept.csv').read_bytes()
+
+
+def test_measure_records_rows_and_failures():
+    assert measure('ok', lambda: 10)['rows'] == 10
+
+    def fail():
+        raise RuntimeError('no database')
+
+    assert measure('db', fail, table='concept') == {'stage': 'db', 'error': 'RuntimeError: no database',
+                                                   'table': 'concept'}
@@ -0,0 +1,30 @@
+from ohdsi_cdm_loader.checkpoint import Checkpoint, file_fingerprint, merge_ranges, uncommitted_mask
+
+
+def test_merge_ranges_joins_overlapping_and_touching_ranges():
+    assert merge_ranges([(200, 300), (0, 100), (100, 150), (250, 400), (500, 600)]) == [
+        (0, 150), (200, 400), (500, 600)]
+    assert merge_ranges([]) == []
+
+
+def test_uncommitted_mask_skips_committed_rows():
+    mask = uncommitted_mask(100, 10, [(0, 102), (105, 107), (200, 300)])
+
+    assert mask.tolist() == [False, False, True, True, True, False, False, True, True, True]
+
+
+def test_checkpoint_resumes_after_the_leading_range():
+    checkpoint = Checkpoint('concept', 'CONCEPT.csv', 'f', ranges=[(0, 500), (700, 900)])
+
+    assert checkpoint.resume_row == 500
+    assert checkpoint.rows_loaded == 700
+    assert Checkpoint('concept', 'CONCEPT.csv', 'f', ranges=[(100, 200)]).resume_row == 0
+
+
+def test_file_fingerprint_changes_with_the_file(tmp_path):
+    path = tmp_path / 'CONCEPT.csv'
+    path.write_text('concept_id\n1\n')
+    before = file_fingerprint(str(path))
+    path.write_text('concept_id\n2\n')
+
+    assert file_fingerprint(str(path)) != before
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from ohdsi_cdm_loader.conversion import TableConverter, parse_yyyymmdd
+from ohdsi_cdm_loader.schema_catalog import ColumnSpec, TablePlan
+
+
+def test_parse_yyyymmdd_nulls_and_counts_invalid_dates():
+    dates, coerced = parse_yyyymmdd(pd.Series(['20200101', '20230231', '20201301', 'abc', '', '99991231']))
+
+    assert dates.tolist()[0] == pd.Timestamp('2020-01-01')
+    assert dates.tolist()[-1] == pd.Timestamp('9999-12-31')
+    assert dates.iloc[1:5].isna().all()
+    # the empty value is null, not coerced
+    assert coerced == 3
+
+
+def test_parse_yyyymmdd_takes_integer_columns():
+    dates, coerced = parse_yyyymmdd(pd.Series([20200229, 19700101], dtype=np.int64))
+
+    assert dates.tolist() == [pd.Timestamp('2020-02-29'), pd.Timestamp('1970-01-01')]
+    assert coerced == 0
+
+
+def test_converter_types_columns_and_reports_coerced_values():
+    plan = TablePlan('concept', [
+        ColumnSpec('concept_id', 'integer'),
+        ColumnSpec('concept_name', 'character varying', 5),
+        ColumnSpec('valid_start_date', 'date'),
+    ])
+    frame = pd.DataFrame({'concept_id': ['1', 'x', ''], 'concept_name': ['short', 'too long', ''],
+                          'valid_start_date': ['20200101', '20200101', 'never'], 'extra': [1, 2, 3]})
+    converter = TableConverter(plan)
+
+    data = converter.convert(frame)
+
+    assert list(data.columns) == ['concept_id', 'concept_name', 'valid_start_date']
+    assert data['concept_id'].tolist() == [1, pd.NA, pd.NA]
+    assert data['concept_name'].tolist() == ['short', 'too l', '']
+    assert converter.report.coerced() == {'concept_id': 1, 'valid_start_date': 1}
+    assert data.attrs['coerced_to_null'] == 2
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+
+from ohdsi_cdm_loader.copy_stream import CopyStreamer
+from ohdsi_cdm_loader.schema_catalog import ColumnSpec, TablePlan
+
+PLAN = TablePlan('note', [
+    ColumnSpec('note_id', 'integer'),
+    ColumnSpec('note_date', 'date'),
+    ColumnSpec('note_datetime', 'timestamp without time zone'),
+    ColumnSpec('note_text', 'text'),
+])
+
+
+class _Copy:
+    def __init__(self, written):
+        self._written = written
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def write(self, block):
+        self._written.append((threading.current_thread().name, block))
+
+
+class _Cursor:
+    def __init__(self, written):
+        self._written = written
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def copy(self, query):
+        self._written.append(('query', query))
+        return _Copy(self._written)
+
+
+class _Connection:
+    def __init__(self, written):
+        self._written = written
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def cursor(self):
+        return _Cursor(self._written)
+
+
+class _Pool:
+    def __init__(self):
+        self.written = []
+
+    def connection(self):
+        return _Connection(self.written)
+
+
+def test_copy_stream_writes_null_for_empty_typed_values(tmp_path):
+    source = tmp_path / 'NOTE.csv'
+    source.write_text('note_id\tnote_date\tnote_datetime\tnote_text\n'
+                      '1\t20200101\t2020-01-01 10:00:00\thello\n'
+                      '2\t\t\t\n')
+    pool = _Pool()
+
+    stats = asyncio.run(CopyStreamer(pool, 'cdm', PLAN, block_rows=1).load(str(source), 'note'))
+
+    assert stats['rows'] == 2
+    blocks = [block for name, block in pool.written if name != 'query']
+    assert blocks == ['1\t2020-01-01\t2020-01-01 10:00:00\thello\n', '2\t\\N\t\\N\t\\N\n']
+    # the blocks are written on the event loop, not on the normalising thread
+    assert {name for name, _ in pool.written if name != 'query'} == {threading.current_thread().name}
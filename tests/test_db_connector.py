@@ -0,0 +1,18 @@
+from ohdsi_cdm_loader.db_connector import DDL_WRITERS, DatabaseHandler
+
+
+def _handler(tmp_path):
+    return DatabaseHandler(dbms='postgresql', server='localhost', user='cdm', password='cdm', database='cdm',
+                           driver_path=str(tmp_path), schema='cdm', ddl_cache_dir=str(tmp_path / 'ddl'))
+
+
+def test_supports_ddl_split_answers_from_the_cache_without_r(tmp_path):
+    handler = _handler(tmp_path)
+    for part in DDL_WRITERS:
+        handler._ddl_cache.put('postgresql', '5.4', part, f'-- {part}\n')
+
+    def no_r(name):
+        raise AssertionError(f"R package '{name}' imported")
+
+    handler._r_package = no_r
+    assert handler.supports_ddl_split('5.4')
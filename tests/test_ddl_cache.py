@@ -0,0 +1,77 @@
+from ohdsi_cdm_loader.ddl_cache import (DDLCache, SCHEMA_PLACEHOLDER, diff_schema, diff_statements,
+                                        existing_columns, expected_columns, normalise_type,
+                                        parse_create_tables, schema_fingerprint)
+
+DDL = f"""
+--postgresql CDM DDL Specification for OMOP Common Data Model 5.4
+CREATE TABLE {SCHEMA_PLACEHOLDER}.CONCEPT (
+    concept_id integer NOT NULL,
+    concept_name varchar(255) NOT NULL,
+    valid_start_date date NOT NULL,
+    invalid_reason varchar(1) NULL );
+CREATE TABLE {SCHEMA_PLACEHOLDER}.NOTE (
+    note_id integer NOT NULL,
+    note_datetime TIMESTAMP NULL,
+    note_text TEXT NOT NULL,
+    CONSTRAINT xpk_note PRIMARY KEY (note_id) );
+"""
+
+
+def test_normalise_type_matches_information_schema():
+    assert normalise_type('varchar(50)') == ('character varying', 50)
+    assert normalise_type('varchar(max)') == ('text', None)
+    assert normalise_type('NUMERIC(10, 2)') == ('numeric', None)
+    assert normalise_type('timestamp') == ('timestamp without time zone', None)
+
+
+def test_parse_create_tables_skips_table_constraints():
+    tables = parse_create_tables(DDL)
+
+    assert list(tables) == ['concept', 'note']
+    assert [name for name, _ in tables['note']] == ['note_id', 'note_datetime', 'note_text']
+
+
+def test_diff_schema_finds_missing_tables_columns_and_changed_types():
+    existing = existing_columns([
+        ('CONCEPT', 'concept_id', 'bigint', None),
+        ('CONCEPT', 'concept_name', 'character varying', 255),
+        ('concept', 'valid_start_date', 'date', None),
+    ])
+
+    diff = diff_schema(expected_columns(DDL), existing)
+
+    assert diff.missing_tables == ['note']
+    assert diff.missing_columns == {'concept': ['invalid_reason']}
+    assert diff.changed_types == {'concept': [('concept_id', ('integer', None), ('bigint', None))]}
+    assert not diff.empty
+
+
+def test_diff_statements_create_missing_tables_and_nullable_columns():
+    diff = diff_schema(expected_columns(DDL), existing_columns([('concept', 'concept_id', 'integer', None)]))
+    diff.missing_tables.remove('note')
+
+    statements = diff_statements(DDL.replace(f'{SCHEMA_PLACEHOLDER}.', 'cdm.'), diff, 'cdm')
+
+    assert statements == [
+        'ALTER TABLE cdm.concept ADD COLUMN IF NOT EXISTS concept_name varchar(255) NULL',
+        'ALTER TABLE cdm.concept ADD COLUMN IF NOT EXISTS valid_start_date date NULL',
+        'ALTER TABLE cdm.concept ADD COLUMN IF NOT EXISTS invalid_reason varchar(1) NULL',
+    ]
+
+
+def test_matching_schema_has_the_fingerprint_of_the_ddl():
+    expected = expected_columns(DDL)
+    existing = existing_columns([(table, *column) for table, columns in expected.items() for column in columns]
+                                + [('cdm_loader_checkpoint', 'table_name', 'character varying', 255)])
+
+    assert schema_fingerprint(existing, expected) == schema_fingerprint(expected)
+    assert diff_schema(expected, existing).empty
+
+
+def test_ddl_cache_substitutes_the_schema_on_read(tmp_path):
+    cache = DDLCache(str(tmp_path))
+    assert cache.get('postgresql', '5.4', 'ddl', 'cdm') is None
+
+    cache.put('postgresql', '5.4', 'ddl', DDL)
+
+    assert 'CREATE TABLE cdm.CONCEPT' in cache.get('postgresql', '5.4', 'ddl', 'cdm')
@@ -0,0 +1,66 @@
+import asyncio
+
+from ohdsi_cdm_loader.delta import DeltaRefresh
+from ohdsi_cdm_loader.schema_catalog import ColumnSpec, TablePlan
+
+
+class _Cursor:
+    def __init__(self, rowcount):
+        self.rowcount = rowcount
+
+
+class _Transaction:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Connection:
+    def __init__(self, statements, rowcounts):
+        self._statements = statements
+        self._rowcounts = rowcounts
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def transaction(self):
+        return _Transaction()
+
+    async def execute(self, statement, params=None):
+        self._statements.append(statement)
+        return _Cursor(self._rowcounts.get(statement.split()[0], 0))
+
+
+class _Pool:
+    def __init__(self, rowcounts):
+        self.statements = []
+        self._rowcounts = rowcounts
+
+    def connection(self):
+        return _Connection(self.statements, self._rowcounts)
+
+
+def test_delta_keeps_one_staged_row_per_repeated_key():
+    plan = TablePlan('concept_synonym', [
+        ColumnSpec('concept_id', 'integer'),
+        ColumnSpec('concept_synonym_name', 'character varying', 1000),
+        ColumnSpec('language_concept_id', 'integer'),
+    ])
+    pool = _Pool({'DELETE': 2})
+
+    counts = asyncio.run(DeltaRefresh(pool, 'cdm', plan).apply())
+
+    dedupe, *rest = pool.statements
+    assert dedupe == (
+        "DELETE FROM cdm.concept_synonym__delta s USING (SELECT ctid, row_number() OVER "
+        "(PARTITION BY concept_id, concept_synonym_name, language_concept_id) AS n "
+        "FROM cdm.concept_synonym__delta) d WHERE s.ctid = d.ctid AND d.n > 1")
+    # the diff only starts once the release holds every key once
+    assert rest[0].startswith('CREATE INDEX ON cdm.concept_synonym__delta')
+    assert rest[-1].startswith('INSERT INTO cdm.concept_synonym')
+    assert counts['duplicates'] == 2
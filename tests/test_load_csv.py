@@ -0,0 +1,65 @@
+import asyncio
+import logging
+
+
+def test_concurrent_shards_report_their_own_coerced_values(tmp_path, caplog, make_loader):
+    bad, good = tmp_path / 'concept_1.csv', tmp_path / 'concept_2.csv'
+    bad.write_text('concept_id\tconcept_name\n' + ''.join(f'x{i}\tname\n' for i in range(3))
+                   + ''.join(f'{i}\tname\n' for i in range(3, 1000)))
+    good.write_text('concept_id\tconcept_name\n' + ''.join(f'{i}\tname\n' for i in range(1000)))
+    loader = make_loader()
+
+    async def load_both():
+        await asyncio.gather(loader.load_csv_to_db(str(bad), 'concept', chunk_size=100),
+                             loader.load_csv_to_db(str(good), 'concept', chunk_size=100))
+
+    with caplog.at_level(logging.WARNING):
+        asyncio.run(load_both())
+
+    warnings = [record.getMessage() for record in caplog.records if 'coerced to NULL' in record.getMessage()]
+    assert warnings == ["Values coerced to NULL in 'concept' from 'concept_1.csv': {'concept_id': 3}"]
+
+
+class _PoolHandler:
+    """A handler whose SQL is recorded, enough for load_all_csvs with the chunk pipeline."""
+    _schema = 'cdm'
+    _server = 'localhost'
+    _database = 'cdm'
+
+    def __init__(self, handler):
+        self.metrics = handler.metrics
+        self.statements = []
+        self._loop = asyncio.new_event_loop()
+
+    def get_bulk_connection(self):
+        return None
+
+    def run_async(self, coro):
+        return self._loop.run_until_complete(coro)
+
+    async def get_pool(self):
+        raise AssertionError("the pool was used")
+
+    def query_sql(self, query, params=None):
+        return [('concept', 'concept_id', 'integer', None), ('concept', 'concept_name', 'character varying', 255)]
+
+    def empty_table(self, schema, table):
+        self.statements.append(f"TRUNCATE {schema}.{table}")
+
+    def disable_foreign_key_checks(self, table=None):
+        pass
+
+    def enable_foreign_key_checks(self, table=None):
+        pass
+
+
+def test_load_without_resume_keeps_no_checkpoint_manifest(tmp_path, handler, make_loader):
+    (tmp_path / 'concept.csv').write_text('concept_id\tconcept_name\n1\tname\n')
+    loader = make_loader()
+    db = _PoolHandler(handler)
+    loader.db_connect = loader._targets[0] = db
+
+    loader.load_all_csvs(str(tmp_path), ['concept'], upper=False)
+
+    assert db.statements == ['TRUNCATE cdm.concept']
+    assert len(loader.inserted) == 1
@@ -0,0 +1,40 @@
+from ohdsi_cdm_loader.parallel_load import ByteRangeLoader, newline_ranges
+from ohdsi_cdm_loader.schema_catalog import ColumnSpec, TablePlan
+
+
+def _write(path, rows):
+    text = 'concept_id\tconcept_name\n' + ''.join(f'{i}\tname {i}\n' for i in range(rows))
+    path.write_text(text)
+    return text.encode()
+
+
+def test_newline_ranges_cover_the_records_in_whole_lines(tmp_path):
+    path = tmp_path / 'CONCEPT.csv'
+    data = _write(path, 1000)
+
+    ranges = newline_ranges(str(path), range_bytes=1000)
+
+    header = data.index(b'\n') + 1
+    assert ranges[0][0] == header and ranges[-1][1] == len(data)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    assert all(data[end - 1:end] == b'\n' for _, end in ranges)
+    assert b''.join(data[start:end] for start, end in ranges).count(b'\n') == 1000
+
+
+def test_newline_ranges_of_empty_and_header_only_files(tmp_path):
+    empty, header = tmp_path / 'empty.csv', tmp_path / 'header.csv'
+    empty.write_text('')
+    header.write_text('concept_id')
+
+    assert newline_ranges(str(empty)) == []
+    assert newline_ranges(str(header)) == []
+
+
+def test_ranges_give_every_worker_several(tmp_path):
+    path = tmp_path / 'CONCEPT.csv'
+    _write(path, 1_000_000)
+    plan = TablePlan('concept', [ColumnSpec('concept_id', 'integer')])
+
+    ranges = ByteRangeLoader('', 'cdm', plan, workers=2).ranges(str(path))
+
+    assert len(ranges) >= 2 * 4
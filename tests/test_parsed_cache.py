@@ -0,0 +1,52 @@
+import os
+
+import pandas as pd
+
+from ohdsi_cdm_loader.parsed_cache import ParsedCache
+
+
+def _entry(cache, key, plan, rows):
+    writer = cache.writer(key, plan)
+    frame = pd.DataFrame({'concept_id': pd.array(range(rows), dtype='Int64'),
+                          'concept_name': ['x' * 100] * rows})
+    # out of order, as converted chunks may finish
+    writer.write(rows // 2, rows - rows // 2, frame.iloc[rows // 2:])
+    writer.write(0, rows // 2, frame.iloc[:rows // 2])
+    writer.commit()
+
+
+def test_entry_round_trips_in_source_order(tmp_path, concept_plan):
+    cache = ParsedCache(str(tmp_path))
+    _entry(cache, 'a', concept_plan, 1000)
+
+    frames = [ParsedCache.to_frame(batch) for batch in cache.batches('a', skip_rows=600)]
+
+    frame = pd.concat(frames)
+    assert frame['concept_id'].tolist() == list(range(600, 1000))
+    assert cache.batches('missing') is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, concept_plan):
+    cache = ParsedCache(str(tmp_path))
+    for key in ('a', 'b', 'c'):
+        _entry(cache, key, concept_plan, 2000)
+    size = os.path.getsize(cache.path('a'))
+    for age, key in ((300, 'a'), (200, 'b'), (100, 'c')):
+        os.utime(cache.path(key), (0, os.path.getmtime(cache.path(key)) - age))
+    # reading 'a' makes it the most recently used
+    list(cache.batches('a'))
+
+    ParsedCache(str(tmp_path), max_bytes=2 * size).evict()
+
+    assert sorted(name[0] for name in os.listdir(tmp_path)) == ['a', 'c']
+
+
+def test_failed_load_leaves_no_entry(tmp_path, concept_plan):
+    cache = ParsedCache(str(tmp_path))
+    writer = cache.writer('a', concept_plan)
+    writer.write(1000, 10, pd.DataFrame({'concept_id': pd.array(range(10), dtype='Int64')}))
+
+    # a gap before the written chunk: nothing is published
+    writer.commit()
+
+    assert os.listdir(tmp_path) == []
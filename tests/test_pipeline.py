@@ -0,0 +1,43 @@
+import asyncio
+import threading
+
+import pytest
+
+from ohdsi_cdm_loader.pipeline import ChunkPipeline
+
+
+def test_pipeline_converts_off_the_loop_and_inserts_every_chunk():
+    chunks = iter([[i] * 10 for i in range(20)])
+    loop_thread = threading.current_thread().name
+    converted_on, inserted = set(), []
+
+    def convert(chunk):
+        converted_on.add(threading.current_thread().name)
+        return [value * 2 for value in chunk]
+
+    async def insert(data):
+        inserted.append(data[0])
+
+    stats = asyncio.run(ChunkPipeline(queue_depth=1, convert_workers=3, insert_workers=2).run(chunks, convert, insert))
+
+    assert sorted(inserted) == [i * 2 for i in range(20)]
+    assert loop_thread not in converted_on
+    assert [(s.rows, s.items) for s in stats.values()] == [(200, 20)] * 3
+
+
+def test_pipeline_raises_the_first_stage_error():
+    def convert(chunk):
+        if chunk[0] == 3:
+            raise ValueError('bad chunk')
+        return chunk
+
+    async def insert(data):
+        pass
+
+    with pytest.raises(ValueError, match='bad chunk'):
+        asyncio.run(ChunkPipeline().run(iter([[i] for i in range(10)]), convert, insert))
+
+
+def test_pipeline_rejects_empty_stages():
+    with pytest.raises(ValueError):
+        ChunkPipeline(queue_depth=0)
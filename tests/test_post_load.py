@@ -0,0 +1,17 @@
+from ohdsi_cdm_loader.post_load import drop_statements
+
+
+def test_drop_statements_drop_foreign_keys_before_the_keys_they_reference():
+    records = [
+        ('concept', 'idx_concept_code', 'i'),
+        ('concept', 'xpk_concept', 'p'),
+        ('concept', 'fpk_concept_domain_id', 'f'),
+        ('domain', 'xpk_domain', 'p'),
+    ]
+
+    assert drop_statements(records, 'cdm') == [
+        'ALTER TABLE cdm."concept" DROP CONSTRAINT IF EXISTS "fpk_concept_domain_id"',
+        'ALTER TABLE cdm."concept" DROP CONSTRAINT IF EXISTS "xpk_concept"',
+        'ALTER TABLE cdm."domain" DROP CONSTRAINT IF EXISTS "xpk_domain"',
+        'DROP INDEX IF EXISTS cdm."idx_concept_code"',
+    ]
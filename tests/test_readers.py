@@ -0,0 +1,69 @@
+import asyncio
+import gzip
+
+import pandas as pd
+
+from ohdsi_cdm_loader.readers import ArrowCSVReader, pandas_chunks
+from ohdsi_cdm_loader.sources import as_source
+
+
+def _write_gzipped_tsv(path, rows):
+    with gzip.open(path, 'wt', encoding='utf-8', newline='') as handle:
+        handle.write('concept_id\tconcept_name\tvalid_start_date\n')
+        for i in range(rows):
+            handle.write(f'{i}\tname {i}\t20200101\n')
+
+
+def test_arrow_reader_reads_gzipped_tsv(tmp_path, concept_plan):
+    path = tmp_path / 'CONCEPT.csv.gz'
+    _write_gzipped_tsv(path, 1000)
+
+    reader = ArrowCSVReader(concept_plan)
+    frames = [reader.to_frame(batch) for batch in reader.batches(as_source(str(path)), skip_rows=10)]
+
+    assert sum(len(frame) for frame in frames) == 990
+    assert frames[0]['concept_id'].iloc[0] == 10
+
+
+def test_load_csv_to_db_with_arrow_reader_on_gzipped_tsv(tmp_path, make_loader):
+    path = tmp_path / 'CONCEPT.csv.gz'
+    _write_gzipped_tsv(path, 1000)
+    loader = make_loader(reader='arrow')
+
+    asyncio.run(loader.load_csv_to_db(as_source(str(path)), 'concept'))
+
+    frame = pd.concat(loader.inserted)
+    assert len(frame) == 1000
+    assert list(frame.columns) == ['concept_id', 'concept_name', 'valid_start_date']
+
+
+def test_arrow_reader_coerces_invalid_integers_like_pandas(tmp_path, concept_plan):
+    path = tmp_path / 'CONCEPT.csv'
+    path.write_text('concept_id\tconcept_name\tvalid_start_date\n'
+                    '1\tone\t20200101\n'
+                    'x2\ttwo\t20200101\n'
+                    '\tthree\t20200101\n')
+    reader = ArrowCSVReader(concept_plan)
+
+    frames = [reader.to_frame(batch) for batch in reader.batches(as_source(str(path)))]
+
+    frame = pd.concat(frames)
+    assert frame['concept_id'].tolist() == [1, pd.NA, pd.NA]
+    assert str(frame['concept_id'].dtype) == 'Int32'
+    assert reader.report.coerced() == {'concept_id': 1}
+
+
+def test_pandas_and_arrow_readers_keep_quotes_literal(tmp_path, concept_plan):
+    path = tmp_path / 'CONCEPT.csv'
+    path.write_text('concept_id\tconcept_name\tvalid_start_date\n'
+                    '1\t"Quoted" name\t20200101\n'
+                    '2\t"unterminated\t20200101\n'
+                    '3\tplain\t20200101\n')
+    reader = ArrowCSVReader(concept_plan)
+
+    arrow = pd.concat([reader.to_frame(batch) for batch in reader.batches(as_source(str(path)))])
+    pandas = pd.concat(pandas_chunks(str(path), 100))
+
+    expected = ['"Quoted" name', '"unterminated', 'plain']
+    assert arrow['concept_name'].tolist() == expected
+    assert pandas['concept_name'].tolist() == expected
@@ -0,0 +1,43 @@
+import asyncio
+
+from ohdsi_cdm_loader import scheduler as scheduler_module
+from ohdsi_cdm_loader.load_csv import CSVLoader
+from ohdsi_cdm_loader.scheduler import TableScheduler
+
+
+class _Progress:
+    bars = []
+
+    def __init__(self, total, **kwargs):
+        self.total = total
+        self.n = 0
+        _Progress.bars.append(self)
+
+    def update(self, n):
+        self.n += n
+
+    def set_postfix(self, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_upper_case_shards_advance_the_progress_once(monkeypatch, handler):
+    monkeypatch.setattr(scheduler_module, 'tqdm', _Progress)
+    loader = CSVLoader(db_handler=handler)
+    scheduler = TableScheduler()
+    loader._scheduler = scheduler
+    table, table_name = 'concept', 'CONCEPT'  # as load_all_csvs names them with upper=True
+
+    async def load_shard(shard):
+        loader._report_rows(table_name, 10)
+
+    def load():
+        return loader._load_shards(table_name, ['CONCEPT_1.csv', 'CONCEPT_2.csv', 'CONCEPT_3.csv'], load_shard)
+
+    asyncio.run(scheduler.run([scheduler.job(table, 100, load, shards=3)]))
+
+    bar = _Progress.bars[-1]
+    assert (bar.total, bar.n) == (3, 3)
+    assert scheduler._rows == {'concept': 30}
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from ohdsi_cdm_loader.sizing import BatchSizer, ChunkSizer, parse_size, source_bytes_per_row
+
+
+def test_parse_size_reads_units():
+    assert parse_size('2GB') == 2 << 30
+    assert parse_size(' 512m ') == 512 << 20
+    assert parse_size('1.5K') == 1536
+    assert parse_size(1024) == 1024
+    assert parse_size(None) is None
+    with pytest.raises(ValueError):
+        parse_size('lots')
+
+
+def test_source_bytes_per_row_skips_the_header(tmp_path):
+    path = tmp_path / 'CONCEPT.csv'
+    path.write_text('a much longer header line than any row\n' + '123456789\n' * 100)
+
+    assert source_bytes_per_row(str(path)) == 10
+
+
+def test_chunk_sizer_follows_the_measured_row_width():
+    sizer = ChunkSizer(budget=10 << 20, chunks_in_flight=10, bytes_per_row=16)
+    first = sizer.rows
+
+    sizer.observe(pd.DataFrame({'name': ['x' * 1000] * 100}))
+
+    assert first == (10 << 20) // 10 // (16 * 8)
+    assert sizer.rows < first
+    assert ChunkSizer(budget=1, chunks_in_flight=1, bytes_per_row=1000).rows == 1000  # min_rows
+
+
+def test_batch_sizer_grows_on_fast_full_batches_and_halves_on_slow_ones():
+    sizer = BatchSizer(10_000, target_seconds=1.0)
+
+    sizer.observe(10_000, 0.5)
+    assert sizer.size == 12_500
+    sizer.observe(5_000, 0.1)  # a partial batch says nothing about a bigger one
+    assert sizer.size == 12_500
+    sizer.observe(12_500, 3.0)
+    assert sizer.size == 6_250
@@ -0,0 +1,56 @@
+import pytest
+
+from ohdsi_cdm_loader.schema_catalog import ColumnSpec, TablePlan
+from ohdsi_cdm_loader.upsert import UpsertMerge, primary_keys
+
+COLUMNS = ['concept_id', 'concept_name', 'valid_start_date']
+
+
+def test_primary_keys_groups_key_columns_in_order():
+    assert primary_keys([('CONCEPT', 'CONCEPT_ID'), ('concept_relationship', 'concept_id_1'),
+                         ('concept_relationship', 'concept_id_2')]) == {
+        'concept': ('concept_id',), 'concept_relationship': ('concept_id_1', 'concept_id_2')}
+
+
+def test_upsert_on_the_primary_key(concept_plan):
+    merge = UpsertMerge('cdm', concept_plan, ('concept_id',))
+
+    assert merge.statement(COLUMNS) == (
+        "INSERT INTO cdm.concept AS t (concept_id, concept_name, valid_start_date) "
+        "SELECT DISTINCT ON (concept_id) concept_id, concept_name, valid_start_date FROM pg_temp.concept__upsert "
+        "ON CONFLICT (concept_id) DO UPDATE SET concept_name = EXCLUDED.concept_name, "
+        "valid_start_date = EXCLUDED.valid_start_date "
+        "WHERE (t.concept_name, t.valid_start_date) IS DISTINCT FROM "
+        "(EXCLUDED.concept_name, EXCLUDED.valid_start_date)")
+
+
+def test_upsert_without_a_primary_key_merges_on_the_natural_key(concept_plan):
+    merge = UpsertMerge('cdm', concept_plan).for_schema('results')
+
+    assert not merge.conflict
+    assert merge.statement(COLUMNS) == (
+        "WITH source AS (SELECT DISTINCT ON (concept_id) concept_id, concept_name, valid_start_date "
+        "FROM pg_temp.concept__upsert), "
+        "updated AS (UPDATE results.concept t SET concept_name = s.concept_name, "
+        "valid_start_date = s.valid_start_date FROM source s WHERE t.concept_id = s.concept_id "
+        "AND (t.concept_name, t.valid_start_date) IS DISTINCT FROM (s.concept_name, s.valid_start_date)) "
+        "INSERT INTO results.concept (concept_id, concept_name, valid_start_date) "
+        "SELECT concept_id, concept_name, valid_start_date FROM source s "
+        "WHERE NOT EXISTS (SELECT 1 FROM results.concept t WHERE t.concept_id = s.concept_id)")
+
+
+def test_upsert_of_key_only_rows_does_nothing_on_conflict():
+    plan = TablePlan('concept_synonym', [ColumnSpec('concept_id', 'integer'),
+                                         ColumnSpec('language_concept_id', 'integer')])
+    merge = UpsertMerge('cdm', plan, ('concept_id', 'language_concept_id'))
+
+    assert merge.statement(['concept_id', 'language_concept_id']).endswith(
+        "ON CONFLICT (concept_id, language_concept_id) DO NOTHING")
+
+
+def test_upsert_needs_a_key():
+    plan = TablePlan('metadata_x', [ColumnSpec('name', 'character varying', 50)])
+    with pytest.raises(ValueError, match='no primary or natural key'):
+        UpsertMerge('cdm', plan)
+    with pytest.raises(ValueError, match='not in the source'):
+        UpsertMerge('cdm', TablePlan('concept', [ColumnSpec('concept_id', 'integer')])).statement(['concept_name'])